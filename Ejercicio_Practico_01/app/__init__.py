@@ -3,6 +3,8 @@ from flask_jwt_extended import JWTManager
 from flasgger import Swagger
 from app.config import Config
 from app.middleware.request_logger import register_request_logging
+from app.middleware.tracing import register_tracing
+from app.middleware.profiler import register_profiler
 
 from app.controllers.auth_controller import auth_bp
 from app.controllers.geo_controller import geo_bp
@@ -10,6 +12,8 @@ from app.controllers.identity_controller import identity_bp
 from app.controllers.security_controller import security_bp
 from app.controllers.text_controller import text_bp
 from app.controllers.translate_controller import translate_bp
+from app.controllers.metrics_controller import metrics_bp
+from app.controllers.profiler_controller import profiler_bp
 
 
 def create_app():
@@ -19,9 +23,15 @@ def create_app():
     # JWT
     JWTManager(app)
 
+    # Middleware de trazas: se registra primero para envolver al de logging
+    register_tracing(app)
+
     # Middleware logging
     register_request_logging(app)
 
+    # Profiler por muestreo (solo si PROFILER_ENABLED=true)
+    register_profiler(app)
+
     # Blueprints con prefijo /api
     app.register_blueprint(auth_bp, url_prefix="/api")
     app.register_blueprint(geo_bp, url_prefix="/api")
@@ -29,6 +39,10 @@ def create_app():
     app.register_blueprint(security_bp, url_prefix="/api")
     app.register_blueprint(text_bp, url_prefix="/api")
     app.register_blueprint(translate_bp, url_prefix="/api")
+    app.register_blueprint(profiler_bp, url_prefix="/api")
+
+    # Métricas Prometheus en la raíz (/metrics), como espera el scraper
+    app.register_blueprint(metrics_bp)
 
     # 🔥 Swagger Config
     swagger_template = {
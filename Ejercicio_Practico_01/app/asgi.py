@@ -0,0 +1,128 @@
+import io
+from a2wsgi import WSGIMiddleware
+from a2wsgi.wsgi import build_environ
+from app.config import Config
+from app.controllers.geo_controller import atender_localizar_ip
+from app.controllers.identity_controller import atender_genero
+from app.controllers.translate_controller import atender_translate
+from app.services.geo_service import get_geo_info_async
+from app.services.identity_service import obtener_genero_async
+from app.services.translate_service import translate_text_async
+from app.utils.http_client import close_async_clients
+from app.utils.response import error_response
+from app.utils.tracing import verify_jwt
+
+# Cuerpo máximo aceptado por las rutas asíncronas (JSON pequeño)
+MAX_BODY_BYTES = 1024 * 1024
+
+# Endpoints Flask que se atienden en el event loop: el mismo cuerpo que la vista
+# del controlador, con la variante async del servicio
+NATIVE_VIEWS = {
+    "geo.localizar_ip": lambda: atender_localizar_ip(get_geo_info_async),
+    "identity.genero": lambda: atender_genero(obtener_genero_async),
+    "translate.translate_endpoint": lambda: atender_translate(translate_text_async)
+}
+
+
+def wsgi_bridge(flask_app):
+    return WSGIMiddleware(flask_app, workers=Config.ASGI_WSGI_THREADS)
+
+
+def create_asgi_app(flask_app):
+    """
+    Punto de entrada ASGI.
+
+    Las rutas que esperan a APIs externas (localizar-ip, genero, translate) se
+    atienden de forma nativa en el event loop con los servicios async: mientras
+    esperan la red no ocupan ningún hilo. Ejecutan la vista compartida del
+    controlador dentro de un contexto de petición de Flask, con los mismos
+    hooks (trazas, métricas, log, profiler), JWT y manejadores de error que la
+    ruta Flask. Todo lo demás (incluido Swagger y /metrics) pasa a la app
+    Flask, que se ejecuta en un pool fijo de ASGI_WSGI_THREADS hilos como en
+    cualquier servidor WSGI.
+    """
+    wsgi = wsgi_bridge(flask_app)
+
+    # Las rutas salen del url_map de Flask: (método, ruta) -> vista nativa
+    routes = {
+        (method, rule.rule): NATIVE_VIEWS[rule.endpoint]
+        for rule in flask_app.url_map.iter_rules()
+        if rule.endpoint in NATIVE_VIEWS
+        for method in rule.methods
+    }
+
+    async def application(scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await _lifespan(receive, send)
+
+        view = routes.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+
+        if view is None:
+            return await wsgi(scope, receive, send)
+
+        await _dispatch(flask_app, view, scope, receive, send)
+
+    return application
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+
+        elif message["type"] == "lifespan.shutdown":
+            await close_async_clients()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def _dispatch(flask_app, view, scope, receive, send):
+    # Mismos pasos que Flask.wsgi_app / full_dispatch_request, esperando a la vista
+    body = await _read_body(receive)
+    too_large = body is None
+
+    with flask_app.request_context(build_environ(scope, io.BytesIO(body or b""))):
+        try:
+            try:
+                rv = flask_app.preprocess_request()
+
+                if rv is None:
+                    verify_jwt()
+
+                    if too_large:
+                        rv = error_response("Cuerpo de la petición demasiado grande", 413), 413
+                    else:
+                        rv = await view()
+
+            except Exception as e:
+                rv = flask_app.handle_user_exception(e)
+
+            response = flask_app.finalize_request(rv)
+
+        except Exception as e:
+            response = flask_app.handle_exception(e)
+
+    payload = response.get_data()
+    headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.items()]
+    headers = [h for h in headers if h[0] != b"content-length"]
+    headers.append((b"content-length", str(len(payload)).encode()))
+
+    await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def _read_body(receive):
+    # None si supera MAX_BODY_BYTES
+    body = bytearray()
+
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+
+        if len(body) > MAX_BODY_BYTES:
+            return None
+
+        if not message.get("more_body"):
+            return bytes(body)
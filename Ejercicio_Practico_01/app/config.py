@@ -18,6 +18,65 @@ class Config:
     IP_GEO_URL = os.getenv("IP_GEO_URL")
     GENDERIZE_URL = os.getenv("GENDERIZE_URL")
     REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", 5))
+
+    # ==========================
+    # CLIENTE HTTP SALIENTE
+    # ==========================
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 2))
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 2))
+    HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", 0.2))
+
+    GEO_POOL_SIZE = int(os.getenv("GEO_POOL_SIZE", HTTP_POOL_SIZE))
+    GEO_CONNECT_TIMEOUT = float(os.getenv("GEO_CONNECT_TIMEOUT", HTTP_CONNECT_TIMEOUT))
+    GEO_READ_TIMEOUT = float(os.getenv("GEO_READ_TIMEOUT", REQUEST_TIMEOUT))
+
+    GENDER_POOL_SIZE = int(os.getenv("GENDER_POOL_SIZE", HTTP_POOL_SIZE))
+    GENDER_CONNECT_TIMEOUT = float(os.getenv("GENDER_CONNECT_TIMEOUT", HTTP_CONNECT_TIMEOUT))
+    GENDER_READ_TIMEOUT = float(os.getenv("GENDER_READ_TIMEOUT", REQUEST_TIMEOUT))
+
+    TRANSLATE_POOL_SIZE = int(os.getenv("TRANSLATE_POOL_SIZE", HTTP_POOL_SIZE))
+    TRANSLATE_CONNECT_TIMEOUT = float(os.getenv("TRANSLATE_CONNECT_TIMEOUT", HTTP_CONNECT_TIMEOUT))
+    TRANSLATE_READ_TIMEOUT = float(os.getenv("TRANSLATE_READ_TIMEOUT", 10))
+    # Clientes httpx del punto de entrada ASGI: un socket no ocupa un hilo, el pool puede ser mayor
+    ASYNC_HTTP_POOL_SIZE = int(os.getenv("ASYNC_HTTP_POOL_SIZE", 100))
+    # Conexiones por cada httpx.AsyncClient interno: el pool async se reparte en varios
+    ASYNC_HTTP_SHARD_SIZE = int(os.getenv("ASYNC_HTTP_SHARD_SIZE", 16))
+    # Hilos del pool que ejecuta la app Flask (rutas síncronas) bajo ASGI
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", 10))
+
+    # ==========================
+    # CIRCUIT BREAKER Y BULKHEAD
+    # ==========================
+    # Ventana de las últimas N llamadas (y no más antiguas que CIRCUIT_WINDOW_SECONDS)
+    CIRCUIT_WINDOW_SIZE = int(os.getenv("CIRCUIT_WINDOW_SIZE", 20))
+    CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", 60))
+    CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", 10))
+    CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", 0.5))
+    CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", 30))
+    CIRCUIT_HALF_OPEN_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_CALLS", 3))
+    # Espera máxima por un cupo de concurrencia del upstream (el cupo es <NOMBRE>_POOL_SIZE)
+    BULKHEAD_MAX_WAIT = float(os.getenv("BULKHEAD_MAX_WAIT", 0.5))
+    # Tiempo durante el que una entrada vencida de caché puede servirse si el circuito está abierto
+    CACHE_STALE_SECONDS = int(os.getenv("CACHE_STALE_SECONDS", 86400))
+
+    # ==========================
+    # CACHÉ DE GEOLOCALIZACIÓN
+    # ==========================
+    GEO_CACHE_TTL = int(os.getenv("GEO_CACHE_TTL", 3600))
+    GEO_CACHE_NEGATIVE_TTL = int(os.getenv("GEO_CACHE_NEGATIVE_TTL", 30))
+    GEO_CACHE_MAX_ENTRIES = int(os.getenv("GEO_CACHE_MAX_ENTRIES", 10000))
+    GEO_CACHE_DB = os.getenv("GEO_CACHE_DB")
+    # Filas máximas en GEO_CACHE_DB (se podan las que vencen antes)
+    GEO_CACHE_DB_MAX_ENTRIES = int(os.getenv("GEO_CACHE_DB_MAX_ENTRIES", 100000))
+
+    # ==========================
+    # GENDERIZE (AGRUPACIÓN Y CACHÉ)
+    # ==========================
+    GENDER_BATCH_MAX = int(os.getenv("GENDER_BATCH_MAX", 10))
+    GENDER_BATCH_WINDOW_MS = int(os.getenv("GENDER_BATCH_WINDOW_MS", 5))
+    GENDER_CACHE_TTL = int(os.getenv("GENDER_CACHE_TTL", 86400))
+    GENDER_CACHE_MAX_ENTRIES = int(os.getenv("GENDER_CACHE_MAX_ENTRIES", 10000))
     
     # ==========================
     # CREDENCIALES DE USUARIO
@@ -28,12 +87,90 @@ class Config:
     # ===========================
     # CONFIGURACIÓN SERVIDOR SMTP
     # ===========================
-    SMTP_SERVER = "smtp.office365.com"
-    SMTP_PORT = 587
+    SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.office365.com")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
     SMTP_USER = os.getenv("SMTP_USER")
     SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+    SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+    SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 10))
+
+    # ==========================
+    # COLA DE CORREOS
+    # ==========================
+    SMTP_WORKERS = int(os.getenv("SMTP_WORKERS", 2))
+    SMTP_MAX_RETRIES = int(os.getenv("SMTP_MAX_RETRIES", 3))
+    SMTP_RETRY_BACKOFF = float(os.getenv("SMTP_RETRY_BACKOFF", 1.0))
+    SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", 60))
+    SMTP_MAX_PER_SESSION = int(os.getenv("SMTP_MAX_PER_SESSION", 100))
     
     # ============================
     # CREDENCIALES DE GOOGLE CLOUD
     # ============================
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
\ No newline at end of file
+    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+    TRANSLATE_URL = os.getenv("TRANSLATE_URL", "https://translation.googleapis.com/language/translate/v2")
+    TRANSLATE_MAX_SEGMENTS = int(os.getenv("TRANSLATE_MAX_SEGMENTS", 128))
+    TRANSLATE_MAX_CHARS = int(os.getenv("TRANSLATE_MAX_CHARS", 30000))
+
+    # ==========================
+    # MEMORIA DE TRADUCCIÓN
+    # ==========================
+    TRANSLATION_MEMORY_DB = os.getenv("TRANSLATION_MEMORY_DB", "translation_memory.db")
+    TRANSLATION_MEMORY_TTL = int(os.getenv("TRANSLATION_MEMORY_TTL", 2592000))
+    TRANSLATION_MEMORY_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", 50000))
+    # Filas máximas en TRANSLATION_MEMORY_DB (se podan las que vencen antes)
+    TRANSLATION_MEMORY_DB_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_DB_MAX_ENTRIES", 200000))
+
+    # ==========================
+    # PROCESAMIENTO POR LOTES
+    # ==========================
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 500000))
+    BATCH_LOG_SAMPLE = int(os.getenv("BATCH_LOG_SAMPLE", 10))
+
+    # ==========================
+    # NÚMERO A LETRAS
+    # ==========================
+    # Montos ya convertidos (por valor redondeado a centavos)
+    NUMERO_LETRAS_CACHE_SIZE = int(os.getenv("NUMERO_LETRAS_CACHE_SIZE", 10000))
+    # Fragmentos "<grupo> MIL <grupo>" (menores a un millón) reutilizados entre montos
+    NUMERO_LETRAS_FRAGMENT_CACHE = int(os.getenv("NUMERO_LETRAS_FRAGMENT_CACHE", 4096))
+
+    # ==========================
+    # NORMALIZACIÓN DE TEXTO
+    # ==========================
+    # LRU para textos cortos repetidos (hasta TEXT_CACHE_MAX_LEN caracteres)
+    TEXT_CACHE_SIZE = int(os.getenv("TEXT_CACHE_SIZE", 4096))
+    TEXT_CACHE_MAX_LEN = int(os.getenv("TEXT_CACHE_MAX_LEN", 64))
+    # Tamaño de cada lectura del cuerpo en /text/*/stream
+    TEXT_STREAM_CHUNK_BYTES = int(os.getenv("TEXT_STREAM_CHUNK_BYTES", 64 * 1024))
+
+    # ==========================
+    # CONTRASEÑAS FILTRADAS
+    # ==========================
+    # Filtro de Bloom generado con build_breached_filter.py; si no existe, no se verifica
+    BREACHED_PASSWORDS_FILTER = os.getenv("BREACHED_PASSWORDS_FILTER", "data/breached_passwords.bloom")
+
+    # ==========================
+    # LOGS: ROTACIÓN Y MUESTREO
+    # ==========================
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 50 * 1024 * 1024))
+    LOG_ROTATE_SECONDS = int(os.getenv("LOG_ROTATE_SECONDS", 86400))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 14))
+    LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", 30))
+    # Ej.: "cedula_validated=0.1,ip_validated=0.1,password_evaluated=0.05"
+    LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+    # ==========================
+    # TRAZAS
+    # ==========================
+    TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", 500))
+
+    # ==========================
+    # PROFILER POR MUESTREO
+    # ==========================
+    PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+    PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", 10))
+    PROFILER_MAX_DEPTH = int(os.getenv("PROFILER_MAX_DEPTH", 64))
+    PROFILER_MAX_STACKS = int(os.getenv("PROFILER_MAX_STACKS", 5000))
+    PROFILER_MAX_OVERHEAD = float(os.getenv("PROFILER_MAX_OVERHEAD", 0.01))
+    # Usuarios (identidad del JWT) con acceso al profiler; por defecto AUTH_USERNAME
+    PROFILER_ADMINS = [u.strip() for u in os.getenv("PROFILER_ADMINS", os.getenv("AUTH_USERNAME") or "").split(",") if u.strip()]
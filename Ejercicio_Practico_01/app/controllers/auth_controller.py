@@ -1,8 +1,9 @@
 from flask import Blueprint, request, current_app
 from flask_jwt_extended import create_access_token
 from app.utils.response import success_response, error_response
-from app.services.auth_service import register_user_service
+from app.services.auth_service import register_user_service, get_email_status_service
 from app.logger_config import logger
+from app.utils.tracing import jwt_required
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -154,4 +155,41 @@ def register():
             "event": "register_controller_error",
             "detail": str(e)
         })
-        return error_response("Error interno en auth", 500)
\ No newline at end of file
+        return error_response("Error interno en auth", 500)
+
+@auth_bp.route("/auth/email-status/<email_id>", methods=["GET"])
+@jwt_required()
+def email_status(email_id):
+    
+    #region Información API Estado de envío del correo de registro
+    """
+    Estado de envío del correo de registro
+    ---
+    tags:
+      - Auth
+    security:
+      - Bearer: []
+    produces:
+      - application/json
+    parameters:
+      - in: path
+        name: email_id
+        type: string
+        required: true
+        description: Identificador devuelto por /auth/register (email_id)
+    responses:
+      200:
+        description: Estado del correo (queued, sending, retrying, sent, failed)
+      401:
+        description: Token inválido o faltante
+      404:
+        description: Identificador desconocido o expirado
+    """
+    #endregion
+
+    status = get_email_status_service(email_id)
+
+    if status is None:
+        return error_response("Correo no encontrado", 404)
+
+    return success_response(status)
@@ -1,8 +1,9 @@
 from flask import Blueprint, request
-from flask_jwt_extended import jwt_required
+from app.utils.tracing import jwt_required
 from app.utils.validators import validate_ip
-from app.services.geo_service import get_geo_info
+from app.services.geo_service import get_geo_info, geo_cache_stats
 from app.utils.response import success_response, error_response
+from app.utils.async_bridge import as_async, run_sync
 from app.logger_config import logger
 
 geo_bp = Blueprint("geo", __name__)
@@ -76,6 +77,51 @@ def validar_ip():
         })
         return error_response("Error interno al validar IP", 500)
 
+async def atender_localizar_ip(service):
+    # Cuerpo compartido con la ruta nativa de app/asgi.py, que pasa la variante async del servicio
+    try:
+        data = request.get_json()
+
+        if not data or "ip" not in data:
+            logger.warning({"event": "localizar_ip_missing_field"})
+            return error_response("Campo 'ip' es requerido", 400)
+
+        ip = data["ip"]
+
+        success, validation = validate_ip(ip)
+
+        if not success:
+            logger.warning({
+                "event": "localizar_ip_invalid",
+                "ip": ip
+            })
+            return error_response(validation, 400)
+
+        if validation["private"]:
+            logger.info({
+                "event": "localizar_ip_private",
+                "ip": ip
+            })
+            return success_response({
+                "mensaje": "IP privada"
+            })
+
+        geo = await service(ip)
+
+        logger.info({
+            "event": "localizar_ip_success",
+            "ip": ip
+        })
+
+        return success_response(geo)
+
+    except Exception as e:
+        logger.error({
+            "event": "localizar_ip_error",
+            "detail": str(e)
+        })
+        return error_response("Error interno al localizar IP", 500)
+
 @geo_bp.route("/geo/localizar-ip", methods=["POST"])
 @jwt_required()
 def localizar_ip():
@@ -127,45 +173,23 @@ def localizar_ip():
     """
     #endregion
     
-    try:
-        data = request.get_json()
+    return run_sync(atender_localizar_ip(as_async(get_geo_info)))
 
-        if not data or "ip" not in data:
-            logger.warning({"event": "localizar_ip_missing_field"})
-            return error_response("Campo 'ip' es requerido", 400)
-
-        ip = data["ip"]
-
-        success, validation = validate_ip(ip)
-
-        if not success:
-            logger.warning({
-                "event": "localizar_ip_invalid",
-                "ip": ip
-            })
-            return error_response(validation, 400)
-
-        if validation["private"]:
-            logger.info({
-                "event": "localizar_ip_private",
-                "ip": ip
-            })
-            return success_response({
-                "mensaje": "IP privada"
-            })
-
-        geo = get_geo_info(ip)
-
-        logger.info({
-            "event": "localizar_ip_success",
-            "ip": ip
-        })
-
-        return success_response(geo)
-
-    except Exception as e:
-        logger.error({
-            "event": "localizar_ip_error",
-            "detail": str(e)
-        })
-        return error_response("Error interno al localizar IP", 500)
\ No newline at end of file
+@geo_bp.route("/geo/cache", methods=["GET"])
+@jwt_required()
+def cache_stats():
+    
+    #region Información API de estadísticas de la caché de geolocalización
+    """
+    Estadísticas de la caché de geolocalización
+    ---
+    tags:
+      - Geolocalización
+    description: Devuelve tamaño, aciertos, fallos, desalojos y expiraciones de la caché de get_geo_info
+    responses:
+      200:
+        description: Estadísticas de la caché
+    """
+    #endregion
+    
+    return success_response(geo_cache_stats())
@@ -1,10 +1,15 @@
 from flask import Blueprint, request
-from flask_jwt_extended import jwt_required
+from app.utils.tracing import jwt_required
 from app.utils.response import success_response, error_response
+from app.utils.batch import read_batch
+from app.utils.async_bridge import as_async, run_sync
 from app.services.identity_service import (
     verificar_cedula,
+    verificar_cedulas_lote,
     obtener_edad,
+    obtener_edades_lote,
     numero_a_letras_moneda,
+    numeros_a_letras_lote,
     obtener_genero
 )
 from app.logger_config import logger
@@ -72,6 +77,80 @@ def numero_letras():
         logger.error({"event": "numero_letras_error", "detail": str(e)})
         return error_response("Error al convertir número", 500)
 
+@identity_bp.route("/identity/numero-letras/batch", methods=["POST"])
+@jwt_required()
+def numero_letras_lote():
+    
+    #region Información API de conversión de números a letras por lote
+    """
+    Convertir números a letras por lote
+    ---
+    tags:
+      - Utilitarios
+    description: Convierte un arreglo JSON de montos o un CSV (Content-Type text/csv, primera columna) en una sola petición. Cada resultado coincide con el de /identity/numero-letras.
+    consumes:
+      - application/json
+      - text/csv
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            numeros:
+              type: array
+              items:
+                type: number
+              example: [123.45, 1000, 21.01]
+    responses:
+      200:
+        description: Resumen y resultado por monto
+        schema:
+          type: object
+          properties:
+            is_success:
+              type: boolean
+            data:
+              type: object
+              properties:
+                total:
+                  type: integer
+                validos:
+                  type: integer
+                invalidos:
+                  type: integer
+                errores:
+                  type: object
+                resultados:
+                  type: array
+                  items:
+                    type: object
+            error_message:
+              type: string
+      400:
+        description: Lote vacío o inválido
+      413:
+        description: Lote demasiado grande
+      500:
+        description: Error interno
+    """
+    #endregion
+    
+    try:
+        numeros, error = read_batch(request, "numeros", "numero", "números", "numero_letras_batch_too_large")
+
+        if error:
+            return error
+
+        result = numeros_a_letras_lote(numeros)
+
+        return success_response(result)
+
+    except Exception as e:
+        logger.error({"event": "numero_letras_batch_error", "detail": str(e)})
+        return error_response("Error al convertir números", 500)
+
 @identity_bp.route("/identity/verificar-cedula", methods=["POST"])
 @jwt_required()
 def validar_cedula():
@@ -137,6 +216,80 @@ def validar_cedula():
         logger.error({"event": "verificar_cedula_error", "detail": str(e)})
         return error_response("Error al verificar cédula", 500)
 
+@identity_bp.route("/identity/verificar-cedula/batch", methods=["POST"])
+@jwt_required()
+def validar_cedula_lote():
+    
+    #region Información para validar cédulas por lote
+    """
+    Validar cédulas ecuatorianas por lote
+    ---
+    tags:
+      - Utilitarios
+    description: Valida un arreglo JSON de cédulas o un CSV (Content-Type text/csv, primera columna) en una sola petición. Cada resultado coincide con el de /identity/verificar-cedula.
+    consumes:
+      - application/json
+      - text/csv
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            cedulas:
+              type: array
+              items:
+                type: string
+              example: ["1710034065", "0102030405"]
+    responses:
+      200:
+        description: Resumen y resultado por cédula
+        schema:
+          type: object
+          properties:
+            is_success:
+              type: boolean
+            data:
+              type: object
+              properties:
+                total:
+                  type: integer
+                validas:
+                  type: integer
+                invalidas:
+                  type: integer
+                errores:
+                  type: object
+                resultados:
+                  type: array
+                  items:
+                    type: object
+            error_message:
+              type: string
+      400:
+        description: Lote vacío o inválido
+      413:
+        description: Lote demasiado grande
+      500:
+        description: Error interno
+    """
+    #endregion
+    
+    try:
+        cedulas, error = read_batch(request, "cedulas", "cedula", "cédulas", "verificar_cedula_batch_too_large")
+
+        if error:
+            return error
+
+        result = verificar_cedulas_lote(cedulas)
+
+        return success_response(result)
+
+    except Exception as e:
+        logger.error({"event": "verificar_cedula_batch_error", "detail": str(e)})
+        return error_response("Error al verificar cédulas", 500)
+
 @identity_bp.route("/identity/calcular-edad", methods=["POST"])
 @jwt_required()
 def edad():
@@ -210,17 +363,20 @@ def edad():
         logger.error({"event": "calcular_edad_error", "detail": str(e)})
         return error_response("Error al calcular edad", 500)
 
-@identity_bp.route("/identity/genero", methods=["POST"])
+@identity_bp.route("/identity/calcular-edad/batch", methods=["POST"])
 @jwt_required()
-def genero():
+def edad_lote():
     
-    #region Información API para obtener el género a partir del nombre
+    #region Información de API para calcular edades por lote
     """
-    Predecir género a partir de un nombre
+    Calcular edades por lote
     ---
     tags:
       - Utilitarios
-    description: Predice el género (masculino/femenino) basado en un nombre utilizando genderize.io
+    description: Calcula la edad de un arreglo JSON de fechas (YYYY-MM-DD) o de un CSV (Content-Type text/csv, primera columna) en una sola petición, con la misma fecha de hoy para todo el lote. Cada resultado coincide con el de /identity/calcular-edad.
+    consumes:
+      - application/json
+      - text/csv
     parameters:
       - name: body
         in: body
@@ -228,12 +384,15 @@ def genero():
         schema:
           type: object
           properties:
-            nombre:
-              type: string
-              example: "Juan"
+            fechas:
+              type: array
+              items:
+                type: string
+                format: date
+              example: ["2000-05-15", "2010-01-31"]
     responses:
       200:
-        description: Género predicho correctamente
+        description: Resumen y resultado por fecha
         schema:
           type: object
           properties:
@@ -242,19 +401,47 @@ def genero():
             data:
               type: object
               properties:
-                genero:
-                  type: string
-                probabilidad:
-                  type: number
+                total:
+                  type: integer
+                validas:
+                  type: integer
+                invalidas:
+                  type: integer
+                mayores_edad:
+                  type: integer
+                errores:
+                  type: object
+                resultados:
+                  type: array
+                  items:
+                    type: object
             error_message:
               type: string
       400:
-        description: Nombre inválido
+        description: Lote vacío o inválido
+      413:
+        description: Lote demasiado grande
       500:
         description: Error interno
     """
     #endregion
     
+    try:
+        fechas, error = read_batch(request, "fechas", "fecha_nacimiento", "fechas", "calcular_edad_batch_too_large")
+
+        if error:
+            return error
+
+        result = obtener_edades_lote(fechas)
+
+        return success_response(result)
+
+    except Exception as e:
+        logger.error({"event": "calcular_edad_batch_error", "detail": str(e)})
+        return error_response("Error al calcular edades", 500)
+
+async def atender_genero(service):
+    # Cuerpo compartido con la ruta nativa de app/asgi.py, que pasa la variante async del servicio
     try:
         data = request.get_json()
 
@@ -263,7 +450,7 @@ def genero():
 
         nombre = data["nombre"]
 
-        result = obtener_genero(nombre)
+        result = await service(nombre)
 
         logger.info({"event": "genero_success", "nombre": nombre})
 
@@ -271,4 +458,51 @@ def genero():
 
     except Exception as e:
         logger.error({"event": "genero_error", "detail": str(e)})
-        return error_response("Error al predecir género", 500)
\ No newline at end of file
+        return error_response("Error al predecir género", 500)
+
+@identity_bp.route("/identity/genero", methods=["POST"])
+@jwt_required()
+def genero():
+    
+    #region Información API para obtener el género a partir del nombre
+    """
+    Predecir género a partir de un nombre
+    ---
+    tags:
+      - Utilitarios
+    description: Predice el género (masculino/femenino) basado en un nombre utilizando genderize.io
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            nombre:
+              type: string
+              example: "Juan"
+    responses:
+      200:
+        description: Género predicho correctamente
+        schema:
+          type: object
+          properties:
+            is_success:
+              type: boolean
+            data:
+              type: object
+              properties:
+                genero:
+                  type: string
+                probabilidad:
+                  type: number
+            error_message:
+              type: string
+      400:
+        description: Nombre inválido
+      500:
+        description: Error interno
+    """
+    #endregion
+    
+    return run_sync(atender_genero(as_async(obtener_genero)))
@@ -0,0 +1,33 @@
+from flask import Blueprint, Response
+from app.services.metrics_service import render_metrics
+from app.logger_config import logger
+
+metrics_bp = Blueprint("metrics", __name__)
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    
+    #region Información API de métricas Prometheus
+    """
+    Métricas en formato Prometheus
+    ---
+    tags:
+      - Métricas
+    produces:
+      - text/plain
+    description: Histogramas de latencia por endpoint y clase de estado, peticiones en curso, APIs externas y cachés
+    responses:
+      200:
+        description: Métricas en formato de texto de Prometheus
+    """
+    #endregion
+
+    try:
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+    except Exception as e:
+        logger.error({
+            "event": "metrics_error",
+            "detail": str(e)
+        })
+        return Response("# error al generar métricas\n", status=500, mimetype="text/plain")
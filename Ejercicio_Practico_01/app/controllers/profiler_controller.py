@@ -0,0 +1,83 @@
+from flask import Blueprint, Response, request
+from flask_jwt_extended import get_jwt_identity
+from app.config import Config
+from app.middleware.profiler import profiler
+from app.utils.profiler import flamegraph_svg
+from app.utils.response import success_response, error_response
+from app.utils.tracing import jwt_required
+from app.logger_config import logger
+
+profiler_bp = Blueprint("profiler", __name__)
+
+@profiler_bp.route("/admin/profile", methods=["GET"])
+@jwt_required()
+def profile():
+    
+    #region Información API del profiler por muestreo
+    """
+    Perfil de CPU por muestreo (solo administradores)
+    ---
+    tags:
+      - Admin
+    security:
+      - Bearer: []
+    parameters:
+      - in: query
+        name: format
+        type: string
+        enum: [collapsed, svg, stats]
+        default: collapsed
+        description: Pilas colapsadas (texto), flame graph SVG o estadísticas del muestreo
+      - in: query
+        name: reset
+        type: boolean
+        default: false
+        description: Vacía los conteos después de leerlos
+    responses:
+      200:
+        description: Perfil acumulado desde el inicio o el último reset
+    """
+    #endregion
+
+    try:
+        username = get_jwt_identity()
+
+        if username not in Config.PROFILER_ADMINS:
+            logger.warning({
+                "event": "profiler_forbidden",
+                "username": username
+            })
+            return error_response("Acceso restringido a administradores", 403)
+
+        if not profiler.running:
+            return error_response("Profiler deshabilitado (PROFILER_ENABLED=false)", 404)
+
+        output = request.args.get("format", "collapsed")
+        reset = request.args.get("reset", "false").lower() in ("1", "true")
+
+        if output == "stats":
+            return success_response(profiler.stats())
+
+        if output not in ("collapsed", "svg"):
+            return error_response("Formato no soportado: use collapsed, svg o stats", 400)
+
+        collapsed = profiler.collapsed(reset=reset)
+
+        logger.info({
+            "event": "profiler_read",
+            "username": username,
+            "format": output,
+            "reset": reset
+        })
+
+        if output == "svg":
+            return Response(flamegraph_svg(collapsed, title="API - perfil de CPU"), mimetype="image/svg+xml")
+
+        return Response(collapsed, mimetype="text/plain")
+
+    except Exception as e:
+        logger.error({
+            "event": "profiler_error",
+            "detail": str(e)
+        })
+        return error_response("Error interno en profiler", 500)
@@ -1,6 +1,7 @@
 from flask import Blueprint, request
-from flask_jwt_extended import jwt_required
-from app.services.security_service import evaluate_password
+from app.utils.tracing import jwt_required
+from app.services.security_service import evaluate_password, evaluate_passwords, is_valid_password
+from app.utils.batch import read_batch
 from app.utils.response import success_response, error_response
 from app.logger_config import logger
 
@@ -16,7 +17,7 @@ def evaluar_password():
     ---
     tags:
       - Seguridad
-    description: Evalúa una contraseña según longitud, mayúsculas, minúsculas, números y caracteres especiales. Devuelve un puntaje y nivel de seguridad.
+    description: Evalúa una contraseña según longitud, mayúsculas, minúsculas, números y caracteres especiales. Devuelve un puntaje, nivel de seguridad, entropía estimada y si aparece en la lista local de contraseñas filtradas (una contraseña filtrada puntúa 0).
     parameters:
       - name: body
         in: body
@@ -56,6 +57,11 @@ def evaluar_password():
                       type: boolean
                     special:
                       type: boolean
+                entropia_bits:
+                  type: number
+                filtrada:
+                  type: boolean
+                  description: null si no hay filtro de contraseñas filtradas cargado
             error_message:
               type: string
       400:
@@ -76,7 +82,7 @@ def evaluar_password():
 
         password = data["password"]
 
-        if not isinstance(password, str) or not password.strip():
+        if not is_valid_password(password):
             logger.warning({
                 "event": "evaluar_password_invalid_input"
             })
@@ -95,4 +101,80 @@ def evaluar_password():
             "event": "evaluar_password_error",
             "detail": str(e)
         })
-        return error_response("Error al evaluar contraseña", 500)
\ No newline at end of file
+        return error_response("Error al evaluar contraseña", 500)
+
+@security_bp.route("/security/evaluar-password/batch", methods=["POST"])
+@jwt_required()
+def evaluar_password_lote():
+    
+    #region Información API para auditar contraseñas por lote
+    """
+    Evaluar contraseñas por lote
+    ---
+    tags:
+      - Seguridad
+    description: Evalúa un arreglo JSON de contraseñas o un CSV (Content-Type text/csv, primera columna) para auditorías de política. Cada resultado coincide con el de /security/evaluar-password y se devuelve en el mismo orden, sin repetir la contraseña.
+    consumes:
+      - application/json
+      - text/csv
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            passwords:
+              type: array
+              items:
+                type: string
+              example: ["Password1!", "x9#Lq!vR2m@T"]
+    responses:
+      200:
+        description: Resumen y resultado por contraseña
+        schema:
+          type: object
+          properties:
+            is_success:
+              type: boolean
+            data:
+              type: object
+              properties:
+                total:
+                  type: integer
+                invalidas:
+                  type: integer
+                filtradas:
+                  type: integer
+                niveles:
+                  type: object
+                filtro_cargado:
+                  type: boolean
+                resultados:
+                  type: array
+                  items:
+                    type: object
+            error_message:
+              type: string
+      400:
+        description: Lote vacío o inválido
+      413:
+        description: Lote demasiado grande
+      500:
+        description: Error interno
+    """
+    #endregion
+    
+    try:
+        passwords, error = read_batch(request, "passwords", "password", "contraseñas", "evaluar_password_batch_too_large")
+
+        if error:
+            return error
+
+        result = evaluate_passwords(passwords)
+
+        return success_response(result)
+
+    except Exception as e:
+        logger.error({"event": "evaluar_password_batch_error", "detail": str(e)})
+        return error_response("Error al evaluar contraseñas", 500)
@@ -1,8 +1,12 @@
-from flask import Blueprint, request
-from flask_jwt_extended import jwt_required
-from app.services.text_service import normalizar_texto, limpiar_caracteres
+import json
+from flask import Blueprint, Response, request, current_app, stream_with_context
+from app.utils.tracing import jwt_required
+from app.services.text_service import (normalizar_texto, normalizar_textos, normalizar_stream, limpiar_caracteres,
+                                       normalizar_documento, limpiar_documento)
+from app.utils.batch import read_batch, iter_ndjson
 from app.utils.response import success_response, error_response
 from app.logger_config import logger
+from app.config import Config
 
 text_bp = Blueprint("text", __name__)
 
@@ -69,6 +73,74 @@ def normalizar():
         })
         return error_response("Error interno en text", 500)
 
+@text_bp.route("/text/normalizar/batch", methods=["POST"])
+@jwt_required()
+def normalizar_lote():
+    
+    #region Información API para normalizar textos por lote
+    """
+    Normalizar textos por lote
+    ---
+    tags:
+      - Text
+    security:
+      - Bearer: []
+    description: Normaliza un arreglo JSON de textos, un CSV (Content-Type text/csv, primera columna) o un NDJSON (Content-Type application/x-ndjson, una cadena o un objeto {"texto":...} por línea). Cada resultado coincide con el de /text/normalizar. Con NDJSON la respuesta también es NDJSON, una línea por texto en el mismo orden, y se envía a medida que se procesa.
+    consumes:
+      - application/json
+      - text/csv
+      - application/x-ndjson
+    produces:
+      - application/json
+      - application/x-ndjson
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            textos:
+              type: array
+              items:
+                type: string
+              example: ["  José   Pérez ", "Ñandú del Ecuador"]
+    responses:
+      200:
+        description: Resumen y resultado por texto (JSON) o una línea por texto (NDJSON)
+      400:
+        description: Lote vacío o inválido
+      401:
+        description: Token inválido o faltante
+      413:
+        description: Lote demasiado grande
+    """
+    #endregion
+    
+    try:
+        if request.mimetype == "application/x-ndjson":
+            max_items = current_app.config["BATCH_MAX_ITEMS"]
+            results = normalizar_stream(iter_ndjson(request.stream, "texto"), max_items)
+            lines = (json.dumps(item, ensure_ascii=False) + "\n" for item in results)
+
+            return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
+        textos, error = read_batch(request, "textos", "texto", "textos", "normalizar_texto_batch_too_large")
+
+        if error:
+            return error
+
+        result = normalizar_textos(textos)
+
+        return success_response(result)
+
+    except Exception as e:
+        logger.error({
+            "event": "normalizar_texto_batch_error",
+            "detail": str(e)
+        })
+        return error_response("Error interno en text", 500)
+
 @text_bp.route("/text/limpiar", methods=["POST"])
 @jwt_required()
 def limpiar():
@@ -129,4 +201,93 @@ def limpiar():
             "event": "limpiar_texto_controller_error",
             "detail": str(e)
         })
-        return error_response("Error interno en text", 500)
\ No newline at end of file
+        return error_response("Error interno en text", 500)
+
+@text_bp.route("/text/normalizar/stream", methods=["POST"])
+@jwt_required()
+def normalizar_documento_stream():
+    
+    #region Información API para normalizar un documento grande
+    """
+    Normalizar un documento de texto en streaming
+    ---
+    tags:
+      - Text
+    security:
+      - Bearer: []
+    description: Recibe el documento como texto plano UTF-8 (cuerpo de la petición, sin JSON) y devuelve el texto normalizado en una respuesta por partes (chunked). El resultado es el mismo que el campo normalizado de /text/normalizar; la memoria usada no depende del tamaño del documento.
+    consumes:
+      - text/plain
+    produces:
+      - text/plain
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: string
+          example: "  TraTamiEnto   De DaTos  "
+    responses:
+      200:
+        description: Texto normalizado
+      400:
+        description: Documento vacío
+      401:
+        description: Token inválido o faltante
+    """
+    #endregion
+    
+    return _stream_document(normalizar_documento, "normalizar_documento_stream_error")
+
+@text_bp.route("/text/limpiar/stream", methods=["POST"])
+@jwt_required()
+def limpiar_documento_stream():
+    
+    #region Información API para limpiar un documento grande
+    """
+    Limpiar un documento de texto en streaming
+    ---
+    tags:
+      - Text
+    security:
+      - Bearer: []
+    description: Recibe el documento como texto plano UTF-8 (cuerpo de la petición, sin JSON) y devuelve el texto limpio en una respuesta por partes (chunked). El resultado es el mismo que el campo limpio de /text/limpiar; la memoria usada no depende del tamaño del documento.
+    consumes:
+      - text/plain
+    produces:
+      - text/plain
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: string
+          example: "Tra##T#am*iEnto De D!$atO$$$S"
+    responses:
+      200:
+        description: Texto limpio
+      400:
+        description: Documento vacío
+      401:
+        description: Token inválido o faltante
+    """
+    #endregion
+    
+    return _stream_document(limpiar_documento, "limpiar_documento_stream_error")
+
+def _stream_document(process, error_event):
+    try:
+        # Se lee request.stream por partes: el cuerpo nunca se carga completo
+        chunks = process(request.stream.read, Config.TEXT_STREAM_CHUNK_BYTES)
+
+        if chunks is None:
+            return error_response("El texto no puede estar vacío", 400)
+
+        return Response(stream_with_context(chunks), content_type="text/plain; charset=utf-8")
+
+    except Exception as e:
+        logger.error({
+            "event": error_event,
+            "detail": str(e)
+        })
+        return error_response("Error interno en text", 500)
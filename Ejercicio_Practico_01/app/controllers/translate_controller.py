@@ -1,15 +1,58 @@
-from flask_jwt_extended import jwt_required
+from app.utils.tracing import jwt_required
 from flask import Blueprint, request
-from app.services.translate_service import translate_text
+from app.services.translate_service import translate_text, translate_batch
 from app.logger_config import logger
 from app.utils.response import success_response, error_response
+from app.utils.async_bridge import as_async, run_sync
+from app.config import Config
 
 translate_bp = Blueprint("translate", __name__)
 
+async def atender_translate(service):
+    # Cuerpo compartido con la ruta nativa de app/asgi.py, que pasa la variante async del servicio
+    try:
+        data = request.get_json(silent=True) or {}
+
+        text = data.get("text")
+        target = data.get("target_language", "en")
+
+        # Validaciones
+        if not isinstance(text, str) or not text.strip():
+            logger.warning({"event": "translate_validation", "detail": "text requerido", "payload": data})
+            return error_response("Campo 'text' es requerido", 400)
+
+        if not isinstance(target, str) or len(target.strip()) != 2:
+            logger.warning({"event": "translate_validation", "detail": "target_language inválido", "payload": data})
+            return error_response("Campo 'target_language' debe ser ISO 639-1 (ej: 'en')", 400)
+
+        result = await service(text.strip(), target.strip())
+
+        if not isinstance(result, dict):
+            logger.error({"event": "translate_service_contract_error", "detail": "translate_text no devolvió dict"})
+            return error_response("Error interno en translate", 500)
+
+        if not result.get("success"):
+            logger.error({"event": "translate_service_failed", "detail": result.get("error"), "payload": data})
+            return error_response(result.get("error", "Error traduciendo"), 500)
+
+        payload = {
+            "original": result.get("original"),
+            "translated": result.get("translated"),
+            "target_language": result.get("target_language", target.strip()),
+        }
+
+        logger.info({"event": "translate_success", "target_language": payload["target_language"]})
+        return success_response(payload)  # (json, 200) si tu helper lo hace así
+
+    except Exception as e:
+        logger.exception({"event": "translate_controller_error", "detail": str(e)})
+        return error_response("Error interno en translate", 500)
+
 @translate_bp.route("/translate", methods=["POST"])
 @jwt_required()
 def translate_endpoint():
     
+    #region Información API para traducir un texto
     """
     Traduce un texto a un idioma destino usando Google Translate API.
     ---
@@ -45,41 +88,107 @@ def translate_endpoint():
       500:
         description: Error interno del servidor
     """
+    #endregion
+    
+    return run_sync(atender_translate(as_async(translate_text)))
+
+@translate_bp.route("/translate/batch", methods=["POST"])
+@jwt_required()
+def translate_batch_endpoint():
+    
+    #region Información API para traducir textos por lote
+    """
+    Traduce varios segmentos en una sola petición, usando la memoria de traducción.
+    ---
+    tags:
+      - Traducción
+    security:
+      - Bearer: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        description: JSON con los segmentos a traducir y el idioma destino
+        schema:
+          type: object
+          required:
+            - texts
+          properties:
+            texts:
+              type: array
+              items:
+                type: string
+              example: ["Hola mundo", "Buenos días"]
+            target_language:
+              type: string
+              description: Código ISO 639-1 del idioma destino
+              example: "en"
+            source_language:
+              type: string
+              description: Código ISO 639-1 del idioma origen (opcional, por defecto autodetección)
+              example: "es"
+    responses:
+      200:
+        description: Traducciones en el mismo orden de los segmentos recibidos
+      400:
+        description: Error de validación
+      401:
+        description: Token inválido o faltante
+      500:
+        description: Error interno del servidor
+    """
+    #endregion
     
     try:
         data = request.get_json(silent=True) or {}
 
-        text = data.get("text")
+        texts = data.get("texts")
         target = data.get("target_language", "en")
+        source = data.get("source_language")
 
         # Validaciones
-        if not isinstance(text, str) or not text.strip():
-            logger.warning({"event": "translate_validation", "detail": "text requerido", "payload": data})
-            return error_response("Campo 'text' es requerido", 400)
+        if not isinstance(texts, list) or not texts:
+            logger.warning({"event": "translate_batch_validation", "detail": "texts requerido"})
+            return error_response("Campo 'texts' es requerido (arreglo no vacío)", 400)
+
+        if len(texts) > Config.BATCH_MAX_ITEMS:
+            return error_response(f"El lote no puede superar {Config.BATCH_MAX_ITEMS} segmentos", 413)
+
+        if not all(isinstance(text, str) and text.strip() for text in texts):
+            logger.warning({"event": "translate_batch_validation", "detail": "segmento vacío o inválido"})
+            return error_response("Cada segmento de 'texts' debe ser un texto no vacío", 400)
 
         if not isinstance(target, str) or len(target.strip()) != 2:
-            logger.warning({"event": "translate_validation", "detail": "target_language inválido", "payload": data})
+            logger.warning({"event": "translate_batch_validation", "detail": "target_language inválido"})
             return error_response("Campo 'target_language' debe ser ISO 639-1 (ej: 'en')", 400)
 
-        result = translate_text(text.strip(), target.strip())
+        if source is not None and (not isinstance(source, str) or len(source.strip()) != 2):
+            logger.warning({"event": "translate_batch_validation", "detail": "source_language inválido"})
+            return error_response("Campo 'source_language' debe ser ISO 639-1 (ej: 'es')", 400)
 
-        if not isinstance(result, dict):
-            logger.error({"event": "translate_service_contract_error", "detail": "translate_text no devolvió dict"})
-            return error_response("Error interno en translate", 500)
+        result = translate_batch(
+            [text.strip() for text in texts],
+            target.strip(),
+            source.strip() if source else None
+        )
 
         if not result.get("success"):
-            logger.error({"event": "translate_service_failed", "detail": result.get("error"), "payload": data})
+            logger.error({"event": "translate_batch_failed", "detail": result.get("error")})
             return error_response(result.get("error", "Error traduciendo"), 500)
 
-        payload = {
-            "original": result.get("original"),
-            "translated": result.get("translated"),
-            "target_language": result.get("target_language", target.strip()),
-        }
+        logger.info({
+            "event": "translate_batch_success",
+            "target_language": result["target_language"],
+            "segments": len(texts),
+            "cached": result["cached"]
+        })
 
-        logger.info({"event": "translate_success", "target_language": payload["target_language"]})
-        return success_response(payload)  # (json, 200) si tu helper lo hace así
+        return success_response({
+            "translations": result["translations"],
+            "target_language": result["target_language"],
+            "cached": result["cached"]
+        })
 
     except Exception as e:
-        logger.exception({"event": "translate_controller_error", "detail": str(e)})
-        return error_response("Error interno en translate", 500)
\ No newline at end of file
+        logger.exception({"event": "translate_batch_controller_error", "detail": str(e)})
+        return error_response("Error interno en translate", 500)
@@ -1,28 +1,242 @@
+import atexit
+import glob
+import gzip
 import logging
 import os
 import json
+import queue
+import shutil
+import sys
+import threading
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from zoneinfo import ZoneInfo
+from app.config import Config
 
 LOG_DIR = "logs"
 LOG_FILE = os.path.join(LOG_DIR, "app.log")
+SLOW_LOG_FILE = os.path.join(LOG_DIR, "slow_requests.log")
+
+# Zona horaria resuelta una sola vez (ZoneInfo consulta la base tz en cada construcción)
+LOG_TZ = ZoneInfo("America/Guayaquil")
 
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
 
 class JsonFormatter(logging.Formatter):
+
+    # Codificador reutilizable; default=str cubre valores no serializables (Decimal, datetime...)
+    _encoder = json.JSONEncoder(default=str)
+
+    # Campos que escribe el formatter; los eventos no pueden pisarlos
+    RESERVED = frozenset({"timestamp", "level", "message", "sample_rate", "exc_info"})
+
     def format(self, record):
         log_record = {
-            "timestamp": datetime.now(ZoneInfo("America/Guayaquil")).isoformat(),
-            "level": record.levelname,
-            "message": record.getMessage()
+            "timestamp": datetime.fromtimestamp(record.created, LOG_TZ).isoformat(),
+            "level": record.levelname
         }
-        return json.dumps(log_record)
+
+        # Los eventos dict se escriben como campos JSON reales, no como su str().
+        # Una clave que choca con un campo propio del formatter se conserva con
+        # prefijo "msg_" en lugar de perderse
+        if isinstance(record.msg, dict) and not record.args:
+            for key, value in record.msg.items():
+                while key in self.RESERVED or key in log_record:
+                    key = "msg_" + key
+                log_record[key] = value
+        else:
+            log_record["message"] = record.getMessage()
+
+        # Eventos muestreados: permite reponderar los conteos al analizar
+        if getattr(record, "sample_rate", None) is not None:
+            log_record["sample_rate"] = record.sample_rate
+
+        if record.exc_info:
+            log_record["exc_info"] = self.formatException(record.exc_info)
+
+        return self._encoder.encode(log_record)
+
+class DictQueueHandler(QueueHandler):
+    """
+    QueueHandler que no formatea en el hilo de la petición.
+
+    El QueueHandler estándar convierte el mensaje a texto antes de encolarlo, lo
+    que aplanaría los eventos dict; aquí solo se congela una copia del mensaje y
+    el JSON se genera en el hilo escritor.
+    """
+
+    def prepare(self, record):
+        if isinstance(record.msg, dict) and not record.args:
+            record.msg = dict(record.msg)
+        else:
+            record.msg = record.getMessage()
+            record.args = None
+
+        return record
+
+class EventSampler(logging.Filter):
+    """
+    Muestreo por evento para los info de alto volumen.
+
+    Con `rates = {"cedula_validated": 0.1}` se conserva exactamente 1 de cada 10
+    registros de ese evento (de forma determinista). Los warnings y errores, y
+    los eventos sin tasa configurada, pasan siempre.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self._counters = {event: [0, 0] for event in rates}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not isinstance(record.msg, dict):
+            return True
+
+        rate = self.rates.get(record.msg.get("event"))
+
+        if rate is None:
+            return True
+
+        with self._lock:
+            counter = self._counters[record.msg["event"]]
+            counter[0] += 1
+            # Se conserva cada vez que seen * rate cruza un entero
+            keep = int(counter[0] * rate) > int((counter[0] - 1) * rate)
+
+            if keep:
+                counter[1] += 1
+
+        record.sample_rate = rate
+        return keep
+
+    def stats(self):
+        with self._lock:
+            return {
+                event: {"rate": self.rates[event], "seen": seen, "kept": kept}
+                for event, (seen, kept) in self._counters.items()
+            }
+
+def parse_sample_rates(spec):
+    rates = {}
+
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, rate = item.partition("=")
+        rates[event.strip()] = min(max(float(rate), 0.0), 1.0)
+
+    return rates
+
+class SizeTimedRotatingFileHandler(RotatingFileHandler):
+    """
+    Rota por tamaño (`max_bytes`) o por antigüedad (`interval` segundos), lo que
+    ocurra primero. El archivo rotado recibe un sufijo con la fecha y se comprime
+    con gzip en un hilo aparte, para no frenar al escritor; luego se aplica la
+    retención (máximo `backup_count` archivos y `retention_days` días).
+    """
+
+    def __init__(self, filename, max_bytes, interval, backup_count, retention_days):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.interval = interval
+        self.retention_days = retention_days
+        start = os.stat(filename).st_mtime if os.path.exists(filename) else time.time()
+        self.rollover_at = start + interval
+        self._compress_queue = queue.SimpleQueue()
+        self._compressor = None
+
+        # Rotados que quedaron sin comprimir (p. ej. el proceso terminó antes)
+        for path in glob.glob(glob.escape(self.baseFilename) + ".*"):
+            if not path.endswith(".gz"):
+                self._submit(path)
+
+    def shouldRollover(self, record):
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        rotated = f"{self.baseFilename}.{datetime.now(LOG_TZ):%Y%m%d-%H%M%S}"
+        suffix = 1
+
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = f"{self.baseFilename}.{datetime.now(LOG_TZ):%Y%m%d-%H%M%S}-{suffix}"
+            suffix += 1
+
+        if os.path.exists(self.baseFilename):
+            os.rename(self.baseFilename, rotated)
+            self._submit(rotated)
+
+        self.rollover_at = time.time() + self.interval
+        self.stream = self._open()
+
+    def _submit(self, path):
+        if self._compressor is None or not self._compressor.is_alive():
+            self._compressor = threading.Thread(target=self._compress_loop, name="log-compressor", daemon=True)
+            self._compressor.start()
+
+        self._compress_queue.put(path)
+
+    def _compress_loop(self):
+        while True:
+            path = self._compress_queue.get()
+
+            try:
+                with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(path)
+                self._apply_retention()
+            except OSError as e:
+                # No se puede usar el propio logger: el error volvería a este handler.
+                # Va a stderr, como logging.Handler.handleError
+                sys.stderr.write(json.dumps({"event": "log_compress_error", "file": path, "detail": str(e)}) + "\n")
+
+    def _apply_retention(self):
+        backups = sorted(glob.glob(glob.escape(self.baseFilename) + ".*.gz"), key=os.path.getmtime, reverse=True)
+        cutoff = time.time() - self.retention_days * 86400
+
+        for i, path in enumerate(backups):
+            if i >= self.backupCount or os.path.getmtime(path) < cutoff:
+                os.remove(path)
 
 logger = logging.getLogger("app_logger")
 logger.setLevel(logging.INFO)
 
-file_handler = logging.FileHandler(LOG_FILE)
-file_handler.setFormatter(JsonFormatter())
+# El muestreo ocurre antes de encolar: los registros descartados no cuestan E/S
+event_sampler = EventSampler(parse_sample_rates(Config.LOG_SAMPLE_RATES))
+logger.addFilter(event_sampler)
+
+def _queued(target_logger, path):
+    handler = SizeTimedRotatingFileHandler(
+        path,
+        max_bytes=Config.LOG_MAX_BYTES,
+        interval=Config.LOG_ROTATE_SECONDS,
+        backup_count=Config.LOG_BACKUP_COUNT,
+        retention_days=Config.LOG_RETENTION_DAYS
+    )
+    handler.setFormatter(JsonFormatter())
+
+    # Las peticiones solo encolan; un hilo en segundo plano escribe en disco
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    target_logger.addHandler(DictQueueHandler(log_queue))
+    return listener
+
+queue_listener = _queued(logger, LOG_FILE)
+
+# Árboles de spans de las peticiones lentas, en un archivo aparte
+slow_logger = logging.getLogger("app_slow_requests")
+slow_logger.setLevel(logging.INFO)
+slow_logger.propagate = False
+slow_queue_listener = _queued(slow_logger, SLOW_LOG_FILE)
 
-logger.addHandler(file_handler)
\ No newline at end of file
+def sampling_stats():
+    return event_sampler.stats()
@@ -0,0 +1,25 @@
+from app.config import Config
+from app.utils.profiler import SamplingProfiler
+
+profiler = SamplingProfiler(
+    interval_ms=Config.PROFILER_INTERVAL_MS,
+    max_depth=Config.PROFILER_MAX_DEPTH,
+    max_stacks=Config.PROFILER_MAX_STACKS,
+    max_overhead=Config.PROFILER_MAX_OVERHEAD
+)
+
+def register_profiler(app):
+
+    # Opt-in: sin PROFILER_ENABLED no hay hilo ni hooks por petición
+    if not Config.PROFILER_ENABLED:
+        return
+
+    @app.before_request
+    def profile_enter():
+        profiler.enter()
+
+    @app.teardown_request
+    def profile_exit(error=None):
+        profiler.exit()
+
+    profiler.start()
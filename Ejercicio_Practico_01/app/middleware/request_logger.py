@@ -1,23 +1,49 @@
 import time
-from flask import request
+from flask import g, request
 from app.logger_config import logger
+from app.utils.metrics import ThreadShardedHistograms
+from app.utils.tracing import span
+
+# Latencia por (endpoint, método, clase de estado) y peticiones en curso por endpoint
+request_metrics = ThreadShardedHistograms()
+
+def _endpoint():
+    # Nombre del endpoint Flask (p. ej. "geo.localizar_ip"): cardinalidad acotada
+    return request.endpoint or "unmatched"
 
 def register_request_logging(app):
 
     @app.before_request
     def start_timer():
-        request.start_time = time.time()
+        request.start_ns = time.perf_counter_ns()
+        g.inflight_endpoint = _endpoint()
+        request_metrics.track_inflight(g.inflight_endpoint, 1)
 
     @app.after_request
     def log_request(response):
-        duration = round((time.time() - request.start_time) * 1000, 2)
+        elapsed_ns = time.perf_counter_ns() - request.start_ns
+        duration = round(elapsed_ns / 1e6, 2)
+
+        request_metrics.observe_ns(
+            (_endpoint(), request.method, f"{response.status_code // 100}xx"),
+            elapsed_ns
+        )
+
+        with span("log"):
+            logger.info({
+                "endpoint": request.path,
+                "method": request.method,
+                "status_code": response.status_code,
+                "response_time_ms": duration,
+                "client_ip": request.remote_addr,
+                "request_id": g.get("request_id")
+            })
+
+        return response
 
-        logger.info({
-            "endpoint": request.path,
-            "method": request.method,
-            "status_code": response.status_code,
-            "response_time_ms": duration,
-            "client_ip": request.remote_addr
-        })
+    @app.teardown_request
+    def finish_request(error=None):
+        endpoint = g.pop("inflight_endpoint", None)
 
-        return response
\ No newline at end of file
+        if endpoint is not None:
+            request_metrics.track_inflight(endpoint, -1)
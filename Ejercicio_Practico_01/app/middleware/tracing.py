@@ -0,0 +1,38 @@
+import re
+from flask import g, request
+from app.config import Config
+from app.logger_config import slow_logger
+from app.utils.tracing import new_request_id, server_timing, start_trace, trace_tree
+
+# Solo se acepta un X-Request-ID entrante "seguro" para los logs
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+def register_tracing(app):
+
+    @app.before_request
+    def open_trace():
+        incoming = request.headers.get("X-Request-ID", "")
+        start_trace(incoming if REQUEST_ID_PATTERN.fullmatch(incoming) else new_request_id())
+
+    @app.after_request
+    def close_trace(response):
+        if "trace_root" not in g:
+            return response
+
+        response.headers["X-Request-ID"] = g.request_id
+        response.headers["Server-Timing"] = server_timing()
+
+        duration_ms = g.trace_root.duration_ns / 1e6
+
+        if duration_ms >= Config.TRACE_SLOW_MS:
+            slow_logger.warning({
+                "event": "slow_request",
+                "request_id": g.request_id,
+                "method": request.method,
+                "endpoint": request.path,
+                "status_code": response.status_code,
+                "duration_ms": round(duration_ms, 3),
+                "spans": trace_tree()
+            })
+
+        return response
@@ -1,11 +1,13 @@
-import smtplib
 import uuid
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from app.config import Config
 from app.logger_config import logger
+from app.services.email_service import email_queue
+from app.utils.tracing import traced
 
 
+@traced()
 def register_user_service(data):
 
     try:
@@ -17,11 +19,14 @@ def register_user_service(data):
         # URL ficticia
         reset_url = f"https://mcib_tratamientodatos_2026.com/reset-password/{reset_token}"
 
-        send_registration_email(email, data["name"], data["last_name"], reset_url)
+        # El correo se envía en segundo plano; aquí solo se encola
+        email_id = send_registration_email(email, data["name"], data["last_name"], reset_url)
 
         return True, {
             "message": "Usuario registrado exitosamente. Revise su correo.",
-            "reset_password_url": reset_url
+            "reset_password_url": reset_url,
+            "email_id": email_id,
+            "email_status": "queued"
         }
 
     except Exception as e:
@@ -32,6 +37,7 @@ def register_user_service(data):
         return False, "Error al registrar usuario"
 
 
+@traced()
 def send_registration_email(to_email, name, last_name, reset_url):
 
     msg = MIMEMultipart()
@@ -53,13 +59,16 @@ def send_registration_email(to_email, name, last_name, reset_url):
 
     msg.attach(MIMEText(body, "plain"))
 
-    server = smtplib.SMTP(Config.SMTP_SERVER, Config.SMTP_PORT)
-    server.starttls()
-    server.login(Config.SMTP_USER, Config.SMTP_PASSWORD)
-    server.send_message(msg)
-    server.quit()
+    email_id = email_queue.enqueue(msg)
 
     logger.info({
-        "event": "registration_email_sent",
-        "email": to_email
-    })
\ No newline at end of file
+        "event": "registration_email_queued",
+        "email": to_email,
+        "message_id": email_id
+    })
+
+    return email_id
+
+
+def get_email_status_service(email_id):
+    return email_queue.status(email_id)
\ No newline at end of file
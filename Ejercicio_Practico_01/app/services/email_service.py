@@ -0,0 +1,163 @@
+import queue
+import random
+import smtplib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from app.config import Config
+from app.logger_config import logger
+
+# Errores SMTP que vale la pena reintentar (red caída, servidor ocupado, 4xx)
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError)
+
+
+class EmailQueue:
+    """
+    Cola de envío de correos en segundo plano.
+
+    Cada worker mantiene abierta su propia sesión SMTP autenticada y la reutiliza
+    para muchos mensajes; la sesión se cierra tras un rato sin trabajo o al llegar
+    a SMTP_MAX_PER_SESSION envíos. Los fallos transitorios se reintentan con
+    backoff y el estado de cada mensaje se puede consultar por su id.
+    """
+
+    def __init__(self, workers, max_retries, idle_timeout, max_per_session, status_size=10000):
+        self._queue = queue.Queue()
+        self._workers = workers
+        self._max_retries = max_retries
+        self._idle_timeout = idle_timeout
+        self._max_per_session = max_per_session
+        self._status = OrderedDict()
+        self._status_size = status_size
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def enqueue(self, msg):
+        message_id = str(uuid.uuid4())
+        # El destinatario no se guarda en el estado: se consulta solo por id
+        self._set_status(message_id, "queued", attempts=0)
+        self._ensure_started()
+        self._queue.put((message_id, msg))
+
+        return message_id
+
+    def status(self, message_id):
+        with self._lock:
+            entry = self._status.get(message_id)
+            return dict(entry) if entry else None
+
+    def _set_status(self, message_id, status, **fields):
+        with self._lock:
+            entry = self._status.setdefault(message_id, {})
+            entry.update(fields, status=status, updated_at=time.time())
+            self._status.move_to_end(message_id)
+
+            # Solo se conservan los estados más recientes
+            while len(self._status) > self._status_size:
+                self._status.popitem(last=False)
+
+    def _ensure_started(self):
+        # Arranque perezoso: también funciona tras un fork del servidor WSGI
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+
+            for i in range(len(self._threads), self._workers):
+                thread = threading.Thread(target=self._work, name=f"email-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        session = None
+        sent_in_session = 0
+
+        while True:
+            try:
+                message_id, msg = self._queue.get(timeout=self._idle_timeout)
+            except queue.Empty:
+                session = _close(session)
+                continue
+
+            if session is not None and sent_in_session >= self._max_per_session:
+                session = _close(session)
+
+            for attempt in range(1, self._max_retries + 2):
+                self._set_status(message_id, "sending", attempts=attempt)
+
+                try:
+                    if session is None:
+                        session = _connect()
+                        sent_in_session = 0
+
+                    session.send_message(msg)
+                    sent_in_session += 1
+
+                    self._set_status(message_id, "sent", error=None)
+                    logger.info({
+                        "event": "registration_email_sent",
+                        "email": msg["To"],
+                        "message_id": message_id
+                    })
+                    break
+
+                except (smtplib.SMTPResponseException, *TRANSIENT_ERRORS) as e:
+                    session = _close(session)
+                    transient = not isinstance(e, smtplib.SMTPResponseException) or 400 <= e.smtp_code < 500
+
+                    if not transient or attempt > self._max_retries:
+                        self._set_status(message_id, "failed", error=str(e))
+                        logger.error({
+                            "event": "registration_email_failed",
+                            "email": msg["To"],
+                            "message_id": message_id,
+                            "attempts": attempt,
+                            "detail": str(e)
+                        })
+                        break
+
+                    self._set_status(message_id, "retrying", error=str(e))
+                    time.sleep(random.uniform(0, Config.SMTP_RETRY_BACKOFF * (2 ** (attempt - 1))))
+
+                except Exception as e:
+                    session = _close(session)
+                    self._set_status(message_id, "failed", error=str(e))
+                    logger.error({
+                        "event": "registration_email_failed",
+                        "email": msg["To"],
+                        "message_id": message_id,
+                        "attempts": attempt,
+                        "detail": str(e)
+                    })
+                    break
+
+            self._queue.task_done()
+
+
+def _connect():
+    server = smtplib.SMTP(Config.SMTP_SERVER, Config.SMTP_PORT, timeout=Config.SMTP_TIMEOUT)
+
+    if Config.SMTP_STARTTLS:
+        server.starttls()
+
+    if Config.SMTP_USER and Config.SMTP_PASSWORD:
+        server.login(Config.SMTP_USER, Config.SMTP_PASSWORD)
+
+    return server
+
+
+def _close(session):
+    if session is not None:
+        try:
+            session.quit()
+        except Exception:
+            session.close()
+
+    return None
+
+
+email_queue = EmailQueue(
+    workers=Config.SMTP_WORKERS,
+    max_retries=Config.SMTP_MAX_RETRIES,
+    idle_timeout=Config.SMTP_IDLE_TIMEOUT,
+    max_per_session=Config.SMTP_MAX_PER_SESSION
+)
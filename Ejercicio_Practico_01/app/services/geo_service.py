@@ -1,18 +1,116 @@
-import requests
+import asyncio
+import httpx
 from requests.exceptions import Timeout, ConnectionError, HTTPError, RequestException
 from app.config import Config
 from app.logger_config import logger
+from app.utils.cache import TTLCache, MISSING
+from app.utils.http_client import get_client, get_async_client
+from app.utils.resilience import UpstreamUnavailable
+from app.utils.tracing import traced
 
+_geo_cache = TTLCache(
+    "geo",
+    max_entries=Config.GEO_CACHE_MAX_ENTRIES,
+    persist_path=Config.GEO_CACHE_DB,
+    persist_max_entries=Config.GEO_CACHE_DB_MAX_ENTRIES,
+    stale_seconds=Config.CACHE_STALE_SECONDS
+)
 
+
+@traced()
 def get_geo_info(ip: str):
+    cached = _geo_cache.get(ip)
+
+    if cached is not MISSING:
+        return cached
+
     try:
-        response = requests.get(f"{Config.IP_GEO_URL}/{ip}",timeout=Config.REQUEST_TIMEOUT)
+        result = _fetch_geo_info(ip)
+    except UpstreamUnavailable as e:
+        return _geo_fallback(ip, e)
+
+    # Los fallos también se cachean, con un TTL corto, para no martillar al upstream
+    ttl = Config.GEO_CACHE_NEGATIVE_TTL if "error" in result else Config.GEO_CACHE_TTL
+    _geo_cache.set(ip, result, ttl)
+
+    return result
+
+
+async def get_geo_info_async(ip: str):
+    # La caché tiene un nivel SQLite: sus lecturas y escrituras van a un hilo
+    # para no bloquear el event loop
+    cached = await asyncio.to_thread(_geo_cache.get, ip)
+
+    if cached is not MISSING:
+        return cached
+
+    try:
+        result = await _fetch_geo_info_async(ip)
+    except UpstreamUnavailable as e:
+        return await asyncio.to_thread(_geo_fallback, ip, e)
+
+    ttl = Config.GEO_CACHE_NEGATIVE_TTL if "error" in result else Config.GEO_CACHE_TTL
+    await asyncio.to_thread(_geo_cache.set, ip, result, ttl)
+
+    return result
+
+
+def geo_cache_stats():
+    return _geo_cache.stats()
+
+
+def _fetch_geo_info(ip: str):
+    try:
+        response = get_client("geo").get(f"{Config.IP_GEO_URL}/{ip}")
 
         # Verificar status HTTP
         response.raise_for_status()
         data = response.json()
 
-    except Timeout:
+    except (RequestException, ValueError) as e:
+        return _geo_error(ip, e)
+
+    return _geo_result(ip, data)
+
+
+async def _fetch_geo_info_async(ip: str):
+    try:
+        response = await get_async_client("geo").get(f"{Config.IP_GEO_URL}/{ip}")
+
+        # Verificar status HTTP
+        response.raise_for_status()
+        data = response.json()
+
+    except (RequestException, httpx.HTTPError, ValueError) as e:
+        return _geo_error(ip, e)
+
+    return _geo_result(ip, data)
+
+
+def _geo_fallback(ip, e):
+    # Upstream no disponible: dato vencido de la caché si existe, si no error inmediato.
+    # No se cachea el error, para consultar de nuevo en cuanto el circuito se cierre.
+    stale = _geo_cache.get_stale(ip)
+
+    if stale is not MISSING and "error" not in stale:
+        logger.warning({
+            "evento": "geo_stale_served",
+            "ip": ip,
+            "motivo": e.reason
+        })
+        return stale
+
+    logger.warning({
+        "evento": "geo_unavailable",
+        "ip": ip,
+        "motivo": e.reason
+    })
+    return {"error": "El servicio de geolocalización no está disponible temporalmente"}
+
+
+def _geo_error(ip, e):
+    # Mismo mapeo de errores para requests (síncrono) y httpx (asíncrono)
+    if isinstance(e, (Timeout, httpx.TimeoutException)):
         logger.error({
             "evento": "geo_timeout",
             "ip": ip,
@@ -20,7 +118,7 @@ def get_geo_info(ip: str):
         })
         return {"error": "El servicio de geolocalización tardó demasiado en responder"}
 
-    except ConnectionError:
+    if isinstance(e, (ConnectionError, httpx.TransportError)):
         logger.error({
             "evento": "geo_connection_error",
             "ip": ip,
@@ -28,16 +126,16 @@ def get_geo_info(ip: str):
         })
         return {"error": "No se pudo conectar con el servicio de geolocalización"}
 
-    except HTTPError as e:
+    if isinstance(e, (HTTPError, httpx.HTTPStatusError)):
         logger.error({
             "evento": "geo_http_error",
             "ip": ip,
-            "status_code": response.status_code,
+            "status_code": e.response.status_code,
             "detalle": str(e)
         })
         return {"error": "Error en el servicio externo de geolocalización"}
 
-    except ValueError:
+    if isinstance(e, ValueError):
         logger.error({
             "evento": "geo_json_error",
             "ip": ip,
@@ -45,14 +143,15 @@ def get_geo_info(ip: str):
         })
         return {"error": "Respuesta inválida del servicio externo"}
 
-    except RequestException as e:
-        logger.error({
-            "evento": "geo_request_exception",
-            "ip": ip,
-            "detalle": str(e)
-        })
-        return {"error": "Error inesperado al consultar geolocalización"}
+    logger.error({
+        "evento": "geo_request_exception",
+        "ip": ip,
+        "detalle": str(e)
+    })
+    return {"error": "Error inesperado al consultar geolocalización"}
+
 
+def _geo_result(ip, data):
     # Validar estructura esperada
     if not data.get("success", False):
         logger.warning({
@@ -70,4 +169,4 @@ def get_geo_info(ip: str):
         "latitud": data.get("latitude"),
         "longitud": data.get("longitude"),
         "timezone": data.get("timezone", {}).get("id")
-    }
\ No newline at end of file
+    }
@@ -1,70 +1,225 @@
-import requests
-from decimal import Decimal, InvalidOperation
+import asyncio
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
 from requests.exceptions import RequestException, Timeout
 from app.config import Config
 from app.logger_config import logger
-from num2words import num2words
-from app.utils.validators import (calculate_age,validate_ecuadorian_identification)
+from num2words import CONVERTER_CLASSES, num2words
+from app.utils.batcher import MicroBatcher
+from app.utils.cache import TTLCache, MISSING
+from app.utils.http_client import get_client, get_breaker
+from app.utils.resilience import CircuitOpenError, UpstreamUnavailable
+from app.utils.validators import (calculate_age,calculate_ages,validate_ecuadorian_identification,validate_ecuadorian_identifications)
+from app.utils.tracing import traced
 
 
 # ==============================
 # VERIFICAR CÉDULA
 # ==============================
 
+@traced()
 def verificar_cedula(cedula: str):
     return validate_ecuadorian_identification(cedula)
 
 
+@traced()
+def verificar_cedulas_lote(cedulas: list):
+    results = validate_ecuadorian_identifications(cedulas)
+
+    errores = {}
+    muestra = []
+
+    for cedula, (success, result) in zip(cedulas, results):
+        if success:
+            continue
+        errores[result] = errores.get(result, 0) + 1
+        if len(muestra) < Config.BATCH_LOG_SAMPLE:
+            muestra.append({"cedula": cedula, "error": result})
+
+    invalidas = sum(errores.values())
+
+    # Un solo evento por lote, con una muestra acotada de cédulas inválidas
+    logger.info({
+        "event": "cedula_batch_validated",
+        "total": len(cedulas),
+        "invalid": invalidas,
+        "errors": errores,
+        "invalid_sample": muestra
+    })
+
+    return {
+        "total": len(cedulas),
+        "validas": len(cedulas) - invalidas,
+        "invalidas": invalidas,
+        "errores": errores,
+        "resultados": [
+            {"cedula": cedula, "success": success, "result": result}
+            for cedula, (success, result) in zip(cedulas, results)
+        ]
+    }
+
+
 # ==============================
 # CALCULAR EDAD
 # ==============================
 
+@traced()
 def obtener_edad(fecha_nacimiento: str):
     return calculate_age(fecha_nacimiento)
 
 
+@traced()
+def obtener_edades_lote(fechas: list):
+    results = calculate_ages(fechas)
+
+    errores = {}
+    muestra = []
+    mayores = 0
+
+    for fecha, (success, result) in zip(fechas, results):
+        if success:
+            mayores += result["mayor_edad"]
+            continue
+        errores[result] = errores.get(result, 0) + 1
+        if len(muestra) < Config.BATCH_LOG_SAMPLE:
+            muestra.append({"fecha": fecha, "error": result})
+
+    invalidas = sum(errores.values())
+
+    # Un solo evento por lote, con una muestra acotada de fechas inválidas
+    logger.info({
+        "event": "age_batch_calculated",
+        "total": len(fechas),
+        "invalid": invalidas,
+        "errors": errores,
+        "invalid_sample": muestra
+    })
+
+    return {
+        "total": len(fechas),
+        "validas": len(fechas) - invalidas,
+        "invalidas": invalidas,
+        "mayores_edad": mayores,
+        "errores": errores,
+        "resultados": [
+            {"fecha_nacimiento": fecha, "success": success, "result": result}
+            for fecha, (success, result) in zip(fechas, results)
+        ]
+    }
+
+
 # ==============================
 # CONVERTIR NÚMERO A LETRAS
 # ==============================
-def numero_a_letras_moneda(numero):
+
+# Mismo convertidor que usa num2words(lang='es'); de él salen los fragmentos
+_ES = CONVERTER_CLASSES["es"]
+_CENTAVO = Decimal(".01")
+_DOLARES = ("DÓLAR", "DÓLARES")
+_CENTAVOS = ("CENTAVO", "CENTAVOS")
+
+
+def _apocope(palabras):
+    # Igual que to_currency de num2words: "uno" -> "un", "veintiuno" -> "veintiún"
+    return palabras.replace("veintiuno", "veintiún").replace("uno", "un").upper()
+
+
+# Fragmentos precalculados al importar: cada grupo de 0 a 999 y cada
+# "con ... centavos" de 0 a 99
+_GRUPOS = tuple(_apocope(_ES.to_cardinal(n)) for n in range(1000))
+_CON_CENTAVOS = tuple(
+    f" CON {_GRUPOS[n]} {_CENTAVOS[0] if n == 1 else _CENTAVOS[1]}" for n in range(100)
+)
+
+# Escalas de la numeración larga, de mayor a menor: millón, billón, trillón, cuatrillón
+# (10^9 es "mil millones", como en num2words)
+_ESCALAS = tuple(
+    (valor, nombre.upper(), (nombre[:-3] + "lones").upper())
+    for valor, nombre in _ES.cards.items() if valor >= 10 ** 6
+)
+
+
+@lru_cache(maxsize=Config.NUMERO_LETRAS_FRAGMENT_CACHE)
+def _miles(n):
+    # 0 <= n < 10^6: "<grupo> MIL <grupo>"; es también el factor de cada escala
+    alto, resto = divmod(n, 1000)
+
+    if not alto:
+        return _GRUPOS[resto]
+
+    texto = "MIL" if alto == 1 else _GRUPOS[alto] + " MIL"
+
+    return texto + " " + _GRUPOS[resto] if resto else texto
+
+
+def _entero(n):
+    for valor, singular, plural in _ESCALAS:
+        if n >= valor:
+            alto, resto = divmod(n, valor)
+            texto = "UN " + singular if alto == 1 else _entero(alto) + " " + plural
+
+            return texto + " " + _entero(resto) if resto else texto
+
+    return _miles(n)
+
+
+@lru_cache(maxsize=Config.NUMERO_LETRAS_CACHE_SIZE)
+def _letras_moneda(monto):
+    # `monto` ya redondeado a centavos (ROUND_HALF_UP, como num2words): montos
+    # iguales con distinta escritura (1.5, 1.50, 1.499) comparten la entrada
+    entero, fraccion = divmod(monto, 1)
+    entero = int(entero)
+
+    if entero >= _ES.MAXVAL:
+        # Fuera de rango: el mismo error que num2words
+        return num2words(monto, lang='es', to='currency', currency='USD').upper()
+
+    dolares = _DOLARES[0] if entero == 1 else _DOLARES[1]
+
+    return f"{_entero(entero)} {dolares}{_CON_CENTAVOS[int(fraccion * 100)]}"
+
+
+def _numero_a_letras(numero):
+    # Validación y conversión sin log ni traza; los errores inesperados se propagan
+    # Validar que no venga vacío
+    if numero is None:
+        return {
+            "success": False,
+            "error": "El valor no puede ser nulo"
+        }
+
+    # Convertir a Decimal para evitar problemas de float
     try:
-        # Validar que no venga vacío
-        if numero is None:
-            return {
-                "success": False,
-                "error": "El valor no puede ser nulo"
-            }
-
-        # Convertir a Decimal para evitar problemas de float
-        try:
-            numero_decimal = Decimal(str(numero))
-        except InvalidOperation:
-            return {
-                "success": False,
-                "error": "El valor debe ser numérico"
-            }
-
-        # Validar negativo
-        if numero_decimal < 0:
-            return {
-                "success": False,
-                "error": "El monto no puede ser negativo"
-            }
-
-        # Conversión a letras
-        letras = num2words(
-            numero_decimal,
-            lang='es',
-            to='currency',
-            currency='USD'
-        )
+        numero_decimal = Decimal(str(numero))
+    except InvalidOperation:
+        return {
+            "success": False,
+            "error": "El valor debe ser numérico"
+        }
 
+    # Validar negativo
+    if numero_decimal < 0:
         return {
-            "success": True,
-            "numero": float(numero_decimal),
-            "en_letras": letras.upper()
+            "success": False,
+            "error": "El monto no puede ser negativo"
         }
 
+    # Conversión a letras: idéntica a num2words(lang='es', to='currency', currency='USD')
+    letras = _letras_moneda(numero_decimal.quantize(_CENTAVO, rounding=ROUND_HALF_UP))
+
+    return {
+        "success": True,
+        "numero": float(numero_decimal),
+        "en_letras": letras
+    }
+
+
+@traced()
+def numero_a_letras_moneda(numero):
+    try:
+        return _numero_a_letras(numero)
+
     except ValueError as e:
         logger.error({
             "evento": "numero_a_letras_value_error",
@@ -87,16 +242,60 @@ def numero_a_letras_moneda(numero):
             "error": "Error interno al convertir el número a letras"
         }
 
+
+@traced()
+def numeros_a_letras_lote(numeros: list):
+    resultados = []
+    errores = {}
+
+    for numero in numeros:
+        try:
+            result = _numero_a_letras(numero)
+        except ValueError:
+            result = {"success": False, "error": "Error en el formato del número"}
+        except Exception:
+            result = {"success": False, "error": "Error interno al convertir el número a letras"}
+
+        if not result["success"]:
+            errores[result["error"]] = errores.get(result["error"], 0) + 1
+
+        resultados.append(result)
+
+    invalidos = sum(errores.values())
+    cache = _letras_moneda.cache_info()
+
+    # Un solo evento por lote
+    logger.info({
+        "event": "numero_letras_batch",
+        "total": len(numeros),
+        "invalid": invalidos,
+        "errors": errores,
+        "cache_hits": cache.hits,
+        "cache_size": cache.currsize
+    })
+
+    return {
+        "total": len(numeros),
+        "validos": len(numeros) - invalidos,
+        "invalidos": invalidos,
+        "errores": errores,
+        "resultados": resultados
+    }
+
 # ==============================
 # GÉNERO (API EXTERNA)
 # ==============================
 
-def obtener_genero(nombre: str):
+def _normalizar_nombre(nombre):
+    return str(nombre).strip().lower()
+
+
+def _consultar_generos(nombres: list):
+    # Una sola petición multi-nombre: ?name[]=juan&name[]=maria...
     try:
-        response = requests.get(
+        response = get_client("gender").get(
             Config.GENDERIZE_URL,
-            params={"name": nombre},
-            timeout=Config.REQUEST_TIMEOUT
+            params=[("name[]", nombre) for nombre in nombres]
         )
 
         response.raise_for_status()
@@ -105,22 +304,161 @@ def obtener_genero(nombre: str):
     except Timeout:
         logger.error({
             "evento": "gender_timeout",
-            "nombre": nombre
+            "nombres": nombres
         })
-        return {"error": "El servicio de género tardó demasiado en responder"}
+        error = {"error": "El servicio de género tardó demasiado en responder"}
+        return {nombre: error for nombre in nombres}
 
     except RequestException as e:
         logger.error({
             "evento": "gender_request_error",
-            "nombre": nombre,
+            "nombres": nombres,
             "detalle": str(e)
         })
-        return {"error": "Error al consultar servicio de género"}
+        error = {"error": "Error al consultar servicio de género"}
+        return {nombre: error for nombre in nombres}
 
-    # Transformar respuesta (no devolver crudo)
+    # Un cuerpo de error o de límite de cuota llega como objeto, no como lista
+    if not isinstance(data, list) or len(data) != len(nombres) or not all(isinstance(item, dict) for item in data):
+        logger.error({
+            "evento": "gender_invalid_response",
+            "nombres": nombres,
+            "detalle": str(data)[:200]
+        })
+        error = {"error": "Respuesta inválida del servicio de género"}
+        return {nombre: error for nombre in nombres}
+
+    # La API responde en el mismo orden de los nombres enviados
     return {
-        "nombre": data.get("name"),
-        "genero": data.get("gender"),
-        "probabilidad": data.get("probability"),
-        "cantidad_registros": data.get("count")
-    }
\ No newline at end of file
+        nombre: {
+            "nombre": item.get("name"),
+            "genero": item.get("gender"),
+            "probabilidad": item.get("probability"),
+            "cantidad_registros": item.get("count")
+        }
+        for nombre, item in zip(nombres, data)
+    }
+
+
+_gender_cache = TTLCache(
+    "gender",
+    max_entries=Config.GENDER_CACHE_MAX_ENTRIES,
+    stale_seconds=Config.CACHE_STALE_SECONDS
+)
+
+_gender_batcher = MicroBatcher(
+    "gender",
+    _consultar_generos,
+    max_batch=Config.GENDER_BATCH_MAX,
+    window_ms=Config.GENDER_BATCH_WINDOW_MS
+)
+
+
+def gender_cache_stats():
+    return _gender_cache.stats()
+
+
+def _genero_timeout(clave):
+    # El micro-batcher no entregó resultado a tiempo: mismo error que un timeout del upstream
+    logger.error({
+        "evento": "gender_timeout",
+        "nombres": [clave]
+    })
+    return {"error": "El servicio de género tardó demasiado en responder"}
+
+
+def _genero_error(clave, e):
+    # Fallo inesperado del lote en el micro-batcher
+    logger.error({
+        "evento": "gender_batch_error",
+        "nombres": [clave],
+        "detalle": str(e)
+    })
+    return {"error": "Error al consultar servicio de género"}
+
+
+def _genero_fallback(clave, nombre, e):
+    # Upstream no disponible: dato vencido de la caché si existe, si no error inmediato
+    stale = _gender_cache.get_stale(clave)
+
+    if stale is not MISSING:
+        logger.warning({
+            "evento": "gender_stale_served",
+            "nombre": clave,
+            "motivo": e.reason
+        })
+        return {**stale, "nombre": nombre}
+
+    logger.warning({
+        "evento": "gender_unavailable",
+        "nombre": clave,
+        "motivo": e.reason
+    })
+    return {"error": "El servicio de género no está disponible temporalmente"}
+
+
+@traced()
+def obtener_genero(nombre: str):
+    clave = _normalizar_nombre(nombre)
+
+    result = _gender_cache.get(clave)
+
+    if result is MISSING:
+        try:
+            # Con el circuito abierto ni siquiera se encola en el batcher
+            if get_breaker("gender").is_open():
+                raise CircuitOpenError("gender")
+
+            # Peticiones concurrentes del mismo nombre comparten una sola llamada
+            # Tiempo máximo: ventana de agrupación + todos los intentos al upstream
+            espera = (Config.GENDER_CONNECT_TIMEOUT + Config.GENDER_READ_TIMEOUT) * (Config.HTTP_RETRIES + 1) + 1
+            result = _gender_batcher.submit(clave).result(timeout=espera)
+
+        except UpstreamUnavailable as e:
+            return _genero_fallback(clave, nombre, e)
+
+        except FutureTimeoutError:
+            return _genero_timeout(clave)
+
+        except Exception as e:
+            return _genero_error(clave, e)
+
+        if "error" in result:
+            return result
+
+        _gender_cache.set(clave, result, Config.GENDER_CACHE_TTL)
+
+    # Transformar respuesta (no devolver crudo)
+    return {**result, "nombre": nombre}
+
+
+async def obtener_genero_async(nombre: str):
+    clave = _normalizar_nombre(nombre)
+
+    result = _gender_cache.get(clave)
+
+    if result is MISSING:
+        # Se espera el mismo Future del micro-batcher sin bloquear el event loop:
+        # las consultas siguen agrupándose en una sola llamada multi-nombre
+        try:
+            if get_breaker("gender").is_open():
+                raise CircuitOpenError("gender")
+
+            espera = (Config.GENDER_CONNECT_TIMEOUT + Config.GENDER_READ_TIMEOUT) * (Config.HTTP_RETRIES + 1) + 1
+            result = await asyncio.wait_for(asyncio.wrap_future(_gender_batcher.submit(clave)), timeout=espera)
+
+        except UpstreamUnavailable as e:
+            return _genero_fallback(clave, nombre, e)
+
+        except (FutureTimeoutError, asyncio.TimeoutError):
+            return _genero_timeout(clave)
+
+        except Exception as e:
+            return _genero_error(clave, e)
+
+        if "error" in result:
+            return result
+
+        _gender_cache.set(clave, result, Config.GENDER_CACHE_TTL)
+
+    return {**result, "nombre": nombre}
@@ -0,0 +1,69 @@
+from app.logger_config import sampling_stats
+from app.middleware.request_logger import request_metrics
+from app.services.geo_service import geo_cache_stats
+from app.services.identity_service import gender_cache_stats
+from app.services.translate_service import translation_memory_stats
+from app.utils.http_client import upstream_stats, get_breaker
+from app.utils.metrics import render_prometheus
+from app.utils.resilience import STATE_VALUES
+
+CACHE_COUNTERS = ["hits", "misses", "evictions", "expirations", "stale_hits"]
+# Breakers siempre visibles, aunque el upstream aún no se haya llamado
+UPSTREAMS = ["geo", "gender", "translate"]
+
+
+def render_metrics():
+    histograms, inflight = request_metrics.snapshot()
+    upstreams = upstream_stats()
+    breakers = {name: get_breaker(name).stats() for name in UPSTREAMS}
+    caches = {
+        "geo": geo_cache_stats(),
+        "gender": gender_cache_stats(),
+        "translation": translation_memory_stats()
+    }
+    sampling = sampling_stats()
+
+    families = [
+        ("http_request_duration_seconds", "histogram", "Latencia de las peticiones por endpoint y clase de estado.",
+         [({"endpoint": endpoint, "method": method, "status": status}, snapshot)
+          for (endpoint, method, status), snapshot in sorted(histograms.items())]),
+        ("http_requests_in_flight", "gauge", "Peticiones en curso por endpoint.",
+         [({"endpoint": endpoint}, value) for endpoint, value in sorted(inflight.items())]),
+        ("upstream_requests_total", "counter", "Llamadas a APIs externas.",
+         [({"upstream": name}, stats["requests"]) for name, stats in upstreams.items()]),
+        ("upstream_errors_total", "counter", "Llamadas a APIs externas fallidas.",
+         [({"upstream": name}, stats["errors"]) for name, stats in upstreams.items()]),
+        ("upstream_retries_total", "counter", "Reintentos hacia APIs externas.",
+         [({"upstream": name}, stats["retries"]) for name, stats in upstreams.items()]),
+        ("upstream_request_duration_seconds", "histogram", "Latencia de las llamadas a APIs externas.",
+         [({"upstream": name}, stats["latency_seconds"]) for name, stats in upstreams.items()]),
+        ("upstream_bulkhead_in_use", "gauge", "Llamadas en curso dentro del límite de concurrencia del upstream.",
+         [({"upstream": name}, stats["bulkhead"]["in_use"]) for name, stats in upstreams.items()]),
+        ("upstream_bulkhead_limit", "gauge", "Límite de llamadas concurrentes al upstream.",
+         [({"upstream": name}, stats["bulkhead"]["limit"]) for name, stats in upstreams.items()]),
+        ("upstream_bulkhead_rejected_total", "counter", "Llamadas rechazadas por falta de cupo de concurrencia.",
+         [({"upstream": name}, stats["bulkhead"]["rejected"]) for name, stats in upstreams.items()]),
+        ("circuit_breaker_state", "gauge", "Estado del circuit breaker (0 cerrado, 1 semiabierto, 2 abierto).",
+         [({"upstream": name}, STATE_VALUES[stats["state"]]) for name, stats in breakers.items()]),
+        ("circuit_breaker_failure_rate", "gauge", "Tasa de fallos en la ventana actual del circuit breaker.",
+         [({"upstream": name}, stats["failure_rate"]) for name, stats in breakers.items()]),
+        ("circuit_breaker_opened_total", "counter", "Veces que se abrió el circuit breaker.",
+         [({"upstream": name}, stats["opened"]) for name, stats in breakers.items()]),
+        ("circuit_breaker_rejected_total", "counter", "Llamadas rechazadas sin tocar la red por el circuit breaker.",
+         [({"upstream": name}, stats["rejected"]) for name, stats in breakers.items()]),
+        ("cache_entries", "gauge", "Entradas en memoria de cada caché.",
+         [({"cache": name}, stats["size"]) for name, stats in caches.items()])
+    ]
+
+    for counter in CACHE_COUNTERS:
+        families.append((f"cache_{counter}_total", "counter", f"Contador de {counter} de cada caché.",
+                         [({"cache": name}, stats[counter]) for name, stats in caches.items()]))
+
+    families += [
+        ("log_events_seen_total", "counter", "Eventos muestreados recibidos por el logger.",
+         [({"event": event}, stats["seen"]) for event, stats in sampling.items()]),
+        ("log_events_kept_total", "counter", "Eventos muestreados escritos en el log.",
+         [({"event": event}, stats["kept"]) for event, stats in sampling.items()])
+    ]
+
+    return render_prometheus(families)
@@ -1,11 +1,106 @@
-import re
+import math
+import os
+import string
+from app.config import Config
 from app.logger_config import logger
+from app.utils.bloom import BloomFilter
+from app.utils.tracing import traced
+
+UPPERCASE = frozenset(string.ascii_uppercase)
+LOWERCASE = frozenset(string.ascii_lowercase)
+DIGITS = frozenset(string.digits)
+SPECIAL = frozenset('!@#$%^&*(),.?":{}|<>')
+ALPHANUMERIC = UPPERCASE | LOWERCASE | DIGITS
+
+# Tamaño del alfabeto que aporta cada clase a la estimación de entropía
+POOL_SIZES = {"uppercase": 26, "lowercase": 26, "number": 10, "symbol": 33, "unicode": 100}
+
+
+def _load_breached_filter(path):
+    # Se mapea en memoria al importar el servicio (arranque de la app)
+    if not path or not os.path.exists(path):
+        logger.warning({
+            "event": "breached_filter_missing",
+            "path": path,
+            "message": "Sin filtro de contraseñas filtradas: no se verificarán"
+        })
+        return None
+
+    try:
+        bloom = BloomFilter.open(path)
+    except (OSError, ValueError) as e:
+        logger.error({"event": "breached_filter_error", "path": path, "detail": str(e)})
+        return None
+
+    logger.info({"event": "breached_filter_loaded", "path": path, **bloom.stats()})
+    return bloom
+
+
+_breached = _load_breached_filter(Config.BREACHED_PASSWORDS_FILTER)
+
+
+def is_valid_password(password):
+    # Misma regla para el endpoint individual y el lote: cadena con algo más que espacios
+    return isinstance(password, str) and bool(password.strip())
+
+
+def _score_password(password):
+    # Una sola pasada sobre la contraseña (el set); el resto son intersecciones con clases fijas
+    chars = set(password)
+    rest = chars - ALPHANUMERIC
+
+    details = {
+        "length": len(password) >= 8,
+        "uppercase": not chars.isdisjoint(UPPERCASE),
+        "lowercase": not chars.isdisjoint(LOWERCASE),
+        # Como \d: también dígitos no ASCII (árabe-índicos, devanagari...)
+        "number": not chars.isdisjoint(DIGITS) or any(c.isdecimal() for c in rest),
+        "special": not rest.isdisjoint(SPECIAL)
+    }
+
+    # 20 puntos por cada criterio cumplido
+    score = 20 * sum(details.values())
 
+    # Entropía por fuerza bruta: longitud * log2(tamaño del alfabeto usado)
+    classes = [name for name in ("uppercase", "lowercase", "number") if details[name]]
 
+    if any(c < "\x80" for c in rest):
+        classes.append("symbol")
+
+    if any(c >= "\x80" for c in rest):
+        classes.append("unicode")
+
+    pool = sum(POOL_SIZES[name] for name in classes)
+    entropy = len(password) * math.log2(pool) if pool > 1 else 0.0
+
+    # None: no hay filtro cargado, no se pudo verificar
+    breached = password in _breached if _breached is not None else None
+
+    # Una contraseña filtrada es débil sin importar su composición
+    if breached:
+        score = 0
+
+    level = "débil"
+
+    if score >= 80:
+        level = "fuerte"
+    elif score >= 60:
+        level = "media"
+
+    return {
+        "score": score,
+        "nivel": level,
+        "detalles": details,
+        "entropia_bits": round(entropy, 1),
+        "filtrada": breached
+    }
+
+
+@traced()
 def evaluate_password(password: str):
     try:
         #Verificamos si llega la contraseña
-        if not password:
+        if not is_valid_password(password):
             logger.warning({
                 "event": "password_empty",
                 "message": "Contraseña vacía o nula"
@@ -13,58 +108,13 @@ def evaluate_password(password: str):
 
             return False, "La contraseña no puede estar vacía"
 
-        score = 0
-        details = {
-            "length": False,
-            "uppercase": False,
-            "lowercase": False,
-            "number": False,
-            "special": False
-        }
-
-        # Longitud mínima 8 caracteres
-        if len(password) >= 8:
-            score += 20
-            details["length"] = True
-
-        # Mayúsculas
-        if re.search(r"[A-Z]", password):
-            score += 20
-            details["uppercase"] = True
-
-        # Minúsculas
-        if re.search(r"[a-z]", password):
-            score += 20
-            details["lowercase"] = True
-
-        # Números
-        if re.search(r"\d", password):
-            score += 20
-            details["number"] = True
-
-        # Caracteres especiales
-        if re.search(r"[!@#$%^&*(),.?\":{}|<>]", password):
-            score += 20
-            details["special"] = True
-
-        # Nivel
-        level = "débil"
-
-        if score >= 80:
-            level = "fuerte"
-        elif score >= 60:
-            level = "media"
-
-        result = {
-            "score": score,
-            "nivel": level,
-            "detalles": details
-        }
+        result = _score_password(password)
 
         logger.info({
             "event": "password_evaluated",
-            "score": score,
-            "level": level
+            "score": result["score"],
+            "level": result["nivel"],
+            "breached": result["filtrada"]
         })
 
         return True, result
@@ -75,4 +125,43 @@ def evaluate_password(password: str):
             "detail": str(e)
         })
 
-        return False, "Error interno al evaluar contraseña"
\ No newline at end of file
+        return False, "Error interno al evaluar contraseña"
+
+
+@traced()
+def evaluate_passwords(passwords: list):
+    resultados = []
+    niveles = {"débil": 0, "media": 0, "fuerte": 0}
+    filtradas = 0
+    invalidas = 0
+
+    for password in passwords:
+        if not is_valid_password(password):
+            invalidas += 1
+            resultados.append({"success": False, "result": "Password inválido"})
+            continue
+
+        result = _score_password(password)
+        niveles[result["nivel"]] += 1
+        filtradas += bool(result["filtrada"])
+
+        # No se devuelve la contraseña: el resultado va en el mismo orden del lote
+        resultados.append({"success": True, "result": result})
+
+    # Un solo evento por lote
+    logger.info({
+        "event": "password_batch_evaluated",
+        "total": len(passwords),
+        "invalid": invalidas,
+        "breached": filtradas,
+        "levels": niveles
+    })
+
+    return {
+        "total": len(passwords),
+        "invalidas": invalidas,
+        "filtradas": filtradas,
+        "niveles": niveles,
+        "filtro_cargado": _breached is not None,
+        "resultados": resultados
+    }
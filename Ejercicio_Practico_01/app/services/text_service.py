@@ -1,37 +1,106 @@
+import codecs
 import re
+import tempfile
 import unicodedata
+from functools import lru_cache
+from app.config import Config
 from app.logger_config import logger
+from app.utils.batch import INVALID_LINE
+from app.utils.tracing import traced
 
+# Los espacios que reconoce \s dentro de ASCII
+ASCII_WHITESPACE = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+_ASCII_WHITESPACE_CHARS = frozenset(ASCII_WHITESPACE.decode("ascii"))
 
-def normalizar_texto(texto: str):
-    try:
-        if texto is None:
-            return False, "El texto no puede ser nulo"
+_SPACES = re.compile(b" {2,}")
+_NOT_ALNUM = re.compile(r"[^a-zA-Z0-9\s]")
 
-        if not isinstance(texto, str):
-            return False, "El texto debe ser una cadena"
 
-        original = texto
+def _normalize_table():
+    # Sobre los bytes ASCII ya sin tildes: mayúsculas y separadores a espacio en una sola pasada
+    table = bytearray(bytes(range(256)).upper())
 
-        # Quitar espacios al inicio y final
-        texto = texto.strip()
+    for byte in ASCII_WHITESPACE:
+        table[byte] = ord(" ")
 
-        if texto == "":
-            return False, "El texto no puede estar vacío"
+    return bytes(table)
+
+
+def _clean_table():
+    # Solo ASCII: letras y números en mayúsculas, espacios iguales, el resto eliminado
+    table = {}
+
+    for codepoint in range(128):
+        char = chr(codepoint)
+
+        if char.isalnum():
+            table[codepoint] = char.upper()
+        elif char.isspace():
+            table[codepoint] = char
+        else:
+            table[codepoint] = None
+
+    return table
+
+
+# Tablas precalculadas al importar
+_NORMALIZE = _normalize_table()
+_CLEAN = _clean_table()
+
+
+def _normalize(texto):
+    # `texto` ya sin espacios al inicio y final. NFD + encode ASCII quita las tildes
+    # (y todo lo que no tenga forma ASCII); la tabla hace mayúsculas y separadores
+    # sin pasar por upper() ni por una expresión regular sobre \s
+    folded = unicodedata.normalize("NFD", texto).encode("ascii", "ignore").translate(_NORMALIZE)
+
+    return _SPACES.sub(b" ", folded).decode("ascii")
+
+
+def _clean(texto):
+    # Texto ASCII: una pasada de str.translate (camino rápido de CPython);
+    # con otros caracteres se conservan los espacios Unicode, así que va por la regex
+    if texto.isascii():
+        return texto.translate(_CLEAN)
+
+    return _NOT_ALNUM.sub("", texto).upper()
+
+
+# Entradas cortas y repetidas (nombres, ciudades, categorías) se resuelven desde la LRU
+_normalize_cached = lru_cache(maxsize=Config.TEXT_CACHE_SIZE)(_normalize)
 
-        # Quitar tildes
-        texto = unicodedata.normalize("NFD", texto)
-        texto = texto.encode("ascii", "ignore").decode("utf-8")
 
-        # Pasar a mayúsculas
-        texto = texto.upper()
+def _normalizar(texto):
+    # Devuelve (True, normalizado) o (False, mensaje de error), sin log ni traza
+    if texto is None:
+        return False, "El texto no puede ser nulo"
 
-        # Quitar espacios múltiples
-        texto = re.sub(r"\s+", " ", texto)
+    if not isinstance(texto, str):
+        return False, "El texto debe ser una cadena"
+
+    # Quitar espacios al inicio y final
+    texto = texto.strip()
+
+    if texto == "":
+        return False, "El texto no puede estar vacío"
+
+    if len(texto) <= Config.TEXT_CACHE_MAX_LEN:
+        return True, _normalize_cached(texto)
+
+    return True, _normalize(texto)
+
+
+@traced()
+def normalizar_texto(texto: str):
+    try:
+        success, result = _normalizar(texto)
+
+        if not success:
+            return False, result
 
         return True, {
-            "original": original,
-            "normalizado": texto
+            "original": texto,
+            "normalizado": result
         }
 
     except Exception as e:
@@ -42,6 +111,63 @@ def normalizar_texto(texto: str):
         return False, "Error interno al normalizar texto"
 
 
+def iter_normalizados(textos):
+    # Resultado por texto, en el mismo orden; sirve para listas y para streams (NDJSON)
+    for texto in textos:
+        if texto is INVALID_LINE:
+            yield {"success": False, "result": "Línea JSON inválida"}
+            continue
+
+        success, result = _normalizar(texto)
+
+        if success:
+            yield {"success": True, "result": {"original": texto, "normalizado": result}}
+        else:
+            yield {"success": False, "result": result}
+
+
+@traced()
+def normalizar_textos(textos: list):
+    resultados = list(iter_normalizados(textos))
+    invalidos = sum(1 for item in resultados if not item["success"])
+
+    # Un solo evento por lote
+    logger.info({
+        "event": "normalizar_texto_batch",
+        "total": len(textos),
+        "invalid": invalidos
+    })
+
+    return {
+        "total": len(textos),
+        "validos": len(textos) - invalidos,
+        "invalidos": invalidos,
+        "resultados": resultados
+    }
+
+
+def normalizar_stream(textos, max_items):
+    # Versión en streaming: cada resultado sale en cuanto se procesa su línea
+    total = invalidos = 0
+
+    for item in iter_normalizados(textos):
+        if total == max_items:
+            invalidos += 1
+            yield {"success": False, "result": f"El lote no puede superar {max_items} textos"}
+            break
+
+        total += 1
+        invalidos += not item["success"]
+        yield item
+
+    logger.info({
+        "event": "normalizar_texto_stream",
+        "total": total,
+        "invalid": invalidos
+    })
+
+
+@traced()
 def limpiar_caracteres(texto: str):
     try:
         if texto is None:
@@ -53,12 +179,12 @@ def limpiar_caracteres(texto: str):
         if texto.strip() == "":
             return False, "El texto no puede estar vacío"
 
-        # Permitir solo letras y números
-        limpio = re.sub(r"[^a-zA-Z0-9\s]", "", texto)
+        # Permitir solo letras y números (en mayúsculas) y espacios
+        limpio = _clean(texto)
 
         return True, {
             "original": texto,
-            "limpio": limpio.upper()
+            "limpio": limpio
         }
 
     except Exception as e:
@@ -66,4 +192,138 @@ def limpiar_caracteres(texto: str):
             "event": "limpiar_caracteres_error",
             "detail": str(e)
         })
-        return False, "Error interno al limpiar caracteres"
\ No newline at end of file
+        return False, "Error interno al limpiar caracteres"
+
+
+# ==============================
+# DOCUMENTOS EN STREAMING
+# ==============================
+
+class _IncrementalNormalizer:
+    """
+    normalizar_texto aplicado a un documento que llega por partes.
+
+    El plegado es carácter a carácter, así que cada parte se pliega sola; lo
+    único que cruza los límites es el estado de los espacios: si ya empezó el
+    contenido (strip inicial), si lo último emitido fue un espacio (colapso) y
+    si hay espacios retenidos al final de la parte, que solo se emiten si
+    después llega más contenido (strip final). De esos espacios retenidos basta
+    saber si alguno es ASCII: los demás desaparecen al plegar.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.pending_space = False
+        self.last_space = False
+
+    def feed(self, texto):
+        if not self.started:
+            texto = texto.lstrip()
+
+            if not texto:
+                return ""
+
+            self.started = True
+
+        body = texto.rstrip()
+        tail = texto[len(body):]
+
+        if not body:
+            self.pending_space = self.pending_space or not _ASCII_WHITESPACE_CHARS.isdisjoint(tail)
+            return ""
+
+        out = _normalize(body)
+
+        if self.pending_space and not out.startswith(" "):
+            out = " " + out
+
+        if self.last_space and out.startswith(" "):
+            out = out[1:]
+
+        if out:
+            self.last_space = out.endswith(" ")
+
+        self.pending_space = not _ASCII_WHITESPACE_CHARS.isdisjoint(tail)
+
+        return out
+
+
+class _IncrementalCleaner:
+    # limpiar_caracteres no depende de los vecinos de cada carácter: no hay estado
+
+    def feed(self, texto):
+        return _clean(texto)
+
+
+def _process_stream(read, processor, event, chunk_size):
+    """
+    Lee `read(chunk_size)` hasta agotar el cuerpo y devuelve un generador con el
+    texto procesado, parte por parte; la memoria no depende del tamaño del
+    documento. Devuelve None si el documento está vacío o solo tiene espacios,
+    para poder responder 400 antes de empezar a enviar.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    # Lo que sale de los espacios iniciales (limpiar los conserva) se guarda
+    # hasta saber que hay contenido; pasa a disco si es más grande que una parte
+    spool = tempfile.SpooledTemporaryFile(max_size=chunk_size, mode="w+", encoding="utf-8", newline="")
+    total = 0
+
+    while True:
+        chunk = read(chunk_size)
+        total += len(chunk)
+        texto = decoder.decode(chunk, final=not chunk)
+
+        if texto.strip():
+            break
+
+        spool.write(processor.feed(texto))
+
+        if not chunk:
+            spool.close()
+            return None
+
+    def generate():
+        nonlocal total, chunk
+        written = 0
+
+        try:
+            spool.seek(0)
+
+            for out in iter(lambda: spool.read(chunk_size), ""):
+                written += len(out)
+                yield out
+
+            out = processor.feed(texto)
+
+            while True:
+                if out:
+                    written += len(out)
+                    yield out
+
+                if not chunk:
+                    break
+
+                chunk = read(chunk_size)
+                total += len(chunk)
+                out = processor.feed(decoder.decode(chunk, final=not chunk))
+
+        finally:
+            spool.close()
+
+        logger.info({
+            "event": event,
+            "bytes_in": total,
+            "chars_out": written
+        })
+
+    return generate()
+
+
+@traced()
+def normalizar_documento(read, chunk_size):
+    return _process_stream(read, _IncrementalNormalizer(), "normalizar_documento_stream", chunk_size)
+
+
+@traced()
+def limpiar_documento(read, chunk_size):
+    return _process_stream(read, _IncrementalCleaner(), "limpiar_documento_stream", chunk_size)
@@ -1,13 +1,190 @@
+import asyncio
 import os
+import httpx
 import requests
 from dotenv import load_dotenv
+from app.config import Config
 from app.logger_config import logger
+from app.utils.cache import TTLCache, MISSING
+from app.utils.http_client import get_client, get_async_client
+from app.utils.resilience import UpstreamUnavailable
+from app.utils.tracing import traced
 
 load_dotenv()
 
 API_KEY = os.getenv("GOOGLE_API_KEY")
 
-def translate_text(text: str, target_lang: str = "en") -> dict:
+# Memoria de traducción: LRU en memoria delante de un almacén SQLite local
+_translation_memory = TTLCache(
+    "translation",
+    max_entries=Config.TRANSLATION_MEMORY_MAX_ENTRIES,
+    persist_path=Config.TRANSLATION_MEMORY_DB,
+    persist_max_entries=Config.TRANSLATION_MEMORY_DB_MAX_ENTRIES,
+    stale_seconds=Config.CACHE_STALE_SECONDS
+)
+
+
+class TranslationError(Exception):
+
+    def __init__(self, error, details=None):
+        super().__init__(error)
+        self.error = error
+        self.details = details
+
+
+def translation_memory_stats():
+    return _translation_memory.stats()
+
+
+def _memory_key(text, target_lang, source_lang):
+    # Texto normalizado: mismos espacios internos, sin bordes
+    return f"{source_lang or 'auto'}|{target_lang}|{' '.join(text.split())}"
+
+
+def _translation_form(segments, target_lang, source_lang=None):
+    # Varios parámetros "q" en una sola llamada; la API responde en el mismo orden.
+    # Un dict con listas lo codifican igual requests y httpx (httpx no acepta tuplas en `data`)
+    data = {"q": list(segments), "target": target_lang, "key": API_KEY}
+
+    if source_lang:
+        data["source"] = source_lang
+
+    return data
+
+
+def _parse_translations(response, expected):
+    logger.debug(f"[TRANSLATE] Status code: {response.status_code}")
+
+    if response.status_code != 200:
+        logger.error(f"[TRANSLATE] Error HTTP: {response.text}")
+        raise TranslationError("Translation API error", response.text)
+
+    translations = response.json()["data"]["translations"]
+
+    # Una traducción por segmento enviado: si faltan no se puede saber cuál, falla el lote
+    if len(translations) != expected:
+        logger.error(f"[TRANSLATE] Respuesta incompleta: {len(translations)} traducciones para {expected} segmentos")
+        raise TranslationError(
+            "Translation API returned an incomplete batch",
+            f"{len(translations)} translations for {expected} segments"
+        )
+
+    return [item["translatedText"] for item in translations]
+
+
+def _request_translations(segments, target_lang, source_lang=None):
+    response = get_client("translate").post(
+        Config.TRANSLATE_URL,
+        data=_translation_form(segments, target_lang, source_lang)
+    )
+
+    return _parse_translations(response, len(segments))
+
+
+async def _request_translations_async(segments, target_lang, source_lang=None):
+    response = await get_async_client("translate").post(
+        Config.TRANSLATE_URL,
+        data=_translation_form(segments, target_lang, source_lang)
+    )
+
+    return _parse_translations(response, len(segments))
+
+
+def _pack_segments(segments):
+    # Agrupa respetando los límites de la API (segmentos y caracteres por petición)
+    batch, size = [], 0
+
+    for segment in segments:
+        if batch and (len(batch) >= Config.TRANSLATE_MAX_SEGMENTS or size + len(segment) > Config.TRANSLATE_MAX_CHARS):
+            yield batch
+            batch, size = [], 0
+
+        batch.append(segment)
+        size += len(segment)
+
+    if batch:
+        yield batch
+
+
+def _lookup_memory(texts, target_lang, source_lang=None):
+    results = [None] * len(texts)
+    pending = {}
+
+    for i, text in enumerate(texts):
+        key = _memory_key(text, target_lang, source_lang)
+        cached = _translation_memory.get(key)
+
+        if cached is not MISSING:
+            results[i] = cached
+        else:
+            # Textos equivalentes se envían una sola vez
+            pending.setdefault(key, (text, []))[1].append(i)
+
+    return results, pending
+
+
+def _store_memory(results, pending, translated):
+    for key, result in zip(pending, translated):
+        _translation_memory.set(key, result, Config.TRANSLATION_MEMORY_TTL)
+
+        for i in pending[key][1]:
+            results[i] = result
+
+    return results, len(results) - sum(len(indexes) for _, indexes in pending.values())
+
+
+def _store_with_stale(results, pending, translated, error):
+    # Upstream no disponible: lo ya traducido se guarda y el resto sale de entradas
+    # vencidas de la memoria; si falta alguna, se falla sin esperar al upstream
+    results, cached = _store_memory(results, pending, translated)
+
+    for key, (_, indexes) in list(pending.items())[len(translated):]:
+        stale = _translation_memory.get_stale(key)
+
+        if stale is MISSING:
+            logger.warning(f"[TRANSLATE] Servicio no disponible ({error.reason}), sin traducción previa")
+            raise TranslationError("Translation service unavailable", error.reason)
+
+        for i in indexes:
+            results[i] = stale
+
+    logger.warning(f"[TRANSLATE] Servicio no disponible ({error.reason}), se usan traducciones vencidas")
+
+    return results, cached
+
+
+def _translate_with_memory(texts, target_lang, source_lang=None):
+    results, pending = _lookup_memory(texts, target_lang, source_lang)
+    translated = []
+
+    try:
+        for batch in _pack_segments([text for text, _ in pending.values()]):
+            translated += _request_translations(batch, target_lang, source_lang)
+
+    except UpstreamUnavailable as e:
+        return _store_with_stale(results, pending, translated, e)
+
+    return _store_memory(results, pending, translated)
+
+
+async def _translate_with_memory_async(texts, target_lang, source_lang=None):
+    # La memoria persiste en SQLite: consultarla y guardarla va a un hilo
+    # para no bloquear el event loop
+    results, pending = await asyncio.to_thread(_lookup_memory, texts, target_lang, source_lang)
+    translated = []
+
+    try:
+        for batch in _pack_segments([text for text, _ in pending.values()]):
+            translated += await _request_translations_async(batch, target_lang, source_lang)
+
+    except UpstreamUnavailable as e:
+        return await asyncio.to_thread(_store_with_stale, results, pending, translated, e)
+
+    return await asyncio.to_thread(_store_memory, results, pending, translated)
+
+
+@traced()
+def translate_text(text: str, target_lang: str = "en", source_lang: str = None) -> dict:
     try:
         logger.info(f"[TRANSLATE] Iniciando traducción -> target={target_lang}")
 
@@ -25,29 +202,107 @@ def translate_text(text: str, target_lang: str = "en") -> dict:
                 "error": "Text cannot be empty"
             }
 
-        url = "https://translation.googleapis.com/language/translate/v2"
+        (translated_text,), cached = _translate_with_memory([text], target_lang, source_lang)
+
+        logger.info("[TRANSLATE] Traducción exitosa")
+
+        return {
+            "success": True,
+            "original": text,
+            "translated": translated_text,
+            "target_language": target_lang,
+            "cached": bool(cached)
+        }
+
+    except TranslationError as e:
+        return {
+            "success": False,
+            "error": e.error,
+            "details": e.details
+        }
+
+    except requests.exceptions.Timeout:
+        logger.error("[TRANSLATE] Timeout al conectar con Google API")
+        return {
+            "success": False,
+            "error": "Translation service timeout"
+        }
+
+    except Exception as e:
+        logger.exception(f"[TRANSLATE] Error inesperado: {e}")
+        return {
+            "success": False,
+            "error": "Unexpected error occurred"
+        }
+
+
+@traced()
+def translate_batch(texts: list, target_lang: str = "en", source_lang: str = None) -> dict:
+    try:
+        logger.info(f"[TRANSLATE] Iniciando traducción por lote -> target={target_lang}, segmentos={len(texts)}")
+
+        if not API_KEY:
+            logger.error("[TRANSLATE] GOOGLE_API_KEY no configurada")
+            return {
+                "success": False,
+                "error": "API key not configured"
+            }
+
+        translated, cached = _translate_with_memory(texts, target_lang, source_lang)
+
+        logger.info(f"[TRANSLATE] Lote traducido: {len(texts)} segmentos, {cached} desde memoria")
 
-        params = {
-            "q": text,
-            "target": target_lang,
-            "key": API_KEY
+        return {
+            "success": True,
+            "translations": [
+                {"original": text, "translated": result}
+                for text, result in zip(texts, translated)
+            ],
+            "target_language": target_lang,
+            "cached": cached
         }
 
-        response = requests.post(url, params=params, timeout=10)
+    except TranslationError as e:
+        return {
+            "success": False,
+            "error": e.error,
+            "details": e.details
+        }
 
-        logger.debug(f"[TRANSLATE] Status code: {response.status_code}")
+    except requests.exceptions.Timeout:
+        logger.error("[TRANSLATE] Timeout al conectar con Google API")
+        return {
+            "success": False,
+            "error": "Translation service timeout"
+        }
 
-        if response.status_code != 200:
-            logger.error(f"[TRANSLATE] Error HTTP: {response.text}")
+    except Exception as e:
+        logger.exception(f"[TRANSLATE] Error inesperado: {e}")
+        return {
+            "success": False,
+            "error": "Unexpected error occurred"
+        }
+
+
+async def translate_text_async(text: str, target_lang: str = "en", source_lang: str = None) -> dict:
+    try:
+        logger.info(f"[TRANSLATE] Iniciando traducción (async) -> target={target_lang}")
+
+        if not API_KEY:
+            logger.error("[TRANSLATE] GOOGLE_API_KEY no configurada")
             return {
                 "success": False,
-                "error": "Translation API error",
-                "details": response.text
+                "error": "API key not configured"
             }
 
-        data = response.json()
+        if not text:
+            logger.warning("[TRANSLATE] Texto vacío recibido")
+            return {
+                "success": False,
+                "error": "Text cannot be empty"
+            }
 
-        translated_text = data["data"]["translations"][0]["translatedText"]
+        (translated_text,), cached = await _translate_with_memory_async([text], target_lang, source_lang)
 
         logger.info("[TRANSLATE] Traducción exitosa")
 
@@ -56,9 +311,17 @@ def translate_text(text: str, target_lang: str = "en") -> dict:
             "original": text,
             "translated": translated_text,
             "target_language": target_lang,
+            "cached": bool(cached)
         }
 
-    except requests.exceptions.Timeout:
+    except TranslationError as e:
+        return {
+            "success": False,
+            "error": e.error,
+            "details": e.details
+        }
+
+    except httpx.TimeoutException:
         logger.error("[TRANSLATE] Timeout al conectar con Google API")
         return {
             "success": False,
@@ -70,4 +333,4 @@ def translate_text(text: str, target_lang: str = "en") -> dict:
         return {
             "success": False,
             "error": "Unexpected error occurred"
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,26 @@
+from functools import wraps
+
+
+def as_async(fn):
+    # Servicio síncrono con la firma de su variante async, para pasarlo a una vista compartida
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def run_sync(coro):
+    """
+    Ejecuta una corrutina que nunca se suspende (una vista compartida a la que
+    se le pasan servicios síncronos envueltos con `as_async`) y devuelve su
+    resultado. Así la vista Flask y la ruta nativa de app/asgi.py ejecutan el
+    mismo código; solo cambia el servicio que se espera.
+    """
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+
+    coro.close()
+    raise RuntimeError("La vista se suspendió fuera del event loop: los servicios deben ser síncronos")
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+from flask import current_app
+
+from app.utils.response import error_response
+from app.logger_config import logger
+
+# Línea de un NDJSON que no es JSON válido
+INVALID_LINE = object()
+
+
+def read_json_items(data, field):
+    # Acepta un arreglo JSON directo o un objeto {field: [...]}
+    if isinstance(data, list):
+        return data
+
+    if isinstance(data, dict) and isinstance(data.get(field), list):
+        return data[field]
+
+    return None
+
+
+def iter_csv_column(stream, header=None):
+    # Lee la primera columna de un CSV directamente del stream de la petición,
+    # sin cargar el cuerpo completo en memoria
+    text = io.TextIOWrapper(io.BufferedReader(stream), encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+
+    for i, row in enumerate(reader):
+        if not row:
+            continue
+
+        value = row[0].strip()
+
+        if i == 0 and header and value.lower() == header:
+            continue
+
+        yield value
+
+
+def read_batch(request, field, header, noun, event):
+    """
+    Lee el lote de un endpoint batch: CSV (primera columna, con `header` opcional)
+    o JSON (arreglo directo o {field: [...]}), con el límite BATCH_MAX_ITEMS.
+    Devuelve (items, None) o (None, error_response) con 400 (falta el campo o
+    lote vacío) o 413 (lote demasiado grande); `noun` nombra los elementos en
+    los mensajes y `event` es el evento del log de lote demasiado grande.
+    """
+    max_items = current_app.config["BATCH_MAX_ITEMS"]
+
+    if request.mimetype == "text/csv":
+        items = []
+        for item in iter_csv_column(request.stream, header=header):
+            items.append(item)
+            # Uno más que el máximo basta para responder 413 sin leer el resto
+            if len(items) > max_items:
+                break
+    else:
+        items = read_json_items(request.get_json(silent=True), field)
+
+        if items is None:
+            return None, error_response(f"Campo '{field}' es requerido (arreglo)", 400)
+
+    if not items:
+        return None, error_response(f"El lote de {noun} está vacío", 400)
+
+    if len(items) > max_items:
+        logger.warning({"event": event, "max_items": max_items})
+        return None, error_response(f"El lote no puede superar {max_items} {noun}", 413)
+
+    return items, None
+
+
+def iter_ndjson(stream, field):
+    # Un valor JSON por línea, leído del stream de la petición sin cargar el cuerpo
+    # completo; en objetos se toma `field`. Las líneas inválidas se entregan como
+    # INVALID_LINE para responderlas en su posición
+    for line in io.BufferedReader(stream):
+        line = line.strip()
+
+        if not line:
+            continue
+
+        try:
+            value = json.loads(line)
+        except ValueError:
+            yield INVALID_LINE
+            continue
+
+        yield value.get(field) if isinstance(value, dict) else value
@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.logger_config import logger
+
+
+class MicroBatcher:
+    """
+    Agrupa consultas concurrentes en una sola llamada al upstream.
+
+    - Singleflight: mientras una clave está en vuelo, las peticiones idénticas
+      reciben el mismo Future en lugar de generar otra llamada.
+    - Micro-batching: las claves distintas que llegan dentro de `window_ms`
+      se envían juntas (hasta `max_batch`) a `batch_fn(keys) -> {key: result}`.
+    """
+
+    def __init__(self, name, batch_fn, max_batch=10, window_ms=5, workers=4):
+        self.name = name
+        self._batch_fn = batch_fn
+        self._max_batch = max_batch
+        self._window = window_ms / 1000
+        self._workers = workers
+        self._queue = queue.Queue()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._collector = None
+        self._executor = None
+
+    def submit(self, key):
+        with self._lock:
+            future = self._inflight.get(key)
+
+            if future is not None:
+                return future
+
+            future = Future()
+            self._inflight[key] = future
+            self._ensure_started()
+
+        self._queue.put(key)
+        return future
+
+    def _ensure_started(self):
+        # Arranque perezoso: también funciona tras un fork del servidor WSGI
+        if self._collector is None or not self._collector.is_alive():
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix=f"{self.name}-batch")
+            self._collector = threading.Thread(target=self._collect, name=f"{self.name}-collector", daemon=True)
+            self._collector.start()
+
+    def _collect(self):
+        while True:
+            keys = [self._queue.get()]
+            deadline = time.monotonic() + self._window
+
+            while len(keys) < self._max_batch:
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+                    break
+
+                try:
+                    keys.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._executor.submit(self._dispatch, keys)
+
+    def _dispatch(self, keys):
+        try:
+            results = self._batch_fn(keys)
+            error = None
+
+            if not isinstance(results, dict):
+                raise TypeError(f"batch_fn devolvió {type(results).__name__}, se esperaba dict")
+        except Exception as e:
+            logger.error({"event": "micro_batch_error", "batcher": self.name, "size": len(keys), "detail": str(e)})
+            results, error = {}, e
+
+        for key in keys:
+            with self._lock:
+                future = self._inflight.pop(key)
+
+            if error is not None:
+                future.set_exception(error)
+            elif key not in results:
+                # batch_fn debe devolver todas las claves; la que falte falla sola
+                logger.error({"event": "micro_batch_missing_key", "batcher": self.name, "key": str(key)})
+                future.set_exception(LookupError(f"{self.name}: sin resultado para {key!r}"))
+            else:
+                future.set_result(results[key])
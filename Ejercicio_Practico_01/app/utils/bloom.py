@@ -0,0 +1,100 @@
+import hashlib
+import math
+import mmap
+import struct
+
+MAGIC = b"BLOOMv1\0"
+# magic, bits, funciones hash, elementos, flags
+HEADER = struct.Struct("<8sQQQQ")
+
+# Las claves son SHA-1 en hexadecimal mayúscula (formato de Pwned Passwords)
+FLAG_SHA1 = 1
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom de solo lectura respaldado por un archivo mapeado en memoria.
+
+    Se construye offline (build_breached_filter.py) y al arrancar solo se hace
+    mmap del archivo: no se carga en el heap y los workers de un mismo
+    servidor comparten las páginas. Cada consulta calcula un blake2b de la
+    clave y revisa `k` bits (doble hashing), sin red y en microsegundos.
+    Puede dar falsos positivos (tasa elegida al construirlo), nunca falsos
+    negativos.
+    """
+
+    def __init__(self, bits, m, k, n, flags=0):
+        self._bits = bits
+        self.m = m
+        self.k = k
+        self.n = n
+        self.flags = flags
+
+    @classmethod
+    def create(cls, n, fp_rate, flags=0):
+        n = max(1, n)
+        m = max(8, math.ceil(-n * math.log(fp_rate) / math.log(2) ** 2))
+        k = max(1, round(m / n * math.log(2)))
+        return cls(bytearray((m + 7) // 8), m, k, 0, flags)
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, m, k, n, flags = HEADER.unpack_from(mm)
+
+        if magic != MAGIC or len(mm) < HEADER.size + (m + 7) // 8:
+            mm.close()
+            raise ValueError(f"{path} no es un filtro de Bloom válido")
+
+        return cls(memoryview(mm)[HEADER.size:], m, k, n, flags)
+
+    def _key(self, item):
+        if self.flags & FLAG_SHA1:
+            return hashlib.sha1(item.encode("utf-8")).hexdigest().upper().encode()
+
+        return item.encode("utf-8")
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+
+        for i in range(self.k):
+            yield (h1 + i * h2) % self.m
+
+    def add(self, item):
+        self.add_key(self._key(item))
+
+    def add_key(self, key):
+        # `key` ya en el formato del filtro (p. ej. el hash SHA-1 de la lista)
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.n += 1
+
+    def __contains__(self, item):
+        bits = self._bits
+
+        # Un bit en cero basta para descartar: la mayoría de las consultas negativas
+        # terminan en el primero o segundo
+        for pos in self._positions(self._key(item)):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+
+        return True
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.m, self.k, self.n, self.flags))
+            f.write(self._bits)
+
+    def stats(self):
+        return {
+            "bits": self.m,
+            "hashes": self.k,
+            "items": self.n,
+            "bytes": (self.m + 7) // 8,
+            # Tasa de falsos positivos esperada con los elementos cargados
+            "fp_rate": (1 - math.exp(-self.k * self.n / self.m)) ** self.k
+        }
@@ -0,0 +1,217 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.logger_config import logger
+
+# Centinela para distinguir "no está en caché" de un valor None cacheado
+MISSING = object()
+
+
+class _Stripe:
+
+    def __init__(self, max_entries):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+
+class TTLCache:
+    """
+    LRU en memoria con TTL por entrada.
+
+    Las claves se reparten en varias franjas (stripes), cada una con su propio
+    lock, para que hilos concurrentes no compitan por un único candado.
+    Opcionalmente persiste en SQLite para que los resultados sobrevivan a un
+    reinicio; el archivo se limita a `persist_max_entries` filas (por defecto
+    las mismas que en memoria).
+
+    Con `stale_seconds` las entradas vencidas no se borran de inmediato:
+    `get` las trata como fallo, pero `get_stale` aún las devuelve durante ese
+    margen (para responder con datos viejos si el upstream no está disponible).
+    """
+
+    def __init__(self, name, max_entries=10000, stripes=16, persist_path=None, stale_seconds=0,
+                 persist_max_entries=None):
+        self.name = name
+        self.stale_seconds = stale_seconds
+        per_stripe = max(1, -(-max_entries // stripes))
+        self._stripes = [_Stripe(per_stripe) for _ in range(stripes)]
+        self._store = None
+
+        if persist_path:
+            self._store = _SQLiteTier(persist_path, name, persist_max_entries or max_entries, stale_seconds)
+
+    def _stripe(self, key):
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key):
+        stripe = self._stripe(key)
+        now = time.time()
+
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+
+            if entry is not None:
+                value, expires_at, expired = entry
+
+                if expires_at > now:
+                    stripe.entries.move_to_end(key)
+                    stripe.hits += 1
+                    return value
+
+                # Cada entrada vencida se cuenta una sola vez, aunque se conserve
+                # para get_stale y se vuelva a leer
+                if not expired:
+                    stripe.expirations += 1
+
+                if expires_at + self.stale_seconds <= now:
+                    del stripe.entries[key]
+                elif not expired:
+                    stripe.entries[key] = (value, expires_at, True)
+
+        # Segundo nivel: SQLite (fuera del lock de la franja)
+        if self._store is not None:
+            entry = self._store.get(key, now)
+
+            if entry is not None:
+                value, expires_at = entry
+                self._put(stripe, key, value, expires_at)
+                with stripe.lock:
+                    stripe.hits += 1
+                return value
+
+        with stripe.lock:
+            stripe.misses += 1
+
+        return MISSING
+
+    def get_stale(self, key):
+        # Valor aunque esté vencido, mientras siga dentro del margen stale_seconds
+        stripe = self._stripe(key)
+        oldest = time.time() - self.stale_seconds
+
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+
+            if entry is not None and entry[1] > oldest:
+                stripe.stale_hits += 1
+                return entry[0]
+
+        if self._store is not None:
+            entry = self._store.get(key, oldest)
+
+            if entry is not None:
+                with stripe.lock:
+                    stripe.stale_hits += 1
+                return entry[0]
+
+        return MISSING
+
+    def set(self, key, value, ttl):
+        expires_at = time.time() + ttl
+        self._put(self._stripe(key), key, value, expires_at)
+
+        if self._store is not None:
+            self._store.set(key, value, expires_at)
+
+    def _put(self, stripe, key, value, expires_at):
+        with stripe.lock:
+            stripe.entries[key] = (value, expires_at, False)
+            stripe.entries.move_to_end(key)
+
+            while len(stripe.entries) > stripe.max_entries:
+                stripe.entries.popitem(last=False)
+                stripe.evictions += 1
+
+    def stats(self):
+        stats = {"size": 0, "hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "stale_hits": 0}
+
+        for stripe in self._stripes:
+            with stripe.lock:
+                stats["size"] += len(stripe.entries)
+                stats["hits"] += stripe.hits
+                stats["misses"] += stripe.misses
+                stats["evictions"] += stripe.evictions
+                stats["expirations"] += stripe.expirations
+                stats["stale_hits"] += stripe.stale_hits
+
+        stats["persistent"] = self._store is not None
+        return stats
+
+
+class _SQLiteTier:
+    """
+    Segundo nivel persistente, limitado a `max_entries` filas.
+
+    Cada `max_entries // 10` escrituras (y al abrir) se borran las filas
+    vencidas y, si aún sobran, las que vencen antes: el archivo no pasa de
+    ~1,1 veces el límite sin contar filas en cada escritura.
+    """
+
+    def __init__(self, path, name, max_entries, stale_seconds=0):
+        self.table = "cache_" + "".join(c if c.isalnum() else "_" for c in name)
+        self.max_entries = max_entries
+        self.stale_seconds = stale_seconds
+        self.prune_every = max(1, max_entries // 10)
+        self.writes = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_expires ON {self.table} (expires_at)")
+        with self.lock:
+            self._prune()
+
+    def _prune(self):
+        # Llamar con self.lock tomado
+        self.conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time() - self.stale_seconds,))
+        excess = self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_entries
+
+        if excess > 0:
+            self.conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY expires_at LIMIT ?)",
+                (excess,)
+            )
+            logger.info({"event": "cache_sqlite_pruned", "table": self.table, "evicted": excess})
+
+    def get(self, key, now):
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    f"SELECT value, expires_at FROM {self.table} WHERE key = ? AND expires_at > ?",
+                    (str(key), now)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error({"event": "cache_sqlite_read_error", "table": self.table, "detail": str(e)})
+            return None
+
+        if row is None:
+            return None
+
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, expires_at):
+        try:
+            with self.lock:
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                    (str(key), json.dumps(value), expires_at)
+                )
+                self.writes += 1
+
+                if self.writes % self.prune_every == 0:
+                    self._prune()
+        except sqlite3.Error as e:
+            logger.error({"event": "cache_sqlite_write_error", "table": self.table, "detail": str(e)})
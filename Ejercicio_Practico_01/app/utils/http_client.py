@@ -0,0 +1,321 @@
+import asyncio
+import random
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ReadTimeout
+
+from app.config import Config
+from app.logger_config import logger
+from app.utils.metrics import Histogram
+from app.utils.resilience import AsyncBulkhead, Bulkhead, CircuitBreaker
+from app.utils.tracing import span
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRY_STATUSES = {502, 503, 504}
+
+
+class UpstreamClient:
+    """
+    Sesión HTTP con keep-alive para un upstream concreto.
+
+    Cada upstream tiene su propio pool de conexiones (con límite por host),
+    timeouts de conexión y lectura separados, reintentos con backoff y jitter
+    para métodos idempotentes e histograma de latencias.
+
+    Cada intento pasa por el circuit breaker del upstream (compartido con el
+    cliente async) y la petición completa ocupa un cupo del bulkhead, de
+    tamaño igual al pool.
+    """
+
+    def __init__(self, name, pool_size, connect_timeout, read_timeout, retries, backoff, breaker):
+        self.name = name
+        self.breaker = breaker
+        self.bulkhead = self._make_bulkhead(name, pool_size)
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.latency = Histogram()
+        self.requests = 0
+        self.errors = 0
+        self.retried = 0
+        self._lock = threading.Lock()
+
+        self.session = self._make_session(pool_size, connect_timeout, read_timeout)
+
+    def _make_session(self, pool_size, connect_timeout, read_timeout):
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _make_bulkhead(self, name, pool_size):
+        return Bulkhead(name, pool_size, Config.BULKHEAD_MAX_WAIT)
+
+    def request(self, method, url, idempotent=None, **kwargs):
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        kwargs.setdefault("timeout", self.timeout)
+        attempts = 1 + (self.retries if idempotent else 0)
+
+        with self.bulkhead:
+            for attempt in range(attempts):
+                # Con el circuito abierto se falla sin tocar la red
+                self.breaker.before_call()
+                start = time.perf_counter()
+
+                try:
+                    # Un span por intento: los reintentos quedan visibles en la traza
+                    with span(f"http_{self.name}"):
+                        response = self.session.request(method, url, **kwargs)
+
+                except ReadTimeout:
+                    # Reintentar una lectura lenta solo multiplicaría la espera
+                    self._record(start, error=True)
+                    raise
+
+                except ConnectionError as e:
+                    self._record(start, error=True)
+
+                    if attempt == attempts - 1:
+                        raise
+
+                    self._wait(attempt, str(e))
+                    continue
+
+                except Exception:
+                    # Cualquier otro fallo (cuerpo chunked roto, redirecciones...) también
+                    # cuenta: en semiabierto libera el cupo de prueba tomado en before_call
+                    self._record(start, error=True)
+                    raise
+
+                self._record(start, error=response.status_code >= 500)
+
+                if response.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+                    return response
+
+                self._wait(attempt, f"HTTP {response.status_code}")
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def _record(self, start, error):
+        self.latency.observe(time.perf_counter() - start)
+        self.breaker.record(not error)
+
+        with self._lock:
+            self.requests += 1
+            if error:
+                self.errors += 1
+
+    def _wait(self, attempt, reason):
+        time.sleep(self._retry_delay(attempt, reason))
+
+    def _retry_delay(self, attempt, reason):
+        # Backoff exponencial con jitter completo
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+
+        with self._lock:
+            self.retried += 1
+
+        logger.warning({
+            "event": "upstream_retry",
+            "upstream": self.name,
+            "attempt": attempt + 1,
+            "delay_s": round(delay, 3),
+            "reason": reason
+        })
+
+        return delay
+
+    def stats(self):
+        with self._lock:
+            counters = {"requests": self.requests, "errors": self.errors, "retries": self.retried}
+
+        return {**counters, "latency_seconds": self.latency.snapshot(), "bulkhead": self.bulkhead.stats()}
+
+
+class AsyncUpstreamClient(UpstreamClient):
+    """
+    Variante asíncrona (httpx) para el punto de entrada ASGI.
+
+    Mismo contrato que UpstreamClient: pool acotado por upstream, timeouts de
+    conexión y lectura, reintentos con jitter solo para métodos idempotentes y
+    las mismas métricas. La espera de red no ocupa un hilo: la concurrencia
+    queda limitada por los sockets del pool (`<NAME>_POOL_SIZE`).
+    """
+
+    def _make_session(self, pool_size, connect_timeout, read_timeout):
+        return ShardedAsyncClient(
+            pool_size,
+            Config.ASYNC_HTTP_SHARD_SIZE,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=connect_timeout + read_timeout)
+        )
+
+    def _make_bulkhead(self, name, pool_size):
+        return AsyncBulkhead(name, pool_size, Config.BULKHEAD_MAX_WAIT)
+
+    async def request(self, method, url, idempotent=None, **kwargs):
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        attempts = 1 + (self.retries if idempotent else 0)
+
+        async with self.bulkhead:
+            for attempt in range(attempts):
+                self.breaker.before_call()
+                start = time.perf_counter()
+
+                try:
+                    with span(f"http_{self.name}"):
+                        response = await self.session.request(method, url, **kwargs)
+
+                except httpx.ReadTimeout:
+                    # Reintentar una lectura lenta solo multiplicaría la espera
+                    self._record(start, error=True)
+                    raise
+
+                except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError) as e:
+                    self._record(start, error=True)
+
+                    if attempt == attempts - 1:
+                        raise
+
+                    await asyncio.sleep(self._retry_delay(attempt, str(e)))
+                    continue
+
+                except (Exception, asyncio.CancelledError):
+                    # Igual que en el cliente síncrono; una cancelación también libera el cupo de prueba
+                    self._record(start, error=True)
+                    raise
+
+                self._record(start, error=response.status_code >= 500)
+
+                if response.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+                    return response
+
+                await asyncio.sleep(self._retry_delay(attempt, f"HTTP {response.status_code}"))
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        await self.session.aclose()
+
+
+class ShardedAsyncClient:
+    """
+    Pool async repartido en varios httpx.AsyncClient de hasta `shard_size`
+    conexiones. httpcore recorre todas las conexiones del pool (y, por cada
+    conexión libre, otra vez todas) cada vez que entra o sale una petición:
+    con 100 conexiones en un solo cliente ese trabajo era la mayor parte de la
+    CPU por petición. Cada petición va al cliente con menos peticiones en curso.
+    """
+
+    def __init__(self, pool_size, shard_size, **kwargs):
+        shards = max(1, -(-pool_size // shard_size))
+        per_shard = -(-pool_size // shards)
+        limits = httpx.Limits(max_connections=per_shard, max_keepalive_connections=per_shard)
+
+        self.clients = [httpx.AsyncClient(limits=limits, **kwargs) for _ in range(shards)]
+        # Solo se modifica desde el event loop
+        self.inflight = [0] * shards
+
+    async def request(self, method, url, **kwargs):
+        shard = self.inflight.index(min(self.inflight))
+        self.inflight[shard] += 1
+
+        try:
+            return await self.clients[shard].request(method, url, **kwargs)
+        finally:
+            self.inflight[shard] -= 1
+
+    async def aclose(self):
+        for client in self.clients:
+            await client.aclose()
+
+
+_clients = {}
+_breakers = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name):
+    return _get_or_create(name, UpstreamClient, breaker=name)
+
+
+def get_async_client(name):
+    # Registrado como "<name>_async" para distinguirlo en /metrics; comparte el breaker del upstream
+    return _get_or_create(f"{name}_async", AsyncUpstreamClient, prefix=name.upper(),
+                          pool_size=Config.ASYNC_HTTP_POOL_SIZE, breaker=name)
+
+
+def get_breaker(name):
+    with _clients_lock:
+        return _get_breaker(name)
+
+
+def _get_breaker(name):
+    # Llamar con _clients_lock tomado
+    breaker = _breakers.get(name)
+
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name,
+            window_size=Config.CIRCUIT_WINDOW_SIZE,
+            window_seconds=Config.CIRCUIT_WINDOW_SECONDS,
+            min_calls=Config.CIRCUIT_MIN_CALLS,
+            failure_rate=Config.CIRCUIT_FAILURE_RATE,
+            open_seconds=Config.CIRCUIT_OPEN_SECONDS,
+            half_open_calls=Config.CIRCUIT_HALF_OPEN_CALLS
+        )
+        _breakers[name] = breaker
+
+    return breaker
+
+
+async def close_async_clients():
+    with _clients_lock:
+        clients = [c for c in _clients.values() if isinstance(c, AsyncUpstreamClient)]
+
+    for client in clients:
+        await client.aclose()
+
+
+def _get_or_create(name, client_class, breaker, prefix=None, pool_size=None):
+    # Configuración por upstream: <NAME>_POOL_SIZE, <NAME>_CONNECT_TIMEOUT, <NAME>_READ_TIMEOUT
+    with _clients_lock:
+        client = _clients.get(name)
+
+        if client is None:
+            prefix = prefix or name.upper()
+            client = client_class(
+                name,
+                pool_size=pool_size or getattr(Config, f"{prefix}_POOL_SIZE"),
+                connect_timeout=getattr(Config, f"{prefix}_CONNECT_TIMEOUT"),
+                read_timeout=getattr(Config, f"{prefix}_READ_TIMEOUT"),
+                retries=Config.HTTP_RETRIES,
+                backoff=Config.HTTP_RETRY_BACKOFF,
+                breaker=_get_breaker(breaker)
+            )
+            _clients[name] = client
+
+        return client
+
+
+def upstream_stats():
+    with _clients_lock:
+        clients = dict(_clients)
+
+    return {name: client.stats() for name, client in clients.items()}
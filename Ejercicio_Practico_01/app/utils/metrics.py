@@ -0,0 +1,172 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+# Límites superiores (segundos) de los buckets de latencia
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+
+        # Conteos acumulados por límite superior, como en Prometheus (le="...")
+        cumulative, running = {}, 0
+
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+
+        return {"buckets": cumulative, "count": running, "sum": round(total, 6)}
+
+
+class _Shard:
+
+    def __init__(self, size):
+        self.size = size
+        self.series = {}
+        self.inflight = defaultdict(int)
+
+    def histogram(self, key):
+        series = self.series.get(key)
+
+        if series is None:
+            # [conteos por bucket..., suma en ns]
+            series = self.series[key] = [0] * (self.size + 1)
+
+        return series
+
+    def merge_into(self, other):
+        # list(...) copia de una vez: el hilo dueño puede estar agregando series
+        for key, series in list(self.series.items()):
+            target = other.histogram(key)
+            for i, value in enumerate(list(series)):
+                target[i] += value
+
+        for key, value in list(self.inflight.items()):
+            other.inflight[key] += value
+
+
+class ThreadShardedHistograms:
+    """
+    Histogramas por serie (tupla de etiquetas) sin locks en el camino caliente.
+
+    Cada hilo escribe solo en su propio shard (threading.local); el lock se toma
+    únicamente al registrar un hilo nuevo y al leer. Los shards de hilos que ya
+    terminaron se pliegan en un acumulado para que la lista no crezca sin límite
+    con servidores que crean un hilo por petición.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._bounds_ns = [int(b * 1e9) for b in self.buckets]
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard(len(self.buckets) + 1)
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+
+        if shard is None:
+            shard = self._local.shard = _Shard(len(self.buckets) + 1)
+
+            with self._lock:
+                self._fold_dead()
+                self._shards.append((threading.current_thread(), shard))
+
+        return shard
+
+    def _fold_dead(self):
+        alive = []
+
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                shard.merge_into(self._retired)
+
+        self._shards = alive
+
+    def observe_ns(self, key, elapsed_ns):
+        series = self._shard().histogram(key)
+        series[bisect_left(self._bounds_ns, elapsed_ns)] += 1
+        series[-1] += elapsed_ns
+
+    def track_inflight(self, key, delta):
+        self._shard().inflight[key] += delta
+
+    def snapshot(self):
+        with self._lock:
+            self._fold_dead()
+            total = _Shard(len(self.buckets) + 1)
+            self._retired.merge_into(total)
+
+            for _, shard in self._shards:
+                shard.merge_into(total)
+
+        histograms = {}
+
+        for key, series in total.series.items():
+            cumulative, running = {}, 0
+
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                running += count
+                cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+
+            histograms[key] = {"buckets": cumulative, "count": running, "sum": round(series[-1] / 1e9, 6)}
+
+        return histograms, dict(total.inflight)
+
+
+def render_prometheus(families):
+    """
+    Formato de texto de Prometheus.
+
+    `families` es una lista de (nombre, tipo, ayuda, muestras) con muestras
+    (etiquetas, valor); para los histogramas el valor es un snapshot con
+    buckets/count/sum.
+    """
+    lines = []
+
+    for name, kind, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+        for labels, value in samples:
+            if kind == "histogram":
+                for bound, count in value["buckets"].items():
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {value['sum']}")
+                lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+
+    escaped = (
+        f'{k}="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
@@ -0,0 +1,178 @@
+import os
+import sys
+import threading
+import time
+import zlib
+from html import escape
+
+TRUNCATED = "[otros]"
+
+
+class SamplingProfiler:
+    """
+    Profiler por muestreo para producción.
+
+    Un hilo de fondo toma cada `interval_ms` los frames de los hilos que están
+    atendiendo una petición (sys._current_frames) y acumula las pilas en formato
+    "collapsed" (raíz;...;hoja -> conteo).
+
+    El costo está acotado de tres formas: profundidad máxima de pila, número
+    máximo de pilas distintas (el resto se suma en "[otros]") y un presupuesto
+    de CPU: si un muestreo tarda más que `max_overhead` del intervalo, el
+    siguiente se espacia en proporción.
+    """
+
+    def __init__(self, interval_ms=10, max_depth=64, max_stacks=5000, max_overhead=0.01):
+        self.interval = interval_ms / 1000
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.max_overhead = max_overhead
+        self._active = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._started_at = None
+        self.samples = 0
+        self.sampling_seconds = 0.0
+
+    # Llamados por el middleware al entrar/salir de cada petición. Se cuentan por hilo:
+    # el event loop de app/asgi.py atiende varias peticiones a la vez en el mismo hilo
+    def enter(self):
+        ident = threading.get_ident()
+
+        with self._lock:
+            self._active[ident] = self._active.get(ident, 0) + 1
+
+    def exit(self):
+        ident = threading.get_ident()
+
+        with self._lock:
+            count = self._active.pop(ident, 0) - 1
+
+            if count > 0:
+                self._active[ident] = count
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        own = threading.get_ident()
+
+        while True:
+            start = time.perf_counter()
+            active = set(self._active)
+            stacks = [
+                self._collapse(frame)
+                for ident, frame in sys._current_frames().items()
+                if ident != own and ident in active
+            ]
+
+            with self._lock:
+                for stack in stacks:
+                    if stack not in self._counts and len(self._counts) >= self.max_stacks:
+                        stack = TRUNCATED
+                    self._counts[stack] = self._counts.get(stack, 0) + 1
+
+                self.samples += 1
+                cost = time.perf_counter() - start
+                self.sampling_seconds += cost
+
+            time.sleep(max(self.interval, cost / self.max_overhead))
+
+    def _collapse(self, frame):
+        names = []
+
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+
+        return ";".join(reversed(names))
+
+    def collapsed(self, reset=False):
+        with self._lock:
+            counts = self._counts
+
+            if reset:
+                self._counts = {}
+
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+    def stats(self):
+        with self._lock:
+            elapsed = time.time() - self._started_at if self._started_at else 0
+            return {
+                "running": self.running,
+                "interval_ms": self.interval * 1000,
+                "samples": self.samples,
+                "stacks": len(self._counts),
+                "sampling_seconds": round(self.sampling_seconds, 6),
+                # Fracción de un núcleo usada por el propio muestreo
+                "overhead_ratio": round(self.sampling_seconds / elapsed, 6) if elapsed else 0.0
+            }
+
+
+def flamegraph_svg(collapsed, width=1200, row_height=16, title="Flame graph"):
+    # Árbol de conteos a partir de las líneas "a;b;c N"
+    root = {"name": "all", "count": 0, "children": {}}
+
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack:
+            continue
+
+        count = int(count)
+        node = root
+        node["count"] += count
+
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"name": name, "count": 0, "children": {}})
+            node["count"] += count
+
+    rects = []
+
+    def layout(node, x, depth):
+        rects.append((node, x, depth))
+        for child in sorted(node["children"].values(), key=lambda n: n["name"]):
+            layout(child, x, depth + 1)
+            x += child["count"]
+
+    layout(root, 0, 0)
+
+    total = root["count"] or 1
+    depth_max = max(depth for _, _, depth in rects) + 1
+    height = (depth_max + 2) * row_height
+    scale = width / total
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">',
+        f'<text x="4" y="{row_height - 4}">{escape(title)} ({root["count"]} muestras)</text>'
+    ]
+
+    for node, x, depth in rects:
+        w = node["count"] * scale
+
+        if w < 0.5:
+            continue
+
+        # La raíz abajo, como en los flame graphs clásicos
+        y = height - (depth + 1) * row_height
+        hue = zlib.crc32(node["name"].encode()) % 60
+        label = f'{node["name"]} ({node["count"]}, {100 * node["count"] / total:.1f}%)'
+        text = node["name"][:int(w / 7)] if w > 30 else ""
+        parts.append(
+            f'<g><title>{escape(label)}</title>'
+            f'<rect x="{x * scale:.2f}" y="{y}" width="{w:.2f}" height="{row_height - 1}" '
+            f'fill="hsl({hue},85%,60%)"/>'
+            f'<text x="{x * scale + 3:.2f}" y="{y + row_height - 4}">{escape(text)}</text></g>'
+        )
+
+    parts.append("</svg>")
+    return "\n".join(parts)
@@ -0,0 +1,212 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+from app.logger_config import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Valor numérico del estado para /metrics
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class UpstreamUnavailable(Exception):
+    """El upstream no se llamó: circuito abierto o sin cupo de concurrencia."""
+
+    def __init__(self, upstream, reason):
+        super().__init__(f"{upstream}: {reason}")
+        self.upstream = upstream
+        self.reason = reason
+
+
+class CircuitOpenError(UpstreamUnavailable):
+
+    def __init__(self, upstream):
+        super().__init__(upstream, "circuito abierto")
+
+
+class BulkheadFullError(UpstreamUnavailable):
+
+    def __init__(self, upstream):
+        super().__init__(upstream, "límite de concurrencia alcanzado")
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por upstream (cerrado / abierto / semiabierto).
+
+    - Cerrado: se registran los resultados de las llamadas en una ventana de
+      las últimas `window_size` llamadas dentro de `window_seconds`. Si hay al
+      menos `min_calls` y la tasa de fallos llega a `failure_rate`, se abre.
+    - Abierto: las llamadas fallan de inmediato (CircuitOpenError) durante
+      `open_seconds`.
+    - Semiabierto: se dejan pasar hasta `half_open_calls` llamadas de prueba.
+      Si todas salen bien se cierra; un solo fallo lo vuelve a abrir.
+    """
+
+    def __init__(self, name, window_size=20, window_seconds=60, min_calls=10,
+                 failure_rate=0.5, open_seconds=30, half_open_calls=3):
+        self.name = name
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self.opened = 0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        # Lanza CircuitOpenError si la llamada no debe salir
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN)
+
+            if self.state == CLOSED:
+                return
+
+            if self.state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return
+
+            self.rejected += 1
+
+        raise CircuitOpenError(self.name)
+
+    def is_open(self):
+        with self._lock:
+            return self.state == OPEN and time.monotonic() - self._opened_at < self.open_seconds
+
+    def record(self, success):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if not success:
+                    self._transition(OPEN)
+                    return
+
+                self._probe_successes += 1
+
+                if self._probe_successes >= self.half_open_calls:
+                    self._transition(CLOSED)
+                return
+
+            if self.state == OPEN:
+                # Respuesta tardía de una llamada que salió antes de abrir
+                return
+
+            now = time.monotonic()
+            self._outcomes.append((now, success))
+
+            while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+                self._outcomes.popleft()
+
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._transition(OPEN)
+
+    def _transition(self, state):
+        logger.warning({
+            "event": "circuit_state_change",
+            "upstream": self.name,
+            "from": self.state,
+            "to": state,
+            "failures": sum(1 for _, ok in self._outcomes if not ok),
+            "calls": len(self._outcomes)
+        })
+
+        self.state = state
+        self._outcomes.clear()
+        self._probes = 0
+        self._probe_successes = 0
+
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self.opened += 1
+
+    def stats(self):
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+
+            return {
+                "state": self.state,
+                "failure_rate": failures / calls if calls else 0.0,
+                "calls": calls,
+                "opened": self.opened,
+                "rejected": self.rejected
+            }
+
+
+class Bulkhead:
+    """
+    Límite de llamadas concurrentes a un upstream.
+
+    Un hilo espera como máximo `max_wait` segundos por un cupo; si no lo
+    obtiene, falla con BulkheadFullError en lugar de quedarse bloqueado en el
+    pool de conexiones mientras el upstream está lento.
+    """
+
+    def __init__(self, name, max_concurrent, max_wait):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.in_use = 0
+        self.rejected = 0
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        if not self._semaphore.acquire(timeout=self.max_wait):
+            self._count_rejected()
+            raise BulkheadFullError(self.name)
+
+        self._count_in_use(1)
+        return self
+
+    def __exit__(self, *exc):
+        self._count_in_use(-1)
+        self._semaphore.release()
+
+    def _count_in_use(self, delta):
+        with self._lock:
+            self.in_use += delta
+
+    def _count_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def stats(self):
+        with self._lock:
+            return {"limit": self.max_concurrent, "in_use": self.in_use, "rejected": self.rejected}
+
+
+class AsyncBulkhead(Bulkhead):
+    # Misma política para corrutinas: el semáforo es de asyncio, no bloquea el event loop
+
+    def __init__(self, name, max_concurrent, max_wait):
+        super().__init__(name, max_concurrent, max_wait)
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def __aenter__(self):
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self._count_rejected()
+            raise BulkheadFullError(self.name)
+
+        self._count_in_use(1)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._count_in_use(-1)
+        self._semaphore.release()
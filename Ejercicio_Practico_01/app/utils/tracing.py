@@ -0,0 +1,122 @@
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_request_context
+from flask_jwt_extended import verify_jwt_in_request
+
+
+class Span:
+
+    __slots__ = ("name", "start_ns", "end_ns", "children")
+
+    def __init__(self, name):
+        self.name = name
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+        self.children = []
+
+    @property
+    def duration_ns(self):
+        return (self.end_ns or time.perf_counter_ns()) - self.start_ns
+
+    def to_dict(self, origin_ns):
+        return {
+            "name": self.name,
+            "start_ms": round((self.start_ns - origin_ns) / 1e6, 3),
+            "duration_ms": round(self.duration_ns / 1e6, 3),
+            "children": [child.to_dict(origin_ns) for child in self.children]
+        }
+
+
+def start_trace(request_id, name="request"):
+    g.request_id = request_id
+    g.trace_root = Span(name)
+    g.trace_stack = [g.trace_root]
+
+
+def new_request_id():
+    return uuid.uuid4().hex
+
+
+@contextmanager
+def span(name):
+    # Fuera de una petición (hilos de fondo, scripts) no se mide nada
+    stack = g.get("trace_stack") if has_request_context() else None
+
+    if stack is None:
+        yield None
+        return
+
+    node = Span(name)
+    stack[-1].children.append(node)
+    stack.append(node)
+
+    try:
+        yield node
+    finally:
+        node.end_ns = time.perf_counter_ns()
+        stack.pop()
+
+
+def traced(name=None):
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def verify_jwt(optional=False, fresh=False, refresh=False, locations=None, verify_type=True):
+    # verify_jwt_in_request en su propio span; también lo usan las rutas nativas de app/asgi.py
+    with span("jwt"):
+        verify_jwt_in_request(optional, fresh, refresh, locations, verify_type)
+
+
+def jwt_required(optional=False, fresh=False, refresh=False, locations=None, verify_type=True):
+    """
+    Igual que flask_jwt_extended.jwt_required, pero la verificación del token
+    queda en su propio span ("jwt") en lugar de mezclarse con la vista.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt(optional, fresh, refresh, locations, verify_type)
+
+            return current_app.ensure_sync(fn)(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _metric_name(name):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+
+
+def server_timing():
+    # Duración acumulada por nombre de span, en el orden en que aparecieron
+    totals = {}
+    pending = list(g.trace_root.children)
+
+    while pending:
+        node = pending.pop(0)
+        totals[node.name] = totals.get(node.name, 0) + node.duration_ns
+        pending.extend(node.children)
+
+    parts = [f"{_metric_name(name)};dur={ns / 1e6:.3f}" for name, ns in totals.items()]
+    parts.append(f"total;dur={g.trace_root.duration_ns / 1e6:.3f}")
+
+    return ", ".join(parts)
+
+
+def trace_tree():
+    root = g.trace_root
+    return root.to_dict(root.start_ns)
@@ -1,7 +1,10 @@
 import ipaddress
+import numpy as np
 from app.logger_config import logger
 from datetime import datetime, timezone
+from app.utils.tracing import traced
 
+@traced()
 def validate_ip(ip_str: str):
     try:
         if not ip_str:
@@ -41,6 +44,7 @@ def validate_ip(ip_str: str):
         })
         return False, "Error interno al validar IP"
     
+@traced()
 def calculate_age(birthdate_str: str):
     try:
         if not birthdate_str:
@@ -77,8 +81,9 @@ def calculate_age(birthdate_str: str):
             months -= 1
             previous_month = (today.month - 1) or 12
             previous_year = today.year if today.month != 1 else today.year - 1
+            # Del 1 del mes anterior al 1 del mes actual (en enero, diciembre del año anterior)
             last_day_previous_month = (
-                datetime(previous_year, previous_month + 1, 1, tzinfo=timezone.utc)
+                datetime(today.year, today.month, 1, tzinfo=timezone.utc)
                 - datetime(previous_year, previous_month, 1, tzinfo=timezone.utc)
             ).days
             days += last_day_previous_month
@@ -112,6 +117,7 @@ def calculate_age(birthdate_str: str):
         })
         return False, "Error interno al calcular edad"
     
+@traced()
 def validate_ecuadorian_identification(identification: str):
     try:
         if not identification:
@@ -180,4 +186,184 @@ def validate_ecuadorian_identification(identification: str):
             "event": "cedula_validation_error",
             "detail": str(e)
         })
-        return False, "Error interno al validar cédula"
\ No newline at end of file
+        return False, "Error interno al validar cédula"
+
+# ==============================
+# VALIDACIÓN DE CÉDULAS POR LOTE
+# ==============================
+
+COEFICIENTES_CEDULA = np.array([2, 1, 2, 1, 2, 1, 2, 1, 2], dtype=np.uint8)
+
+
+def _cedula_precheck(identification):
+    # Mismas reglas y mensajes que validate_ecuadorian_identification,
+    # para las filas que no pasan por la matriz de dígitos
+    if not identification:
+        return False, "La cédula es obligatoria"
+
+    if not isinstance(identification, str):
+        return False, "Error interno al validar cédula"
+
+    if not identification.isdigit():
+        return False, "La cédula debe contener solo números"
+
+    if len(identification) != 10:
+        return False, "La cédula debe tener 10 dígitos"
+
+    # Dígitos no ASCII (p. ej. arábigo-índicos): caso raro, se usa el validador escalar
+    return validate_ecuadorian_identification(identification)
+
+
+@traced()
+def validate_ecuadorian_identifications(identifications):
+    results = [None] * len(identifications)
+
+    # Filas aptas para el cálculo vectorizado: 10 dígitos ASCII
+    fast = []
+    for i, value in enumerate(identifications):
+        if isinstance(value, str) and len(value) == 10 and value.isascii() and value.isdigit():
+            fast.append(i)
+        else:
+            results[i] = _cedula_precheck(value)
+
+    if fast:
+        raw = "".join(identifications[i] for i in fast).encode("ascii")
+        digits = (np.frombuffer(raw, dtype=np.uint8) - ord("0")).reshape(-1, 10)
+
+        provincia = digits[:, 0].astype(np.int16) * 10 + digits[:, 1]
+        invalid_province = (provincia < 1) | (provincia > 24)
+        invalid_third = digits[:, 2] >= 6
+
+        productos = digits[:, :9] * COEFICIENTES_CEDULA
+        productos = np.where(productos > 9, productos - 9, productos)
+        verificador = (10 - productos.sum(axis=1, dtype=np.int16) % 10) % 10
+        invalid_verifier = verificador != digits[:, 9]
+
+        for row, i in enumerate(fast):
+            if invalid_province[row]:
+                results[i] = (False, "Código de provincia inválido")
+            elif invalid_third[row]:
+                results[i] = (False, "Tercer dígito inválido")
+            elif invalid_verifier[row]:
+                results[i] = (False, "Dígito verificador incorrecto")
+            else:
+                results[i] = (True, {"valida": True, "provincia": int(provincia[row])})
+
+    return results
+
+
+
+# ==============================
+# CÁLCULO DE EDAD POR LOTE
+# ==============================
+
+# Posiciones de los dígitos en "YYYY-MM-DD"
+_DATE_DIGITS = np.array([0, 1, 2, 3, 5, 6, 8, 9])
+_DATE_WEIGHTS = np.array([1000, 100, 10, 1, 10, 1, 10, 1], dtype=np.int32)
+
+
+def _birthdate_precheck(birthdate):
+    # Mismas reglas y mensajes que calculate_age, para las filas que no
+    # pasan por el cálculo vectorizado
+    if not birthdate:
+        return False, "La fecha de nacimiento es obligatoria"
+
+    if not isinstance(birthdate, str):
+        return False, "Error interno al calcular edad"
+
+    try:
+        datetime.strptime(birthdate, "%Y-%m-%d")
+    except ValueError:
+        return False, "Formato inválido. Use YYYY-MM-DD"
+
+    # Formas que strptime también acepta (p. ej. "2000-5-1"): se usa la función escalar
+    return calculate_age(birthdate)
+
+
+@traced()
+def calculate_ages(birthdates):
+    results = [None] * len(birthdates)
+
+    # Un solo "hoy" para todo el lote
+    today = datetime.now(timezone.utc)
+
+    # Filas aptas para el cálculo vectorizado: 10 caracteres ASCII
+    fast = []
+    for i, value in enumerate(birthdates):
+        if isinstance(value, str) and len(value) == 10 and value.isascii():
+            fast.append(i)
+        else:
+            results[i] = _birthdate_precheck(value)
+
+    if not fast:
+        return results
+
+    raw = "".join(birthdates[i] for i in fast).encode("ascii")
+    chars = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 10)
+    digits = chars[:, _DATE_DIGITS].astype(np.int32) - ord("0")
+
+    canonical = (
+        (chars[:, 4] == ord("-")) & (chars[:, 7] == ord("-"))
+        & ((digits >= 0) & (digits <= 9)).all(axis=1)
+    )
+
+    weighted = digits * _DATE_WEIGHTS
+    years = weighted[:, :4].sum(axis=1)
+    months = weighted[:, 4:6].sum(axis=1)
+    days = weighted[:, 6:].sum(axis=1)
+
+    valid = canonical & (years >= 1) & (months >= 1) & (months <= 12) & (days >= 1)
+
+    # Todas las fechas a datetime64[D] de una vez; las inválidas se calculan
+    # sobre el 1 de enero de 1970 y luego se descartan
+    month_start = np.where(valid, (years - 1970) * 12 + months - 1, 0).astype("datetime64[M]")
+    first_day = month_start.astype("datetime64[D]")
+    month_length = ((month_start + 1).astype("datetime64[D]") - first_day).astype(np.int32)
+
+    valid &= days <= month_length
+    birth = first_day + np.where(valid, days - 1, 0)
+    future = birth > np.datetime64(today.date(), "D")
+
+    # Misma aritmética que calculate_age, contra el mismo "hoy"
+    previous_month = np.datetime64(today.date(), "M") - 1
+    previous_month_length = int(
+        ((previous_month + 1).astype("datetime64[D]") - previous_month.astype("datetime64[D]")).astype(np.int64)
+    )
+
+    age_years = today.year - years
+    age_months = today.month - months
+    age_days = today.day - days
+
+    borrow_day = age_days < 0
+    age_months -= borrow_day
+    age_days += borrow_day * previous_month_length
+
+    borrow_month = age_months < 0
+    age_years -= borrow_month
+    age_months += borrow_month * 12
+
+    # El armado de cada resultado recorre listas de Python (indexar arreglos fila a fila es lento)
+    rows = zip(
+        fast, canonical.tolist(), valid.tolist(), future.tolist(),
+        age_years.tolist(), age_months.tolist(), age_days.tolist()
+    )
+
+    for i, is_canonical, is_valid, is_future, edad, meses, dias in rows:
+        if not is_canonical:
+            results[i] = _birthdate_precheck(birthdates[i])
+        elif not is_valid:
+            results[i] = (False, "Formato inválido. Use YYYY-MM-DD")
+        elif is_future:
+            results[i] = (False, "La fecha no puede ser futura")
+        else:
+            results[i] = (True, {
+                "edad": edad,
+                "detalle": {
+                    "anios": edad,
+                    "meses": meses,
+                    "dias": dias
+                },
+                "mayor_edad": edad >= 18
+            })
+
+    return results
@@ -0,0 +1,10 @@
+from app import create_app
+from app.asgi import create_asgi_app, wsgi_bridge
+
+app = create_app()
+
+# uvicorn asgi:application --host 0.0.0.0 --port 8000
+application = create_asgi_app(app)
+
+# Solo Flask en el pool de hilos (sin rutas nativas), para comparar en bench_async.py
+wsgi_application = wsgi_bridge(app)
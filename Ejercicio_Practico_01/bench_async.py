@@ -0,0 +1,139 @@
+# Prueba de carga: rutas atadas a upstream lento, Flask (hilos) vs ASGI nativo (event loop).
+#   python bench_async.py [concurrencia] [segundos] [retardo_upstream_s]
+#
+# Levanta un upstream de geolocalización falso con retardo fijo y, para cada modo, un
+# uvicorn con la app: "wsgi" = solo Flask en un pool fijo de hilos, "asgi" =
+# punto de entrada con las rutas nativas. Mide el throughput de /api/geo/localizar-ip
+# y la latencia de /api/identity/verificar-cedula (CPU) durante la carga.
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+USER, PASSWORD = "bench", "bench"
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_upstream(delay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = json.dumps({"success": True, "country": "Ecuador", "region": "Pichincha", "city": "Quito",
+                               "latitude": -0.18, "longitude": -78.47, "timezone": {"id": "America/Guayaquil"}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    server = Server(("127.0.0.1", free_port()), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def start_api(target, upstream_port, workdir):
+    port = free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "JWT_SECRET_KEY": "bench-secret-key-with-enough-length!!",
+        "AUTH_USERNAME": USER,
+        "AUTH_PASSWORD": PASSWORD,
+        "IP_GEO_URL": f"http://127.0.0.1:{upstream_port}/geo",
+        "GEO_CACHE_DB": os.path.join(workdir, "geo_cache.db"),
+        "TRANSLATION_MEMORY_DB": os.path.join(workdir, "tm.db"),
+        "HTTP_RETRIES": "0",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"asgi:{target}", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/docs/apispec.json", timeout=1)
+            return proc, port
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("la API no arrancó")
+
+async def load(port, concurrency, seconds):
+    base = f"http://127.0.0.1:{port}"
+    # Un cliente de una conexión por worker: un único pool grande de httpx gasta
+    # más CPU en su contabilidad que la propia API y falsea la medición
+    clients = [httpx.AsyncClient(base_url=base, limits=httpx.Limits(max_connections=1), timeout=60)
+               for _ in range(concurrency + 1)]
+    try:
+        client = clients[-1]
+        token = (await client.post("/api/auth/login", json={"username": USER, "password": PASSWORD})).json()["data"]["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        deadline = time.perf_counter() + seconds
+        done, counter, cedula = [0], [0], []
+
+        async def geo_worker(client):
+            while time.perf_counter() < deadline:
+                # IP distinta en cada petición para no acertar en la caché
+                counter[0] += 1
+                n = counter[0]
+                ip = f"8.{n // 65536 % 256}.{n // 256 % 256}.{n % 256}"
+                r = await client.post("/api/geo/localizar-ip", json={"ip": ip}, headers=headers)
+                if r.status_code == 200 and r.json().get("is_success"):
+                    done[0] += 1
+
+        async def cedula_worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                await client.post("/api/identity/verificar-cedula", json={"cedula": "1710034065"}, headers=headers)
+                cedula.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        start = time.perf_counter()
+        await asyncio.gather(cedula_worker(), *(geo_worker(c) for c in clients[:concurrency]))
+        elapsed = time.perf_counter() - start
+    finally:
+        for c in clients:
+            await c.aclose()
+
+    cedula.sort()
+    pct = lambda p: cedula[min(len(cedula) - 1, int(len(cedula) * p))] * 1000 if cedula else float("nan")
+    return done[0] / elapsed, pct(0.5), pct(0.99)
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    delay = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+
+    upstream = start_upstream(delay)
+    print(f"concurrencia={concurrency}  duración={seconds}s  retardo upstream={delay * 1000:.0f} ms")
+
+    for mode, target in (("wsgi", "wsgi_application"), ("asgi", "application")):
+        with tempfile.TemporaryDirectory() as workdir:
+            proc, port = start_api(target, upstream.server_address[1], workdir)
+            try:
+                rps, p50, p99 = asyncio.run(load(port, concurrency, seconds))
+            finally:
+                proc.terminate()
+                proc.wait()
+        print(f"  {mode}: localizar-ip {rps:7.1f} req/s   verificar-cedula p50={p50:7.1f} ms  p99={p99:7.1f} ms")
+
+    upstream.shutdown()
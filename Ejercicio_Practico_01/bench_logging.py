@@ -0,0 +1,96 @@
+# Benchmark del costo de logging por petición: FileHandler síncrono vs cola + hilo escritor.
+#   python bench_logging.py [peticiones] [eventos_por_peticion] [hilos]
+import json
+import logging
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueListener
+from zoneinfo import ZoneInfo
+
+from app.logger_config import DictQueueHandler, JsonFormatter
+
+class LegacyJsonFormatter(logging.Formatter):
+    # Formateador anterior: ZoneInfo por registro y str() del dict
+    def format(self, record):
+        return json.dumps({
+            "timestamp": datetime.now(ZoneInfo("America/Guayaquil")).isoformat(),
+            "level": record.levelname,
+            "message": record.getMessage()
+        })
+
+def make_logger(name, handler):
+    log = logging.getLogger(name)
+    log.handlers.clear()
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.addHandler(handler)
+    return log
+
+def run(log, requests, events, threads):
+    # Tiempo que pasa el hilo de la petición dentro de logger.info (percentiles en µs)
+    samples = []
+    lock = threading.Lock()
+
+    def worker(n):
+        local = []
+        for i in range(n):
+            start = time.perf_counter_ns()
+            for _ in range(events - 1):
+                log.info({"event": "cedula_validated", "cedula": "1710034065", "success": True})
+            log.info({
+                "endpoint": "/api/identity/verificar-cedula",
+                "method": "POST",
+                "status_code": 200,
+                "response_time_ms": 1.23,
+                "client_ip": "127.0.0.1"
+            })
+            local.append(time.perf_counter_ns() - start)
+        with lock:
+            samples.extend(local)
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(requests // threads,)) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    wall = time.perf_counter() - start
+
+    samples.sort()
+    pct = lambda p: samples[min(len(samples) - 1, int(len(samples) * p))] / 1000
+    return wall, pct(0.5), pct(0.99)
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = logging.FileHandler(os.path.join(tmp, "legacy.log"))
+        legacy.setFormatter(LegacyJsonFormatter())
+        wall, p50, p99 = run(make_logger("bench_legacy", legacy), requests, events, threads)
+        legacy.close()
+        print(f"{requests} peticiones x {events} eventos, {threads} hilos")
+        print(f"  antes   (FileHandler síncrono): {wall:.2f}s  p50={p50:.1f}µs  p99={p99:.1f}µs por petición")
+
+        target = logging.FileHandler(os.path.join(tmp, "queued.log"))
+        target.setFormatter(JsonFormatter())
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, target, respect_handler_level=True)
+        listener.start()
+        wall, p50, p99 = run(make_logger("bench_queued", DictQueueHandler(log_queue)), requests, events, threads)
+        drain = time.perf_counter()
+        listener.stop()
+        drain = time.perf_counter() - drain
+        target.close()
+        print(f"  después (cola + hilo escritor): {wall:.2f}s  p50={p50:.1f}µs  p99={p99:.1f}µs por petición"
+              f"  (vaciado de la cola: {drain:.2f}s)")
+
+        with open(os.path.join(tmp, "queued.log")) as f:
+            lines = sum(1 for _ in f)
+        assert lines == (requests // threads) * threads * events, lines
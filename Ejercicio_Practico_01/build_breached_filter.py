@@ -0,0 +1,52 @@
+# Construye offline el filtro de Bloom de contraseñas filtradas.
+#   python build_breached_filter.py <lista.txt> [salida] [tasa_falsos_positivos] [--sha1]
+#
+# La lista tiene una contraseña por línea. Con --sha1 cada línea es "HASH[:conteo]"
+# (formato de las descargas de Pwned Passwords): se guarda el hash y la API
+# calcula el SHA-1 de la contraseña al consultar.
+import sys
+import time
+
+from app.utils.bloom import FLAG_SHA1, BloomFilter
+
+DEFAULT_OUTPUT = "data/breached_passwords.bloom"
+
+
+def read_keys(path, sha1):
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.rstrip(b"\r\n")
+
+            if sha1:
+                line = line.split(b":", 1)[0].strip().upper()
+
+            if line:
+                yield line
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    sha1 = "--sha1" in sys.argv
+
+    if not args:
+        sys.exit("uso: python build_breached_filter.py <lista.txt> [salida] [tasa] [--sha1]")
+
+    source = args[0]
+    output = args[1] if len(args) > 1 else DEFAULT_OUTPUT
+    fp_rate = float(args[2]) if len(args) > 2 else 0.001
+
+    start = time.perf_counter()
+
+    # Primera pasada solo para dimensionar el filtro
+    count = sum(1 for _ in read_keys(source, sha1))
+    bloom = BloomFilter.create(count, fp_rate, flags=FLAG_SHA1 if sha1 else 0)
+
+    for key in read_keys(source, sha1):
+        bloom.add_key(key)
+
+    bloom.save(output)
+
+    stats = bloom.stats()
+    print(f"{stats['items']} contraseñas -> {output}: {stats['bytes'] / 1024:.1f} KiB, "
+          f"k={stats['hashes']}, falsos positivos ~{stats['fp_rate']:.4%} "
+          f"({time.perf_counter() - start:.1f} s)")
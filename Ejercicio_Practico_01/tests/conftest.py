@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+# Logs, bases SQLite y demás rutas relativas de la app van a un directorio temporal
+os.chdir(tempfile.mkdtemp(prefix="tests-"))
+
+os.environ.setdefault("JWT_SECRET_KEY", "clave-de-pruebas-suficientemente-larga-1234567890")
+os.environ.setdefault("AUTH_USERNAME", "admin")
+os.environ.setdefault("AUTH_PASSWORD", "admin123")
+os.environ.setdefault("GOOGLE_API_KEY", "clave-de-pruebas")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        length = int(self.headers.get("Content-Length") or 0)
+
+        if length:
+            query.update(parse_qs(self.rfile.read(length).decode()))
+
+        self.server.requests.append((self.command, url.path, query))
+        status, body = self.server.respond(url.path, query)
+
+        if isinstance(body, bytes):
+            # Respuesta cruda (p. ej. un cuerpo chunked mal formado)
+            self.wfile.write(body)
+            self.close_connection = True
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+@pytest.fixture
+def upstream():
+    """
+    Upstream HTTP local. `upstream.respond(path, query) -> (status, body)` se
+    reemplaza en cada prueba; `upstream.requests` guarda lo recibido.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.requests = []
+    server.respond = lambda path, query: (404, {})
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="session")
+def flask_app():
+    from app import create_app
+
+    return create_app()
+
+
+@pytest.fixture(scope="session")
+def auth_headers(flask_app):
+    from flask_jwt_extended import create_access_token
+
+    with flask_app.app_context():
+        return {"Authorization": "Bearer " + create_access_token(identity="admin")}
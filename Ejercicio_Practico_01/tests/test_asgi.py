@@ -0,0 +1,141 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from app.asgi import create_asgi_app
+from app.config import Config
+from app.services import geo_service, translate_service
+from app.utils.cache import TTLCache
+
+
+@pytest.fixture(scope="module")
+def asgi_app(flask_app):
+    return create_asgi_app(flask_app)
+
+
+@pytest.fixture
+def geo(upstream, monkeypatch):
+    monkeypatch.setattr(Config, "IP_GEO_URL", upstream.url + "/geo")
+    upstream.respond = lambda path, query: (200, {
+        "success": True, "country": "Ecuador", "region": "Pichincha", "city": "Quito",
+        "latitude": -0.18, "longitude": -78.47, "timezone": {"id": "America/Guayaquil"}
+    })
+    return upstream
+
+
+def _asgi_post(asgi_app, path, **kwargs):
+    async def post():
+        transport = httpx.ASGITransport(app=asgi_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return await client.post(path, **kwargs)
+
+    return asyncio.run(post())
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/api/geo/localizar-ip", b"{no es json"),
+    ("/api/geo/localizar-ip", b"{}"),
+    ("/api/geo/localizar-ip", b'{"ip": "999.1.1.1"}'),
+    ("/api/geo/localizar-ip", b'{"ip": "192.168.1.10"}'),
+    ("/api/identity/genero", b"{no es json"),
+    ("/api/identity/genero", b'{"otro": 1}'),
+    ("/api/translate", b"{no es json"),
+    ("/api/translate", b'{"text": "hola", "target_language": "english"}'),
+])
+def test_rutas_nativas_responden_igual_que_flask(flask_app, asgi_app, auth_headers, path, body):
+    headers = {**auth_headers, "Content-Type": "application/json"}
+    flask_response = flask_app.test_client().post(path, data=body, headers=headers)
+    asgi_response = _asgi_post(asgi_app, path, content=body, headers=headers)
+
+    assert asgi_response.status_code == flask_response.status_code
+    assert asgi_response.json() == flask_response.get_json()
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Token abc"}, {"Authorization": "Bearer abc"}])
+def test_errores_de_jwt_iguales_que_flask(flask_app, asgi_app, headers):
+    flask_response = flask_app.test_client().post("/api/identity/genero", json={"nombre": "Ana"}, headers=headers)
+    asgi_response = _asgi_post(asgi_app, "/api/identity/genero", json={"nombre": "Ana"}, headers=headers)
+
+    assert asgi_response.status_code == flask_response.status_code
+    assert asgi_response.json() == flask_response.get_json()
+
+
+def test_ruta_nativa_pasa_por_los_hooks_de_flask(asgi_app, auth_headers, geo):
+    headers = {**auth_headers, "X-Request-ID": "peticion-123"}
+    response = _asgi_post(asgi_app, "/api/geo/localizar-ip", json={"ip": "8.8.4.4"}, headers=headers)
+
+    assert response.json()["data"]["pais"] == "Ecuador"
+    assert response.headers["X-Request-ID"] == "peticion-123"
+
+    # Server-Timing lo agrega el hook de trazas de Flask, con el span del JWT
+    timing = response.headers["Server-Timing"]
+    assert "jwt;dur=" in timing
+    assert "total;dur=" in timing
+
+
+def test_ruta_nativa_usa_el_servicio_async(asgi_app, auth_headers, geo):
+    _asgi_post(asgi_app, "/api/geo/localizar-ip", json={"ip": "8.8.8.8"}, headers=auth_headers)
+
+    assert [path for _, path, _ in geo.requests] == ["/geo/8.8.8.8"]
+
+
+def test_cuerpo_demasiado_grande(asgi_app, auth_headers, monkeypatch):
+    monkeypatch.setattr("app.asgi.MAX_BODY_BYTES", 10)
+    response = _asgi_post(asgi_app, "/api/identity/genero", json={"nombre": "x" * 100}, headers=auth_headers)
+
+    assert response.status_code == 413
+    assert response.json()["error_code"] == 413
+
+
+def _sqlite_threads(monkeypatch, cache):
+    # Hilo en el que se ejecuta cada lectura/escritura del nivel SQLite de la caché
+    threads = []
+    store = cache._store
+
+    for name in ("get", "set"):
+        original = getattr(store, name)
+
+        def wrapper(*args, _original=original, **kwargs):
+            threads.append(threading.get_ident())
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(store, name, wrapper)
+
+    return threads
+
+
+def test_cache_sqlite_fuera_del_event_loop(geo, monkeypatch, tmp_path):
+    # GEO_CACHE_DB es opcional: aquí la caché siempre tiene nivel SQLite
+    cache = TTLCache("geo_test", persist_path=str(tmp_path / "geo.db"))
+    monkeypatch.setattr(geo_service, "_geo_cache", cache)
+    threads = _sqlite_threads(monkeypatch, cache)
+
+    async def consultar():
+        await geo_service.get_geo_info_async("1.1.1.1")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(consultar())
+
+    # Lectura (fallo) y escritura del resultado
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+
+def test_memoria_de_traduccion_fuera_del_event_loop(upstream, monkeypatch):
+    monkeypatch.setattr(Config, "TRANSLATE_URL", upstream.url + "/translate")
+    upstream.respond = lambda path, query: (200, {
+        "data": {"translations": [{"translatedText": f"<{q}>"} for q in query["q"]]}
+    })
+    threads = _sqlite_threads(monkeypatch, translate_service._translation_memory)
+
+    async def traducir():
+        result = await translate_service.translate_text_async("texto async", "en")
+        return result, threading.get_ident()
+
+    result, loop_thread = asyncio.run(traducir())
+
+    assert result["translated"] == "<texto async>"
+    assert len(threads) == 2
+    assert loop_thread not in threads
@@ -0,0 +1,52 @@
+import pytest
+from flask import Flask, request
+
+from app.utils.batch import read_batch
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["BATCH_MAX_ITEMS"] = 3
+    return app
+
+
+def _read(app, **kwargs):
+    with app.test_request_context("/", method="POST", **kwargs):
+        return read_batch(request, "cedulas", "cedula", "cédulas", "test_batch_too_large")
+
+
+def test_json_arreglo_y_objeto(app):
+    assert _read(app, json=["1", "2"]) == (["1", "2"], None)
+    assert _read(app, json={"cedulas": ["1"]}) == (["1"], None)
+
+
+def test_csv_omite_la_cabecera(app):
+    items, error = _read(app, data="cedula\n1\n 2 \n\n3\n", content_type="text/csv")
+
+    assert error is None
+    assert items == ["1", "2", "3"]
+
+
+def test_campo_faltante_y_lote_vacio(app):
+    items, error = _read(app, json={"otro": []})
+    assert items is None
+    assert error["error_code"] == 400
+    assert error["error_message"] == "Campo 'cedulas' es requerido (arreglo)"
+
+    items, error = _read(app, data="cedula\n", content_type="text/csv")
+    assert items is None
+    assert error["error_code"] == 400
+    assert error["error_message"] == "El lote de cédulas está vacío"
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"json": ["1", "2", "3", "4"]},
+    {"data": "1\n2\n3\n4\n5\n", "content_type": "text/csv"},
+])
+def test_lote_demasiado_grande(app, kwargs):
+    items, error = _read(app, **kwargs)
+
+    assert items is None
+    assert error["error_code"] == 413
+    assert error["error_message"] == "El lote no puede superar 3 cédulas"
@@ -0,0 +1,107 @@
+import sqlite3
+import threading
+
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import MISSING, TTLCache
+
+
+class _Reloj:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = _Reloj()
+    monkeypatch.setattr(cache_module, "time", reloj)
+    return reloj
+
+
+def test_ttl_vence_y_cuenta_una_expiracion(reloj):
+    cache = TTLCache("t", stale_seconds=60)
+    cache.set("a", None, ttl=10)
+
+    # None cacheado no se confunde con un fallo
+    assert cache.get("a") is None
+
+    reloj.now += 11
+    assert cache.get("a") is MISSING
+    assert cache.get("a") is MISSING
+    assert cache.get_stale("a") is None
+
+    reloj.now += 60
+    assert cache.get_stale("a") is MISSING
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["stale_hits"]) == (1, 2, 1, 1)
+
+
+def test_lru_desaloja_la_menos_usada(reloj):
+    cache = TTLCache("t", max_entries=2, stripes=1)
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=10)
+    cache.get("a")
+    cache.set("c", 3, ttl=10)
+
+    assert cache.get("b") is MISSING
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_franjas_concurrentes_no_pierden_conteos():
+    cache = TTLCache("t", max_entries=100000, stripes=8)
+    hilos, por_hilo = 8, 2000
+
+    def trabajo(n):
+        for i in range(por_hilo):
+            key = f"{n}-{i % 50}"
+            if cache.get(key) is MISSING:
+                cache.set(key, i, ttl=60)
+
+    threads = [threading.Thread(target=trabajo, args=(n,)) for n in range(hilos)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = cache.stats()
+    assert stats["size"] == hilos * 50
+    assert stats["misses"] == hilos * 50
+    assert stats["hits"] + stats["misses"] == hilos * por_hilo
+
+
+def test_sqlite_sobrevive_a_un_reinicio(tmp_path, reloj):
+    path = str(tmp_path / "cache.db")
+    TTLCache("geo", persist_path=path).set("8.8.8.8", {"pais": "US"}, ttl=10)
+    TTLCache("geo", persist_path=path).set("1.1.1.1", {"pais": "AU"}, ttl=1)
+
+    reloj.now += 5
+    cache = TTLCache("geo", persist_path=path)
+
+    assert cache.get("8.8.8.8") == {"pais": "US"}
+    assert cache.get("1.1.1.1") is MISSING
+    assert cache.stats()["hits"] == 1
+
+
+def test_sqlite_se_poda_al_limite(tmp_path, reloj):
+    path = str(tmp_path / "cache.db")
+    cache = TTLCache("geo", max_entries=1000, persist_path=path, persist_max_entries=20)
+
+    for i in range(200):
+        reloj.now += 1
+        cache.set(f"k{i}", i, ttl=100)
+
+    filas = sqlite3.connect(path).execute("SELECT COUNT(*) FROM cache_geo").fetchone()[0]
+
+    # Se poda cada max_entries // 10 escrituras: nunca más de ~1,1 veces el límite
+    assert filas <= 22
+
+    # Se conservan las que vencen más tarde
+    nueva = TTLCache("geo", persist_path=path, persist_max_entries=20)
+    assert nueva.get("k199") == 199
+    assert nueva.get("k0") is MISSING
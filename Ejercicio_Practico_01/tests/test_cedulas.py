@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from app.services.identity_service import verificar_cedulas_lote
+from app.utils.validators import validate_ecuadorian_identification, validate_ecuadorian_identifications
+
+
+def _con_verificador(nueve):
+    suma = 0
+    for i, c in enumerate(nueve):
+        valor = int(c) * (2 if i % 2 == 0 else 1)
+        suma += valor - 9 if valor > 9 else valor
+    return nueve + str((10 - suma % 10) % 10)
+
+
+def _aleatorias(n, seed=2026):
+    rng = random.Random(seed)
+    cedulas = []
+    for _ in range(n):
+        # La mitad con dígito verificador correcto; el resto, 10 dígitos al azar
+        nueve = f"{rng.randint(0, 29):02d}{rng.randint(0, 9)}{rng.randint(0, 999999):06d}"
+        cedulas.append(_con_verificador(nueve) if rng.random() < 0.5 else nueve + str(rng.randint(0, 9)))
+    return cedulas
+
+
+BORDES = [
+    "", None, 0, 1710034065, "abc", "12345", "17100340650", " 1710034065", "1710034065 ",
+    "171003406a", "0010034065", "2510034065", "1760034065", "1710034066", "2450000007",
+    "١٧١٠٠٣٤٠٦٥",  # dígitos arábigo-índicos: los acepta isdigit()
+    "１７１００３４０６５",  # dígitos de ancho completo
+]
+
+
+@pytest.mark.parametrize("cedulas", [BORDES, _aleatorias(2000)], ids=["bordes", "aleatorias"])
+def test_lote_igual_que_validador_escalar(cedulas):
+    assert validate_ecuadorian_identifications(cedulas) == [
+        validate_ecuadorian_identification(c) for c in cedulas
+    ]
+
+
+def test_aleatorias_cubren_todas_las_reglas():
+    mensajes = {r[1] if not r[0] else "valida" for r in validate_ecuadorian_identifications(_aleatorias(2000))}
+
+    assert mensajes == {
+        "valida", "Código de provincia inválido", "Tercer dígito inválido", "Dígito verificador incorrecto"
+    }
+
+
+def test_resumen_del_lote():
+    cedulas = ["1710034065", "1710034066", "", "2510034065", "1710034065"]
+    data = verificar_cedulas_lote(cedulas)
+
+    assert (data["total"], data["validas"], data["invalidas"]) == (5, 2, 3)
+    assert data["errores"] == {
+        "Dígito verificador incorrecto": 1,
+        "La cédula es obligatoria": 1,
+        "Código de provincia inválido": 1,
+    }
+    assert [r["cedula"] for r in data["resultados"]] == cedulas
@@ -0,0 +1,57 @@
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.utils import validators
+from app.utils.validators import calculate_age, calculate_ages
+
+HOYES = [
+    datetime(2026, 1, 10, 15, 0, tzinfo=timezone.utc),
+    datetime(2026, 3, 1, tzinfo=timezone.utc),
+    datetime(2024, 2, 29, tzinfo=timezone.utc),
+    datetime(2024, 3, 31, tzinfo=timezone.utc),
+    datetime(2025, 12, 31, 23, 59, tzinfo=timezone.utc),
+]
+
+BORDES = [
+    "", None, 0, 20000101, "2000-5-1", "2000-02-30", "1999-02-29", "2000-13-01", "2000-00-10",
+    "0000-01-01", "0001-01-01", "abcd-ef-gh", "2000/01/01", " 2000-01-01", "2000-01-01 ",
+    "２０００-01-01", "2000-01-0a", "2100-01-01", "2000-02-29", "2008-01-31",
+]
+
+
+def _fijar_hoy(monkeypatch, hoy):
+    class _Datetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return hoy
+
+    monkeypatch.setattr(validators, "datetime", _Datetime)
+
+
+def _aleatorias(hoy, n=1500, seed=50):
+    rng = random.Random(seed)
+    inicio = date(1900, 1, 1)
+    dias = (hoy.date() - inicio).days + 40
+    return [(inicio + timedelta(days=rng.randrange(dias))).isoformat() for _ in range(n)]
+
+
+@pytest.mark.parametrize("hoy", HOYES, ids=lambda d: d.date().isoformat())
+def test_lote_igual_que_calculo_escalar(monkeypatch, hoy):
+    _fijar_hoy(monkeypatch, hoy)
+    fechas = BORDES + _aleatorias(hoy) + [hoy.date().isoformat(), (hoy.date() + timedelta(days=1)).isoformat()]
+
+    assert calculate_ages(fechas) == [calculate_age(f) for f in fechas]
+
+
+def test_enero_toma_diciembre_del_anio_anterior(monkeypatch):
+    # En enero el "mes anterior" es diciembre del año anterior (31 días)
+    _fijar_hoy(monkeypatch, datetime(2026, 1, 10, tzinfo=timezone.utc))
+
+    ok, result = calculate_age("2000-12-20")
+
+    assert ok
+    assert result["edad"] == 25
+    assert result["detalle"] == {"anios": 25, "meses": 0, "dias": 21}
+    assert calculate_ages(["2000-12-20"]) == [(ok, result)]
@@ -0,0 +1,134 @@
+import smtplib
+import time
+
+import pytest
+
+from app.config import Config
+from app.services import auth_service, email_service
+from app.services.email_service import EmailQueue
+
+REGISTRO = {
+    "identification": "1710034065",
+    "name": "Ana",
+    "last_name": "Pérez",
+    "username": "aperez",
+    "email": "ana@example.com",
+    "password": "Clave#2026",
+}
+
+
+class _StubSMTP:
+    """
+    Servidor SMTP de prueba en lugar de smtplib.SMTP. `plan` es la lista de
+    resultados de cada envío: None entrega el mensaje, una excepción se lanza.
+    """
+
+    plan = []
+    sent = []
+    connections = 0
+
+    def __init__(self, host, port, timeout=None):
+        type(self).connections += 1
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def send_message(self, msg):
+        outcome = self.plan.pop(0) if self.plan else None
+
+        if outcome is not None:
+            raise outcome
+
+        self.sent.append(msg)
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    _StubSMTP.plan = []
+    _StubSMTP.sent = []
+    _StubSMTP.connections = 0
+    monkeypatch.setattr(email_service.smtplib, "SMTP", _StubSMTP)
+    monkeypatch.setattr(Config, "SMTP_RETRY_BACKOFF", 0)
+
+    queue = EmailQueue(workers=1, max_retries=2, idle_timeout=5, max_per_session=100)
+    monkeypatch.setattr(auth_service, "email_queue", queue)
+
+    return _StubSMTP
+
+
+def _wait(client, email_id, headers):
+    deadline = time.monotonic() + 5
+
+    while time.monotonic() < deadline:
+        body = client.get(f"/api/auth/email-status/{email_id}", headers=headers).get_json()
+
+        if body["data"]["status"] in ("sent", "failed"):
+            return body["data"]
+
+        time.sleep(0.01)
+
+    raise AssertionError("El correo no terminó de enviarse")
+
+
+def test_registro_entrega_el_correo(flask_app, auth_headers, smtp):
+    client = flask_app.test_client()
+
+    registro = client.post("/api/auth/register", json=REGISTRO).get_json()
+    status = _wait(client, registro["data"]["email_id"], auth_headers)
+
+    assert status["status"] == "sent"
+    assert status["attempts"] == 1
+    assert "to" not in status
+    assert [m["To"] for m in smtp.sent] == ["ana@example.com"]
+
+
+def test_sesion_smtp_se_reutiliza(flask_app, auth_headers, smtp):
+    client = flask_app.test_client()
+
+    ids = [client.post("/api/auth/register", json=REGISTRO).get_json()["data"]["email_id"] for _ in range(3)]
+
+    assert [_wait(client, i, auth_headers)["status"] for i in ids] == ["sent"] * 3
+    assert smtp.connections == 1
+
+
+def test_fallo_transitorio_se_reintenta(flask_app, auth_headers, smtp):
+    client = flask_app.test_client()
+    smtp.plan = [smtplib.SMTPServerDisconnected("caído"), smtplib.SMTPResponseException(421, b"ocupado")]
+
+    registro = client.post("/api/auth/register", json=REGISTRO).get_json()
+    status = _wait(client, registro["data"]["email_id"], auth_headers)
+
+    assert status["status"] == "sent"
+    assert status["attempts"] == 3
+    assert smtp.connections == 3
+
+
+def test_rechazo_permanente_no_se_reintenta(flask_app, auth_headers, smtp):
+    client = flask_app.test_client()
+    smtp.plan = [smtplib.SMTPResponseException(550, b"buzon inexistente")]
+
+    registro = client.post("/api/auth/register", json=REGISTRO).get_json()
+    status = _wait(client, registro["data"]["email_id"], auth_headers)
+
+    assert status["status"] == "failed"
+    assert status["attempts"] == 1
+    assert "550" in status["error"]
+    assert smtp.sent == []
+
+
+def test_estado_requiere_jwt(flask_app, smtp):
+    client = flask_app.test_client()
+
+    registro = client.post("/api/auth/register", json=REGISTRO).get_json()
+    response = client.get(f"/api/auth/email-status/{registro['data']['email_id']}")
+
+    assert response.status_code == 401
@@ -0,0 +1,68 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from app.config import Config
+from app.services import identity_service
+
+
+def _genderize(path, query):
+    return 200, [
+        {"name": nombre, "gender": "male", "probability": 0.9, "count": 10}
+        for nombre in query["name[]"]
+    ]
+
+
+@pytest.fixture
+def genderize(upstream, monkeypatch):
+    monkeypatch.setattr(Config, "GENDERIZE_URL", upstream.url + "/gender")
+    upstream.respond = _genderize
+    return upstream
+
+
+def test_nombres_concurrentes_en_una_sola_llamada(genderize):
+    # Upstream lento: todas las peticiones llegan mientras la primera está en vuelo
+    def lento(path, query):
+        time.sleep(0.3)
+        return _genderize(path, query)
+
+    genderize.respond = lento
+    nombres = ["Juan", "juan ", "JUAN", "Maria", "Pedro"] * 4
+
+    with ThreadPoolExecutor(max_workers=len(nombres)) as pool:
+        resultados = list(pool.map(identity_service.obtener_genero, nombres))
+
+    assert [r["nombre"] for r in resultados] == nombres
+    assert all(r["genero"] == "male" for r in resultados)
+
+    # Singleflight + micro-batching: cada nombre normalizado se pidió una sola vez
+    pedidos = [n for _, _, query in genderize.requests for n in query["name[]"]]
+    assert sorted(pedidos) == ["juan", "maria", "pedro"]
+
+
+def test_respuesta_objeto_devuelve_error(genderize):
+    genderize.respond = lambda path, query: (200, {"error": "Request limit reached"})
+
+    result = identity_service.obtener_genero("Limite")
+
+    assert result == {"error": "Respuesta inválida del servicio de género"}
+
+
+def test_respuesta_incompleta_devuelve_error(genderize):
+    genderize.respond = lambda path, query: (200, [])
+
+    result = identity_service.obtener_genero("Incompleta")
+
+    assert result == {"error": "Respuesta inválida del servicio de género"}
+
+
+def test_timeout_del_lote_devuelve_error(monkeypatch):
+    monkeypatch.setattr(Config, "GENDER_CONNECT_TIMEOUT", 0)
+    monkeypatch.setattr(Config, "GENDER_READ_TIMEOUT", 0)
+    # Un Future que nunca se resuelve: la espera vence a los ~1 s
+    monkeypatch.setattr(identity_service._gender_batcher, "submit", lambda clave: Future())
+
+    result = identity_service.obtener_genero("Lento")
+
+    assert result == {"error": "El servicio de género tardó demasiado en responder"}
@@ -0,0 +1,113 @@
+import asyncio
+import socket
+import time
+
+import pytest
+from requests.exceptions import ConnectionError, ReadTimeout
+
+from app.utils.http_client import ShardedAsyncClient, UpstreamClient, get_client
+from app.utils.resilience import CircuitBreaker
+
+
+def _client(name, retries=2, read_timeout=1):
+    return UpstreamClient(name, pool_size=2, connect_timeout=1, read_timeout=read_timeout,
+                          retries=retries, backoff=0, breaker=CircuitBreaker(name, min_calls=100))
+
+
+def test_cliente_compartido_por_upstream():
+    assert get_client("geo") is get_client("geo")
+    assert get_client("geo") is not get_client("gender")
+
+
+def test_keep_alive_reutiliza_la_conexion(upstream):
+    upstream.respond = lambda path, query: (200, {"ok": True})
+    client = _client("test_keepalive")
+
+    for _ in range(10):
+        assert client.get(upstream.url + "/x").status_code == 200
+
+    pools = client.session.get_adapter(upstream.url).poolmanager.pools
+    assert [pools[key].num_connections for key in pools.keys()] == [1]
+    assert client.stats()["requests"] == 10
+
+
+def test_reintenta_5xx_solo_en_metodos_idempotentes(upstream):
+    respuestas = []
+    upstream.respond = lambda path, query: respuestas.pop(0)
+    client = _client("test_retry")
+
+    respuestas[:] = [(503, {}), (502, {}), (200, {"ok": True})]
+    assert client.get(upstream.url + "/x").status_code == 200
+
+    respuestas[:] = [(503, {}), (200, {"ok": True})]
+    assert client.post(upstream.url + "/x").status_code == 503
+
+    stats = client.stats()
+    assert (stats["requests"], stats["errors"], stats["retries"]) == (4, 3, 2)
+    assert stats["latency_seconds"]["count"] == 4
+
+
+def test_error_de_conexion_se_reintenta_y_luego_se_propaga():
+    # Puerto sin nadie escuchando
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    client = _client("test_refused")
+
+    with pytest.raises(ConnectionError):
+        client.get(f"http://127.0.0.1:{port}/x")
+
+    assert client.stats()["requests"] == 3
+    assert client.stats()["retries"] == 2
+
+
+def test_lectura_lenta_no_se_reintenta(upstream):
+    def lento(path, query):
+        time.sleep(0.5)
+        return 200, {"ok": True}
+
+    upstream.respond = lento
+    client = _client("test_read_timeout", read_timeout=0.1)
+
+    with pytest.raises(ReadTimeout):
+        client.get(upstream.url + "/x")
+
+    assert client.stats()["requests"] == 1
+    assert client.stats()["retries"] == 0
+
+
+def test_pool_async_reparte_por_peticiones_en_curso(upstream):
+    def lento(path, query):
+        time.sleep(0.2)
+        return 200, {"ok": True}
+
+    upstream.respond = lento
+    session = ShardedAsyncClient(pool_size=6, shard_size=2)
+
+    assert len(session.clients) == 3
+
+    usados = []
+
+    for i, client in enumerate(session.clients):
+        original = client.request
+
+        async def request(*args, _i=i, _original=original, **kwargs):
+            usados.append(_i)
+            return await _original(*args, **kwargs)
+
+        client.request = request
+
+    async def run():
+        try:
+            responses = await asyncio.gather(*(session.request("GET", upstream.url + "/x") for _ in range(6)))
+            return [r.status_code for r in responses], list(session.inflight)
+        finally:
+            await session.aclose()
+
+    statuses, inflight = asyncio.run(run())
+
+    assert statuses == [200] * 6
+    # Seis peticiones simultáneas: dos por cliente interno, y ninguna queda contada
+    assert sorted(usados) == [0, 0, 1, 1, 2, 2]
+    assert inflight == [0, 0, 0]
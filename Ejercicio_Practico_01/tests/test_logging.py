@@ -0,0 +1,150 @@
+import glob
+import gzip
+import json
+import logging
+import threading
+import time
+
+from app.logger_config import EventSampler, JsonFormatter, SizeTimedRotatingFileHandler, _queued, parse_sample_rates
+
+
+def _record(msg, args=None, level=logging.INFO):
+    return logging.LogRecord("t", level, __file__, 1, msg, args, None)
+
+
+def test_evento_dict_como_campos_json():
+    line = json.loads(JsonFormatter().format(_record({"event": "e", "total": 3})))
+
+    assert line["level"] == "INFO"
+    assert (line["event"], line["total"]) == ("e", 3)
+    assert "message" not in line
+
+
+def test_claves_que_chocan_se_conservan_con_prefijo():
+    record = _record({"event": "e", "timestamp": "ayer", "level": 5, "msg_level": "x", "sample_rate": 2})
+    record.sample_rate = 0.1
+    line = json.loads(JsonFormatter().format(record))
+
+    assert line["level"] == "INFO"
+    assert line["timestamp"] != "ayer"
+    assert line["sample_rate"] == 0.1
+    assert (line["msg_timestamp"], line["msg_level"], line["msg_msg_level"], line["msg_sample_rate"]) == ("ayer", 5, "x", 2)
+
+
+def test_cola_congela_el_evento_y_formatea_en_el_hilo_escritor(tmp_path):
+    hilos = []
+
+    class Formatter(JsonFormatter):
+        def format(self, record):
+            hilos.append(threading.current_thread())
+            return super().format(record)
+
+    target = logging.getLogger("test_queued")
+    target.setLevel(logging.INFO)
+    target.propagate = False
+    listener = _queued(target, str(tmp_path / "q.log"))
+    listener.handlers[0].setFormatter(Formatter())
+
+    evento = {"event": "e", "n": 1}
+    target.info(evento)
+    evento["n"] = 2
+    target.info("texto %s", "con args")
+
+    # El escritor va por detrás de las peticiones: se espera a que vacíe la cola
+    path = tmp_path / "q.log"
+    deadline = time.monotonic() + 5
+    while path.read_text(encoding="utf-8").count("\n") < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    assert [line.get("n") for line in lines] == [1, None]
+    assert lines[1]["message"] == "texto con args"
+    assert hilos and threading.current_thread() not in hilos
+
+
+def _esperar(condicion):
+    deadline = time.monotonic() + 5
+    while not condicion() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condicion()
+
+
+def _handler(path, **kwargs):
+    options = {"max_bytes": 0, "interval": 0, "backup_count": 10, "retention_days": 30, **kwargs}
+    handler = SizeTimedRotatingFileHandler(str(path), **options)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def _gz(path):
+    return sorted(glob.glob(str(path) + ".*.gz"))
+
+
+def test_rota_por_tamano_y_comprime(tmp_path):
+    path = tmp_path / "app.log"
+    handler = _handler(path, max_bytes=300)
+
+    for i in range(20):
+        handler.emit(_record({"event": "e", "i": i}))
+
+    assert _esperar(lambda: _gz(path) and not glob.glob(str(path) + ".*[0-9]"))
+    handler.close()
+
+    rotados = [json.loads(line)["i"] for f in _gz(path) for line in gzip.open(f, "rt", encoding="utf-8")]
+    actuales = [json.loads(line)["i"] for line in path.read_text(encoding="utf-8").splitlines()]
+
+    # Nada se pierde ni se repite al rotar
+    assert sorted(rotados + actuales) == list(range(20))
+    assert path.stat().st_size <= 300
+
+
+def test_rota_por_antiguedad(tmp_path):
+    path = tmp_path / "app.log"
+    handler = _handler(path, interval=3600)
+    handler.emit(_record({"event": "antes"}))
+
+    handler.rollover_at = time.time() - 1
+    handler.emit(_record({"event": "despues"}))
+
+    assert _esperar(lambda: len(_gz(path)) == 1)
+    handler.close()
+
+    assert json.loads(gzip.open(_gz(path)[0], "rt", encoding="utf-8").read())["event"] == "antes"
+    assert json.loads(path.read_text(encoding="utf-8"))["event"] == "despues"
+    assert handler.rollover_at > time.time() + 3500
+
+
+def test_retencion_y_rotados_pendientes(tmp_path):
+    path = tmp_path / "app.log"
+
+    # Rotado que quedó sin comprimir al terminar un proceso anterior
+    (tmp_path / "app.log.20260101-000000").write_text("{}\n", encoding="utf-8")
+    handler = _handler(path, max_bytes=1, backup_count=2)
+    assert _esperar(lambda: len(_gz(path)) == 1)
+
+    for i in range(5):
+        handler.emit(_record({"event": "e", "i": i}))
+
+    assert _esperar(lambda: len(_gz(path)) == 2 and not glob.glob(str(path) + ".*[0-9]"))
+    handler.close()
+
+
+def test_muestreo_determinista_por_evento():
+    sampler = EventSampler(parse_sample_rates("muestreado=0.1, otro = 2, nulo=-1"))
+
+    assert sampler.rates == {"muestreado": 0.1, "otro": 1.0, "nulo": 0.0}
+
+    records = [_record({"event": "muestreado"}) for _ in range(100)]
+    kept = [r for r in records if sampler.filter(r)]
+
+    assert len(kept) == 10
+    assert all(r.sample_rate == 0.1 for r in kept)
+
+    # Warnings, eventos sin tasa y mensajes de texto pasan siempre
+    assert sampler.filter(_record({"event": "nulo"}, level=logging.WARNING))
+    assert not sampler.filter(_record({"event": "nulo"}))
+    assert sampler.filter(_record({"event": "sin_tasa"}))
+    assert sampler.filter(_record("texto"))
+
+    assert sampler.stats()["muestreado"] == {"rate": 0.1, "seen": 100, "kept": 10}
@@ -0,0 +1,79 @@
+import re
+import threading
+
+from app.utils.metrics import Histogram, ThreadShardedHistograms, render_prometheus
+
+
+def test_histograma_acumulado_con_limites_inclusivos():
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+
+    assert histogram.snapshot() == {"buckets": {"0.1": 2, "1": 3, "+Inf": 4}, "count": 4, "sum": 3.65}
+
+
+def test_shards_por_hilo_no_pierden_observaciones():
+    histograms = ThreadShardedHistograms(buckets=(0.001,))
+    hilos, por_hilo = 8, 1000
+
+    def trabajo(n):
+        for i in range(por_hilo):
+            histograms.observe_ns(("ep", "GET", "2xx"), 500_000 if i % 2 else 5_000_000)
+        histograms.track_inflight("ep", 1)
+
+    for _ in range(3):
+        threads = [threading.Thread(target=trabajo, args=(n,)) for n in range(hilos)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    snapshot, inflight = histograms.snapshot()
+    total = 3 * hilos * por_hilo
+
+    assert snapshot[("ep", "GET", "2xx")]["buckets"] == {"0.001": total // 2, "+Inf": total}
+    assert snapshot[("ep", "GET", "2xx")]["sum"] == round(total // 2 * 0.0055, 6)
+    assert inflight == {"ep": 3 * hilos}
+    # Los shards de hilos terminados se pliegan en el acumulado
+    assert histograms._shards == []
+
+
+def test_formato_prometheus():
+    text = render_prometheus([
+        ("lat", "histogram", "Latencia.", [({"ep": 'a"b\\c'}, {"buckets": {"1": 1, "+Inf": 2}, "count": 2, "sum": 3.5})]),
+        ("vivo", "gauge", "En curso.", [({}, 4)]),
+    ])
+
+    assert text == (
+        "# HELP lat Latencia.\n"
+        "# TYPE lat histogram\n"
+        'lat_bucket{ep="a\\"b\\\\c",le="1"} 1\n'
+        'lat_bucket{ep="a\\"b\\\\c",le="+Inf"} 2\n'
+        'lat_sum{ep="a\\"b\\\\c"} 3.5\n'
+        'lat_count{ep="a\\"b\\\\c"} 2\n'
+        "# HELP vivo En curso.\n"
+        "# TYPE vivo gauge\n"
+        "vivo 4\n"
+    )
+
+
+def _muestra(text, pattern):
+    match = re.search(re.escape(pattern) + r" (\S+)", text)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_endpoint_metrics_cuenta_peticiones_por_endpoint(flask_app):
+    client = flask_app.test_client()
+    serie = 'http_request_duration_seconds_count{endpoint="auth.login",method="POST",status="2xx"}'
+
+    antes = _muestra(client.get("/metrics").get_data(as_text=True), serie)
+    for _ in range(3):
+        client.post("/api/auth/login", json={"username": "admin", "password": "incorrecta"})
+    response = client.get("/metrics")
+    text = response.get_data(as_text=True)
+
+    assert response.mimetype == "text/plain"
+    assert _muestra(text, serie) == antes + 3
+    # La propia petición a /metrics está en curso mientras se genera
+    assert _muestra(text, 'http_requests_in_flight{endpoint="metrics.metrics"}') == 1
+    assert 'circuit_breaker_state{upstream="geo"}' in text
@@ -0,0 +1,118 @@
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.controllers import profiler_controller
+from app.utils.profiler import TRUNCATED, SamplingProfiler, flamegraph_svg
+
+
+def _ocupado(profiler, segundos):
+    profiler.enter()
+    try:
+        deadline = time.perf_counter() + segundos
+        while time.perf_counter() < deadline:
+            pass
+    finally:
+        profiler.exit()
+
+
+def _trabajo_a(profiler):
+    _ocupado(profiler, 0.3)
+
+
+def _trabajo_b(profiler):
+    _ocupado(profiler, 0.3)
+
+
+def _en_hilos(profiler, *targets):
+    threads = [threading.Thread(target=t, args=(profiler,)) for t in targets]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_muestrea_solo_los_hilos_en_una_peticion():
+    profiler = SamplingProfiler(interval_ms=1, max_overhead=1)
+    profiler.start()
+    _en_hilos(profiler, _trabajo_a)
+
+    collapsed = profiler.collapsed(reset=True)
+
+    assert "_trabajo_a (test_profiler.py:" in collapsed
+    assert "test_muestrea_solo_los_hilos_en_una_peticion" not in collapsed
+    assert profiler.stats()["samples"] > 0
+    assert profiler.collapsed() == ""
+
+
+def test_entradas_anidadas_en_el_mismo_hilo():
+    profiler = SamplingProfiler()
+    profiler.enter()
+    profiler.enter()
+    profiler.exit()
+    assert threading.get_ident() in profiler._active
+
+    profiler.exit()
+    assert profiler._active == {}
+
+
+def test_pilas_distintas_limitadas():
+    profiler = SamplingProfiler(interval_ms=1, max_stacks=1, max_overhead=1)
+    profiler.start()
+    _en_hilos(profiler, _trabajo_a, _trabajo_b)
+
+    stacks = [line.rpartition(" ")[0] for line in profiler.collapsed().splitlines()]
+
+    assert len(stacks) == 2
+    assert TRUNCATED in stacks
+
+
+def test_flamegraph_proporcional_y_escapado():
+    svg = flamegraph_svg("a;b 3\na;<c> 1\n", width=400)
+    root = ET.fromstring(svg)
+    ns = {"s": "http://www.w3.org/2000/svg"}
+
+    widths = {
+        g.find("s:title", ns).text.split(" (")[0]: float(g.find("s:rect", ns).get("width"))
+        for g in root.findall("s:g", ns)
+    }
+
+    assert widths == {"all": 400, "a": 400, "b": 300, "<c>": 100}
+    assert "(4 muestras)" in root.find("s:text", ns).text
+
+
+@pytest.fixture
+def perfil(flask_app, monkeypatch):
+    profiler = SamplingProfiler(interval_ms=1, max_overhead=1)
+    monkeypatch.setattr(profiler_controller, "profiler", profiler)
+    return profiler
+
+
+def test_endpoint_solo_para_administradores(flask_app, auth_headers, perfil):
+    client = flask_app.test_client()
+
+    with flask_app.app_context():
+        otro = {"Authorization": "Bearer " + create_access_token(identity="otro")}
+
+    assert client.get("/api/admin/profile", headers=otro).get_json()["error_code"] == 403
+    assert client.get("/api/admin/profile", headers=auth_headers).get_json()["error_code"] == 404
+
+
+def test_endpoint_formatos(flask_app, auth_headers, perfil):
+    client = flask_app.test_client()
+    perfil.start()
+    _en_hilos(perfil, _trabajo_a)
+
+    collapsed = client.get("/api/admin/profile", headers=auth_headers)
+    svg = client.get("/api/admin/profile?format=svg", headers=auth_headers)
+    stats = client.get("/api/admin/profile?format=stats", headers=auth_headers).get_json()
+    invalido = client.get("/api/admin/profile?format=pdf", headers=auth_headers).get_json()
+
+    assert "_trabajo_a" in collapsed.get_data(as_text=True)
+    assert svg.mimetype == "image/svg+xml"
+    assert "_trabajo_a" in svg.get_data(as_text=True)
+    assert stats["data"]["running"] is True
+    assert invalido["error_code"] == 400
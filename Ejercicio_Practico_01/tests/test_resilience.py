@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+import pytest
+from requests.exceptions import ChunkedEncodingError
+
+from app.utils.http_client import AsyncUpstreamClient, UpstreamClient
+from app.utils.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+# Respuesta con un tamaño de chunk inválido: requests lanza ChunkedEncodingError
+BROKEN_CHUNKED = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n"
+
+
+def _half_open_breaker(name):
+    # Se abre con un fallo y pasa a semiabierto de inmediato, con un solo cupo de prueba
+    breaker = CircuitBreaker(name, min_calls=1, failure_rate=0.5, open_seconds=0, half_open_calls=1)
+    breaker.record(False)
+    assert breaker.state == OPEN
+    return breaker
+
+
+def _client(cls, name, breaker):
+    return cls(name, pool_size=2, connect_timeout=1, read_timeout=1, retries=0, backoff=0, breaker=breaker)
+
+
+def test_excepcion_no_prevista_en_semiabierto_no_deja_el_circuito_trabado(upstream):
+    breaker = _half_open_breaker("test_sync")
+    client = _client(UpstreamClient, "test_sync", breaker)
+
+    upstream.respond = lambda path, query: (200, BROKEN_CHUNKED)
+    with pytest.raises(ChunkedEncodingError):
+        client.get(upstream.url + "/roto")
+
+    # El fallo de la prueba vuelve a abrir el circuito (no queda semiabierto sin cupos)
+    assert breaker.state == OPEN
+
+    upstream.respond = lambda path, query: (200, {"ok": True})
+    assert client.get(upstream.url + "/ok").status_code == 200
+    assert breaker.state == CLOSED
+
+
+def test_excepcion_no_prevista_en_semiabierto_async(monkeypatch):
+    breaker = _half_open_breaker("test_async")
+    client = _client(AsyncUpstreamClient, "test_async", breaker)
+
+    async def write_error(*args, **kwargs):
+        raise httpx.WriteError("conexión cerrada")
+
+    monkeypatch.setattr(client.session, "request", write_error)
+
+    with pytest.raises(httpx.WriteError):
+        asyncio.run(client.get("http://upstream/"))
+
+    assert breaker.state == OPEN
+
+    # Sin la corrección el cupo de prueba quedaba tomado y esto lanzaba CircuitOpenError
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    breaker.record(True)
+    assert breaker.state == CLOSED
+
+
+def test_semiabierto_rechaza_mas_alla_de_los_cupos():
+    breaker = _half_open_breaker("test_cupos")
+
+    breaker.before_call()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
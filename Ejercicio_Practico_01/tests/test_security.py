@@ -0,0 +1,46 @@
+import re
+
+import pytest
+
+from app.services.security_service import evaluate_password, evaluate_passwords
+
+
+@pytest.mark.parametrize("password", ["", "   ", "\t\r\n", None, 123])
+def test_individual_y_lote_rechazan_lo_mismo(password):
+    ok, _ = evaluate_password(password)
+    lote = evaluate_passwords([password])
+
+    assert not ok
+    assert lote["invalidas"] == 1
+    assert lote["resultados"][0]["success"] is False
+
+
+def test_individual_y_lote_puntuan_igual():
+    ok, result = evaluate_password(" Clave segura 2024! ")
+    lote = evaluate_passwords([" Clave segura 2024! "])
+
+    assert ok
+    assert lote["resultados"][0]["result"] == result
+
+
+@pytest.mark.parametrize("password", ["Abcdefg٣!", "abc१२३", "ABC߀", "sin numeros", "Z9", "ⅫⅩ½²"])
+def test_detalles_como_las_expresiones_regulares(password):
+    # Mismos criterios que las regex de la versión anterior del servicio
+    ok, result = evaluate_password(password)
+
+    assert ok
+    assert result["detalles"] == {
+        "length": len(password) >= 8,
+        "uppercase": bool(re.search(r"[A-Z]", password)),
+        "lowercase": bool(re.search(r"[a-z]", password)),
+        "number": bool(re.search(r"\d", password)),
+        "special": bool(re.search(r"[!@#$%^&*(),.?\":{}|<>]", password))
+    }
+
+
+def test_digito_no_ascii_cuenta_como_numero():
+    ok, result = evaluate_password("Abcdefg٣!")
+
+    assert ok
+    assert result["detalles"]["number"]
+    assert result["score"] == 100
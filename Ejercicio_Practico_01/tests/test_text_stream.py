@@ -0,0 +1,62 @@
+import io
+
+import pytest
+
+from app.services.text_service import (
+    limpiar_caracteres,
+    limpiar_documento,
+    normalizar_documento,
+    normalizar_texto,
+    normalizar_textos,
+)
+
+TEXTOS = [
+    "\r\nHola mundo",
+    "\r\rLínea uno\r\nLínea dos\r",
+    "  \r\n\t \r Señor Ñandú\r\n\r\n",
+    "\r" * 40 + "\r\n" * 40 + "texto tras muchos retornos",
+    "sin retornos, ¡pero con acentos! áéíóú",
+]
+IDS = ["crlf_inicial", "cr_mixto", "espacios_y_crlf", "muchos_retornos", "sin_retornos"]
+
+
+def _stream(fn, texto, chunk_size):
+    out = fn(io.BytesIO(texto.encode("utf-8")).read, chunk_size)
+    return "".join(out)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 4096])
+@pytest.mark.parametrize("texto", TEXTOS, ids=IDS)
+def test_limpiar_documento_igual_que_limpiar_caracteres(texto, chunk_size):
+    ok, data = limpiar_caracteres(texto)
+
+    assert ok
+    assert _stream(limpiar_documento, texto, chunk_size) == data["limpio"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 4096])
+@pytest.mark.parametrize("texto", TEXTOS, ids=IDS)
+def test_normalizar_documento_igual_que_normalizar_texto(texto, chunk_size):
+    ok, data = normalizar_texto(texto)
+
+    assert ok
+    assert _stream(normalizar_documento, texto, chunk_size) == data["normalizado"]
+
+
+def test_documento_vacio_devuelve_none():
+    assert limpiar_documento(io.BytesIO(b" \r\n\r ").read, 2) is None
+
+
+def test_normalizar_lote_json_y_csv_usan_read_batch(flask_app, auth_headers):
+    client = flask_app.test_client()
+    url = "/api/text/normalizar/batch"
+
+    por_json = client.post(url, json={"textos": ["José   Pérez"]}, headers=auth_headers).get_json()
+    por_csv = client.post(url, data="texto\nJosé   Pérez\n", content_type="text/csv", headers=auth_headers).get_json()
+
+    assert por_json == por_csv
+    assert por_json["data"] == normalizar_textos(["José   Pérez"])
+
+    vacio = client.post(url, json={"textos": []}, headers=auth_headers).get_json()
+    assert vacio["error_code"] == 400
+    assert vacio["error_message"] == "El lote de textos está vacío"
@@ -0,0 +1,85 @@
+import re
+
+from flask import Flask
+
+from app.config import Config
+from app.middleware import tracing as tracing_middleware
+from app.utils.tracing import server_timing, span, start_trace, trace_tree, traced
+
+
+@traced("servicio")
+def _servicio():
+    with span("http geo"):
+        pass
+    with span("http geo"):
+        pass
+
+
+def test_spans_anidados_y_server_timing():
+    with Flask(__name__).test_request_context("/"):
+        start_trace("abc")
+
+        with span("jwt"):
+            pass
+        _servicio()
+
+        tree = trace_tree()
+        timing = server_timing()
+
+    assert [child["name"] for child in tree["children"]] == ["jwt", "servicio"]
+    assert [child["name"] for child in tree["children"][1]["children"]] == ["http geo", "http geo"]
+
+    # Un valor por nombre (los repetidos se suman) y el nombre saneado para el header
+    names = [part.split(";")[0] for part in timing.split(", ")]
+    assert names == ["jwt", "servicio", "http_geo", "total"]
+
+    http_ms = sum(child["duration_ms"] for child in tree["children"][1]["children"])
+    assert abs(float(re.search(r"http_geo;dur=([\d.]+)", timing).group(1)) - http_ms) < 0.01
+
+
+def test_span_fuera_de_una_peticion_no_mide():
+    with span("fondo") as node:
+        assert node is None
+
+
+def test_server_timing_y_request_id_en_wsgi(flask_app, auth_headers):
+    client = flask_app.test_client()
+    url = "/api/text/normalizar"
+
+    propia = client.post(url, json={"texto": "a"}, headers={**auth_headers, "X-Request-ID": "req-1"})
+    invalida = client.post(url, json={"texto": "a"}, headers={**auth_headers, "X-Request-ID": "no válida"})
+
+    assert propia.headers["X-Request-ID"] == "req-1"
+    assert re.fullmatch(r"[0-9a-f]{32}", invalida.headers["X-Request-ID"])
+
+    timing = propia.headers["Server-Timing"]
+    assert "jwt;dur=" in timing
+    assert "normalizar_texto;dur=" in timing
+    assert timing.split(", ")[-1].startswith("total;dur=")
+
+
+class _SlowLogger:
+    def __init__(self):
+        self.records = []
+
+    def warning(self, msg):
+        self.records.append(msg)
+
+
+def test_peticion_lenta_escribe_su_arbol_de_spans(flask_app, auth_headers, monkeypatch):
+    slow = _SlowLogger()
+    monkeypatch.setattr(tracing_middleware, "slow_logger", slow)
+    client = flask_app.test_client()
+
+    monkeypatch.setattr(Config, "TRACE_SLOW_MS", 60_000)
+    client.post("/api/text/normalizar", json={"texto": "a"}, headers=auth_headers)
+    assert slow.records == []
+
+    monkeypatch.setattr(Config, "TRACE_SLOW_MS", 0)
+    response = client.post("/api/text/normalizar", json={"texto": "a"}, headers=auth_headers)
+
+    [record] = slow.records
+    assert record["event"] == "slow_request"
+    assert record["request_id"] == response.headers["X-Request-ID"]
+    assert record["endpoint"] == "/api/text/normalizar"
+    assert [child["name"] for child in record["spans"]["children"]][:2] == ["jwt", "normalizar_texto"]
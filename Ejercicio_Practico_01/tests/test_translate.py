@@ -0,0 +1,35 @@
+import pytest
+
+from app.config import Config
+from app.services import translate_service
+
+
+@pytest.fixture
+def translate_api(upstream, monkeypatch):
+    monkeypatch.setattr(Config, "TRANSLATE_URL", upstream.url + "/translate")
+    upstream.respond = lambda path, query: (200, {
+        "data": {"translations": [{"translatedText": f"<{q}>"} for q in query["q"]]}
+    })
+    return upstream
+
+
+def test_lote_en_orden(translate_api):
+    result = translate_service.translate_batch(["uno a", "dos a", "uno a"], "en")
+
+    assert result["success"]
+    assert [t["translated"] for t in result["translations"]] == ["<uno a>", "<dos a>", "<uno a>"]
+    # El texto repetido se envía una sola vez
+    assert translate_api.requests[0][2]["q"] == ["uno a", "dos a"]
+
+
+def test_respuesta_incompleta_falla_el_lote(translate_api):
+    translate_api.respond = lambda path, query: (200, {
+        "data": {"translations": [{"translatedText": "solo una"}]}
+    })
+
+    result = translate_service.translate_batch(["uno b", "dos b", "tres b"], "en")
+
+    assert not result["success"]
+    assert result["error"] == "Translation API returned an incomplete batch"
+    # Nada quedó en la memoria de traducción
+    assert translate_service._lookup_memory(["uno b"], "en")[0] == [None]
@@ -2,12 +2,38 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 from io import StringIO
-from flask import Flask, jsonify, render_template_string
-import json, re
+from flask import Flask, Response, jsonify, render_template_string, request, stream_with_context
+from werkzeug.serving import WSGIRequestHandler
+import hashlib, heapq, json, os, re, threading, time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import islice
+from functools import partial
+from metrics import IngestHistory, IngestRun
+from quality import merge_profiles, partial_profile
+from storage import MATCH_KINDS, NAME_KEYWORDS, find_column, make_store
 
 BASE_URL = "https://datazone.darwinfoundation.org"
 PAGE_URL = BASE_URL + "/es/checklist/checklists-archive"
 
+# Motor de almacenamiento: "memory" (pandas) o "sqlite" (archivo local con FTS5)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "checklists.db")
+MAX_PER_PAGE = 500
+EXPORT_BATCH_ROWS = 1000
+SEARCH_DEFAULT_K = 20
+
+# Cantidad de ejecuciones de ingesta que se conservan para /metrics
+INGEST_HISTORY = int(os.getenv("INGEST_HISTORY", "10"))
+
+# Arranque no bloqueante: segundos sugeridos en Retry-After y entre reintentos de carga
+RETRY_AFTER_SECONDS = 5
+INGEST_RETRY_SECONDS = int(os.getenv("INGEST_RETRY_SECONDS", "30"))
+
+# Limpieza en paralelo: con 1 worker se usa el camino secuencial de siempre
+CLEAN_WORKERS = int(os.getenv("CLEAN_WORKERS", "1"))
+CLEAN_CHUNK_ROWS = int(os.getenv("CLEAN_CHUNK_ROWS", "200000"))
+
 app = Flask(__name__)
 
 # ─────────────────────────────────────────
@@ -24,12 +50,14 @@ def scrape_csv_url(soup, keyword):
                     return BASE_URL + first_csv["href"]
     return None
 
-def clean_df(df):
+def drop_empty(df):
     # Eliminar filas y columnas completamente vacías
     df.dropna(how="all", inplace=True)
     df.dropna(axis=1, how="all", inplace=True)
+    return df
 
-    # Limpiar strings
+def clean_rows(df, nombre_col):
+    # Solo operaciones fila a fila: se puede aplicar por trozos
     for col in df.select_dtypes(include="object").columns:
         # Aseguramos que sea string antes de usar el accesor .str
         df[col] = df[col].astype(str).str.strip()
@@ -37,19 +65,76 @@ def clean_df(df):
         df[col] = df[col].replace(["", "nan", "None", "NaN"], pd.NA)
 
     # Eliminar filas donde la columna principal esté vacía
-    nombre_col = next(
-        (c for c in df.columns if any(k in c.lower() for k in
-         ["species", "especie", "taxon", "name", "nombre", "scientific", "taxonname", "family"])),
-        df.columns[0]
-    )
     df.dropna(subset=[nombre_col], inplace=True)
+    return df
+
+def clean_df(df):
+    drop_empty(df)
+    clean_rows(df, find_column(df.columns, NAME_KEYWORDS, df.columns[0]))
     df.reset_index(drop=True, inplace=True)
     return df
 
-def load_data():
+# Frame de origen heredado por los workers al hacer fork (copy-on-write):
+# cada worker recibe solo (inicio, fin) y no se serializa el frame completo.
+_CLEAN_SOURCE = None
+
+def _start_method():
+    # fork solo es seguro si no hay otros hilos: el hijo podría heredar tomado un lock
+    # (logging, SQLite, stdout) y quedarse bloqueado. Con el servidor en marcha (ingesta
+    # en segundo plano, SEARCH_POOL) se usa forkserver y cada trozo viaja al worker.
+    methods = mp.get_all_start_methods()
+    if "fork" in methods and threading.active_count() == 1:
+        return "fork"
+    return "forkserver" if "forkserver" in methods else "spawn"
+
+def _clean_chunk(bounds, source, nombre_col, profile=False):
+    start, stop = bounds
+    frame = _CLEAN_SOURCE if source is None else source
+    out = clean_rows(frame.iloc[start:stop].copy(), nombre_col)
+    # El perfil del trozo se cuenta en el mismo worker, con el trozo recién limpio
+    return (out, partial_profile(out)) if profile else out
+
+def clean_df_parallel(df, workers=CLEAN_WORKERS, chunk_rows=CLEAN_CHUNK_ROWS, profile=False):
+    # Con profile=True devuelve (df, perfiles parciales para merge_profiles)
+    global _CLEAN_SOURCE
+    if workers <= 1 or len(df) <= chunk_rows:
+        df = clean_df(df)
+        return (df, [partial_profile(df)]) if profile else df
+
+    # Lo que depende del frame completo se resuelve antes de repartir
+    drop_empty(df)
+    nombre_col = find_column(df.columns, NAME_KEYWORDS, df.columns[0])
+    bounds = [(i, min(i + chunk_rows, len(df))) for i in range(0, len(df), chunk_rows)]
+
+    method = _start_method()
+    if method == "fork":
+        _CLEAN_SOURCE = df
+        sources = [None] * len(bounds)
+    else:
+        # Sin fork no hay herencia: se envía cada trozo
+        sources = [df.iloc[start:stop] for start, stop in bounds]
+        bounds = [(0, stop - start) for start, stop in bounds]
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context(method)) as pool:
+            parts = list(pool.map(partial(_clean_chunk, nombre_col=nombre_col, profile=profile), bounds, sources))
+    finally:
+        _CLEAN_SOURCE = None
+
+    partials = None
+    if profile:
+        parts, partials = [p for p, _ in parts], [q for _, q in parts]
+
+    out = pd.concat(parts)
+    out.reset_index(drop=True, inplace=True)
+    return (out, partials) if profile else out
+
+def load_data(run=None):
+    run = run or IngestRun(0)
     print("🔍 Scrapeando el sitio web...")
-    response = requests.get(PAGE_URL, timeout=20)
-    soup = BeautifulSoup(response.text, "html.parser")
+    with run.stage("page_fetch"):
+        response = requests.get(PAGE_URL, timeout=20)
+        soup = BeautifulSoup(response.text, "html.parser")
 
     datasets = {}
     for keyword, label in [("Pisces", "peces"), ("Aves", "aves")]:
@@ -58,19 +143,24 @@ def load_data():
             print(f"⚠️  No se encontró CSV para {keyword}")
             continue
         print(f"⬇️  Descargando {label}: {url}")
-        r = requests.get(url, timeout=20)
+        with run.stage("csv_download", label):
+            r = requests.get(url, timeout=20)
         
         # Probar diferentes codificaciones comunes para CSVs en español
         encodings = ['utf-8-sig', 'latin-1', 'cp1252']
         df = None
+        attempts = 0
         
         for enc in encodings:
+            attempts += 1
             try:
-                content = r.content.decode(enc)
+                with run.stage("decode", label):
+                    content = r.content.decode(enc)
                 # Si '�' está en el contenido, es probable que la codificación sea incorrecta
                 if '�' in content:
                     continue
-                df = pd.read_csv(StringIO(content))
+                with run.stage("parse", label):
+                    df = pd.read_csv(StringIO(content))
                 print(f"✅ {label} cargado con encoding: {enc}")
                 break
             except Exception:
@@ -79,14 +169,68 @@ def load_data():
         if df is None:
             # Fallback a utf-8 con reemplazo si nada funciona
             print(f"⚠️  Fallo detección automática para {label}, usando fallback")
-            df = pd.read_csv(StringIO(r.content.decode('utf-8', errors='replace')))
-        df = clean_df(df)
+            attempts += 1
+            with run.stage("parse", label):
+                df = pd.read_csv(StringIO(r.content.decode('utf-8', errors='replace')))
+
+        rows_in = len(df)
+        version = hashlib.sha1(r.content).hexdigest()
+        # El perfil se calcula una sola vez por versión del CSV, en el mismo paso que la limpieza
+        profile = PROFILES.get(label, {}).get("version") != version
+        with run.stage("clean", label):
+            df = clean_df_parallel(df, profile=profile)
+            if profile:
+                df, partials = df
+                PROFILES[label] = merge_profiles(partials, df.dtypes, rows_in, version=version)
         datasets[label] = df
+        run.record(
+            label,
+            version=version,
+            bytes_downloaded=len(r.content),
+            decode_attempts=attempts,
+            rows_in=rows_in,
+            rows_out=len(df),
+            columns=len(df.columns),
+            memory_bytes=int(df.memory_usage(deep=True).sum()),
+        )
         print(f"✅ {label}: {len(df)} filas, {len(df.columns)} columnas")
 
     return datasets
 
-DATA = {}
+def ingest():
+    run = INGEST.start()
+    try:
+        datasets = load_data(run)
+        for label, df in datasets.items():
+            with run.stage("store", label):
+                STORE.replace(label, df)
+    except Exception:
+        INGEST.finish(run, ok=False)
+        raise
+    INGEST.finish(run, ok=True)
+    return run
+
+def background_load():
+    # Si hay datos persistidos (SQLite) se sirven de inmediato y se actualizan después
+    if STORE.restore():
+        READY.set()
+        print(f"♻️  Datos restaurados: {', '.join(STORE.labels())}. Actualizando en segundo plano...")
+    while True:
+        try:
+            ingest()
+            READY.set()
+            print("\n🌿 Datos listos\n")
+            return
+        except Exception as e:
+            print(f"❌ Error cargando datos: {e}. Reintento en {INGEST_RETRY_SECONDS}s")
+            time.sleep(INGEST_RETRY_SECONDS)
+
+STORE = make_store(STORAGE_BACKEND, SQLITE_PATH)
+INGEST = IngestHistory(INGEST_HISTORY)
+PROFILES = {}
+READY = threading.Event()
+# Una consulta por dataset en paralelo para la búsqueda global
+SEARCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="search")
 
 # ─────────────────────────────────────────
 # HTML TEMPLATE
@@ -618,6 +762,12 @@ function sortTable(key, col) {
 // ── INIT ──
 async function init() {
   const res = await fetch('/api/data');
+  if (res.status === 503) {
+    // El servidor sigue cargando los datos: reintentar según Retry-After
+    const wait = parseInt(res.headers.get('Retry-After') || '5', 10);
+    setTimeout(init, wait * 1000);
+    return;
+  }
   const json = await res.json();
 
   for (const key of ['peces', 'aves']) {
@@ -674,23 +824,149 @@ init();
 # ROUTES
 # ─────────────────────────────────────────
 
+def not_ready():
+    resp = jsonify({"error": "Los datos se están cargando, intente nuevamente"})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = str(RETRY_AFTER_SECONDS)
+    return resp
+
+@app.before_request
+def require_ready():
+    if request.path.startswith("/api/") and not READY.is_set():
+        return not_ready()
+
+@app.route("/healthz")
+def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route("/readyz")
+def readyz():
+    if not READY.is_set():
+        return not_ready()
+    return jsonify({"status": "ready", "datasets": STORE.labels()})
+
 @app.route("/")
 def index():
     return render_template_string(HTML)
 
+def records(df):
+    # Replace NaN with None for JSON serialization
+    return json.loads(df.where(pd.notnull(df), None).to_json(orient="records", force_ascii=False))
+
+def query_filters():
+    return request.args.get("q", "").strip(), request.args.get("group", "").strip()
+
 @app.route("/api/data")
 def api_data():
     out = {}
-    for key, df in DATA.items():
-        # Replace NaN with None for JSON serialization
-        out[key] = json.loads(df.where(pd.notnull(df), None).to_json(orient="records", force_ascii=False))
+    for key in STORE.labels():
+        out[key] = records(STORE.frame(key))
     return jsonify(out)
 
+@app.route("/api/data/<key>")
+def api_data_query(key):
+    if key not in STORE.labels():
+        return jsonify({"error": f"Dataset '{key}' no encontrado"}), 404
+
+    q, group = query_filters()
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 50, type=int), 1), MAX_PER_PAGE)
+
+    total, df = STORE.page(key, q=q, group=group, offset=(page - 1) * per_page, limit=per_page)
+    return jsonify({
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "columns": STORE.columns(key),
+        "rows": records(df),
+    })
+
+@app.route("/api/search")
+def api_search():
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "Parámetro 'q' es requerido"}), 400
+    k = min(max(request.args.get("k", SEARCH_DEFAULT_K, type=int), 1), MAX_PER_PAGE)
+
+    labels = STORE.labels()
+    futures = {SEARCH_POOL.submit(STORE.search, label, q, k): label for label in labels}
+
+    def hits(label, ranks, df):
+        for pos, (rank, row) in enumerate(zip(ranks, records(df))):
+            yield (rank, labels.index(label), pos), {
+                "dataset": label, "match": MATCH_KINDS[rank], "rank": rank, "row": row,
+            }
+
+    # ?stream=1: NDJSON con el mismo top-k global que sin stream. Un resultado sale
+    # en cuanto su lugar en el top-k es seguro: ni sumando k resultados de cada
+    # dataset pendiente que pueda quedar antes que él se sale del top-k
+    if request.args.get("stream"):
+        def generate():
+            pending = set(range(len(labels)))
+            top, sent = [], set()
+            for future in as_completed(futures):
+                label = futures[future]
+                pending.discard(labels.index(label))
+                top = list(islice(heapq.merge(top, hits(label, *future.result()), key=lambda hit: hit[0]), k))
+                for before, (key, hit) in enumerate(top):
+                    if before + k * sum(1 for p in pending if (0, p) < key[:2]) >= k:
+                        break
+                    if key not in sent:
+                        sent.add(key)
+                        yield json.dumps(hit, ensure_ascii=False) + "\n"
+            for key, hit in top:
+                if key not in sent:
+                    yield json.dumps(hit, ensure_ascii=False) + "\n"
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    # Cada lista ya viene ordenada por relevancia: basta un merge con heap y cortar en k
+    per_dataset = [list(hits(futures[f], *f.result())) for f in futures]
+    merged = heapq.merge(*per_dataset, key=lambda hit: hit[0])
+    return jsonify({"q": q, "k": k, "results": [hit for _, hit in islice(merged, k)]})
+
+@app.route("/api/profile/<key>")
+def api_profile(key):
+    if key not in PROFILES:
+        return jsonify({"error": f"Perfil de '{key}' no disponible"}), 404
+    return jsonify(PROFILES[key])
+
+@app.route("/metrics")
+def metrics():
+    return Response(INGEST.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/api/export/<key>.<fmt>")
+def api_export(key, fmt):
+    if key not in STORE.labels() or fmt not in ("ndjson", "csv"):
+        return jsonify({"error": f"Exportación '{key}.{fmt}' no encontrada"}), 404
+
+    q, group = query_filters()
+    columns = STORE.columns(key)
+    batches = STORE.iter_batches(key, q=q, group=group, batch_size=EXPORT_BATCH_ROWS)
+
+    # Se envía lote a lote: la memoria por petición depende del lote, no del dataset
+    def generate():
+        if fmt == "csv":
+            yield pd.DataFrame(columns=columns).to_csv(index=False)
+        for batch in batches:
+            if fmt == "ndjson":
+                yield batch.to_json(orient="records", lines=True, force_ascii=False)
+            else:
+                yield batch.to_csv(index=False, header=False)
+
+    mimetype = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{key}.{fmt}"'},
+    )
+
 # ─────────────────────────────────────────
 # MAIN
 # ─────────────────────────────────────────
 
 if __name__ == "__main__":
-    DATA.update(load_data())
-    print("\n🌿 Servidor listo → http://localhost:5000\n")
+    threading.Thread(target=background_load, name="ingest", daemon=True).start()
+    print("\n🌿 Servidor escuchando → http://localhost:5000 (cargando datos en segundo plano)\n")
+    # HTTP/1.1 para que las exportaciones salgan con Transfer-Encoding: chunked
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
     app.run(debug=False, port=5000)
@@ -0,0 +1,40 @@
+# Benchmark de clean_df_parallel: escalamiento de 1 a N procesos.
+#   python bench_clean.py [filas] [max_workers]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app import clean_df, clean_df_parallel
+
+def synthetic(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.array([f" Genus{i % 997} species{i} " for i in range(1000)] + ["  ", "nan", None], dtype=object)
+    return pd.DataFrame({
+        "TaxonName": rng.choice(names, rows),
+        "Family": rng.choice(np.array(["Serranidae", "Labridae ", " Carangidae", None], dtype=object), rows),
+        "Order": rng.choice(np.array(["Perciformes", "Anguilliformes", ""], dtype=object), rows),
+        "Status": rng.choice(np.array(["Native", " Endemic", "Introduced", "None"], dtype=object), rows),
+        "Records": rng.integers(0, 500, rows),
+        "Vacía": np.full(rows, np.nan),
+    })
+
+def timed(fn, df):
+    start = time.perf_counter()
+    out = fn(df.copy())
+    return time.perf_counter() - start, out
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    df = synthetic(rows)
+
+    base_time, expected = timed(clean_df, df)
+    print(f"{rows} filas — secuencial: {base_time:.2f}s")
+    for workers in range(1, max_workers + 1):
+        elapsed, out = timed(lambda d: clean_df_parallel(d, workers=workers, chunk_rows=max(rows // (workers * 4), 1)), df)
+        pd.testing.assert_frame_equal(out, expected, check_exact=True)
+        assert out.to_csv().encode() == expected.to_csv().encode()
+        print(f"  workers={workers:<2} {elapsed:.2f}s  speedup x{base_time / elapsed:.2f}")
@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ─────────────────────────────────────────
+# MÉTRICAS DE INGESTA
+# ─────────────────────────────────────────
+
+# Métricas por dataset que se exportan como gauges (nombre → ayuda)
+DATASET_METRICS = {
+    "bytes_downloaded": "Bytes del CSV descargado.",
+    "decode_attempts": "Codificaciones probadas hasta leer el CSV.",
+    "rows_in": "Filas leídas antes de clean_df.",
+    "rows_out": "Filas después de clean_df.",
+    "columns": "Columnas después de clean_df.",
+    "memory_bytes": "Memoria del DataFrame limpio (deep).",
+}
+
+class IngestRun:
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.started = time.time()
+        self.duration = None
+        self.ok = None
+        self.stages = {}    # (etapa, dataset) → segundos acumulados
+        self.datasets = {}  # dataset → {métrica: valor}
+
+    @contextmanager
+    def stage(self, name, dataset=""):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            key = (name, dataset)
+            self.stages[key] = self.stages.get(key, 0.0) + time.perf_counter() - start
+
+    def record(self, dataset, **values):
+        self.datasets.setdefault(dataset, {}).update(values)
+
+class IngestHistory:
+    def __init__(self, size=10):
+        self._runs = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self.failures = 0
+
+    def start(self):
+        with self._lock:
+            run = IngestRun(self._next_id)
+            self._next_id += 1
+        return run
+
+    def finish(self, run, ok=True):
+        run.duration = time.time() - run.started
+        run.ok = ok
+        with self._lock:
+            self._runs.append(run)
+            if not ok:
+                self.failures += 1
+
+    def runs(self):
+        with self._lock:
+            return list(self._runs)
+
+    def render_prometheus(self):
+        runs = self.runs()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+        metric("scraper_ingest_runs_total", "counter", "Ejecuciones de ingesta iniciadas.",
+               [({}, self._next_id - 1)])
+        metric("scraper_ingest_failures_total", "counter", "Ejecuciones de ingesta fallidas.",
+               [({}, self.failures)])
+        metric("scraper_ingest_timestamp_seconds", "gauge", "Inicio de cada ejecución (epoch).",
+               [({"run": r.run_id}, round(r.started, 3)) for r in runs])
+        metric("scraper_ingest_duration_seconds", "gauge", "Duración total de cada ejecución.",
+               [({"run": r.run_id, "ok": str(r.ok).lower()}, round(r.duration, 6)) for r in runs])
+        metric("scraper_stage_duration_seconds", "gauge", "Duración de cada etapa por dataset.",
+               [({"run": r.run_id, "stage": stage, "dataset": dataset}, round(seconds, 6))
+                for r in runs for (stage, dataset), seconds in r.stages.items()])
+        for key, help_text in DATASET_METRICS.items():
+            metric(f"scraper_dataset_{key}", "gauge", help_text,
+                   [({"run": r.run_id, "dataset": dataset}, values[key])
+                    for r in runs for dataset, values in r.datasets.items() if key in values])
+
+        return "\n".join(lines) + "\n"
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        f'{k}="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
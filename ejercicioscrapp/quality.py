@@ -0,0 +1,86 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────
+# PERFIL DE CALIDAD POR COLUMNA
+# ─────────────────────────────────────────
+
+TOP_VALUES = 5
+
+def _native(value):
+    # numpy → tipos de Python para jsonify
+    return value.item() if hasattr(value, "item") else value
+
+def partial_profile(df):
+    # Conteos de un trozo ya limpio (se calcula en el mismo paso que clean_rows);
+    # merge_profiles los suma entre trozos
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        lengths = None
+        if pd.api.types.is_string_dtype(series):
+            # Histograma de longitudes: los percentiles exactos salen de él
+            lengths = series.dropna().astype(str).str.len().value_counts()
+        columns[col] = (int(series.isna().sum()), series.value_counts(dropna=True), lengths)
+    return len(df), columns
+
+def _sum_counts(parts):
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts).groupby(level=0, sort=False).sum().sort_values(ascending=False, kind="stable")
+
+def _quantile(lengths, cumulative, n, q):
+    # Interpolación lineal sobre los valores ordenados, igual que Series.quantile
+    h = (n - 1) * q
+    lo = int(np.floor(h))
+    frac = h - lo
+    a = lengths[np.searchsorted(cumulative, lo, side="right")]
+    b = lengths[np.searchsorted(cumulative, min(lo + 1, n - 1), side="right")]
+    diff = float(b - a)
+    return float(b) - diff * (1 - frac) if frac >= 0.5 else float(a) + diff * frac
+
+def _length_stats(hist):
+    hist = hist.sort_index()
+    lengths, counts = hist.index.to_numpy(), hist.to_numpy()
+    n = int(counts.sum())
+    cumulative = counts.cumsum()
+    return {
+        "min": int(lengths[0]),
+        "p50": _quantile(lengths, cumulative, n, 0.5),
+        "p90": _quantile(lengths, cumulative, n, 0.9),
+        "max": int(lengths[-1]),
+        "mean": round(float((lengths * counts).sum()) / n, 2),
+    }
+
+def merge_profiles(partials, dtypes, rows_in, version=None, top=TOP_VALUES):
+    rows = sum(size for size, _ in partials)
+
+    columns = {}
+    for col, dtype in dtypes.items():
+        parts = [cols[col] for _, cols in partials]
+        nulls = sum(p[0] for p in parts)
+        counts = _sum_counts([p[1] for p in parts])
+        info = {
+            "dtype": str(dtype),
+            "null_rate": round(float(nulls) / rows, 4) if rows else 0.0,
+            "cardinality": int(counts.size),
+            "top_values": [{"value": _native(v), "count": int(c)} for v, c in counts.head(top).items()],
+        }
+        hists = [p[2] for p in parts if p[2] is not None and len(p[2])]
+        if hists:
+            info["length"] = _length_stats(_sum_counts(hists))
+        columns[str(col)] = info
+
+    return {
+        "version": version,
+        "computed_at": time.time(),
+        "rows_in": rows_in,
+        "rows_out": rows,
+        "rows_dropped": rows_in - rows,
+        "columns": columns,
+    }
+
+def profile_df(df, rows_in, version=None, top=TOP_VALUES):
+    return merge_profiles([partial_profile(df)], df.dtypes, rows_in, version=version, top=top)
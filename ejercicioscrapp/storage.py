@@ -0,0 +1,323 @@
+import json
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────
+# DETECCIÓN DE COLUMNAS
+# ─────────────────────────────────────────
+
+NAME_KEYWORDS = ["species", "especie", "taxon", "name", "nombre", "scientific", "taxonname", "family"]
+FAMILY_KEYWORDS = ["family", "familia"]
+ORDER_KEYWORDS = ["order", "orden"]
+STATUS_KEYWORDS = ["status", "estado"]
+
+def find_column(columns, keywords, default=None):
+    return next((c for c in columns if any(k in c.lower() for k in keywords)), default)
+
+def detect_columns(columns):
+    columns = list(columns)
+    return {
+        "name": find_column(columns, NAME_KEYWORDS, columns[0] if columns else None),
+        "family": find_column(columns, FAMILY_KEYWORDS),
+        "order": find_column(columns, ORDER_KEYWORDS),
+        "status": find_column(columns, STATUS_KEYWORDS),
+    }
+
+# Orden de relevancia de la búsqueda global
+MATCH_KINDS = ["exact", "prefix", "substring", "other"]
+
+def group_column(roles):
+    # Igual que el dropdown del frontend: primero orden, luego familia
+    return roles["order"] or roles["family"]
+
+def search_text(df, name_col):
+    # Texto en minúsculas de cada fila y del nombre: ambos motores buscan sobre
+    # este mismo texto, así que `q` encuentra las mismas filas en memoria y en SQLite
+    text = df.astype(object).where(pd.notnull(df), "").astype(str)
+    haystack = text.iloc[:, 0].str.cat([text[c] for c in text.columns[1:]], sep="\x1f").str.lower()
+    return haystack, text[name_col].str.lower()
+
+# ─────────────────────────────────────────
+# MEMORIA (pandas)
+# ─────────────────────────────────────────
+
+class MemoryStore:
+    def __init__(self):
+        self._frames = {}
+        self._roles = {}
+        self._haystacks = {}
+        self._names = {}
+
+    def restore(self):
+        return False
+
+    def replace(self, label, df):
+        # Texto en minúsculas de cada fila, precalculado una sola vez por versión
+        self._roles[label] = detect_columns(df.columns)
+        self._haystacks[label], self._names[label] = search_text(df, self._roles[label]["name"])
+        self._frames[label] = df
+
+    def labels(self):
+        return list(self._frames)
+
+    def columns(self, label):
+        return list(self._frames[label].columns)
+
+    def roles(self, label):
+        return self._roles[label]
+
+    def frame(self, label):
+        return self._frames[label]
+
+    def _positions(self, label, q=None, group=None):
+        # Posiciones de las filas que cumplen los filtros (None = todas): se calcula
+        # la máscara una vez y el frame no se copia
+        if not q and not group:
+            return None
+        df = self._frames[label]
+        mask = np.ones(len(df), dtype=bool)
+        if q:
+            mask &= self._haystacks[label].str.contains(q.lower(), regex=False).to_numpy(dtype=bool, na_value=False)
+        if group:
+            col = group_column(self._roles[label])
+            if col is None:
+                return np.empty(0, dtype=np.intp)
+            mask &= (df[col].astype(str).str.lower() == group.lower()).to_numpy(dtype=bool, na_value=False)
+        return np.flatnonzero(mask)
+
+    def _rows(self, label, positions, start, stop):
+        df = self._frames[label]
+        return df.iloc[start:stop] if positions is None else df.iloc[positions[start:stop]]
+
+    def page(self, label, q=None, group=None, offset=0, limit=50):
+        positions = self._positions(label, q, group)
+        total = len(self._frames[label]) if positions is None else len(positions)
+        return total, self._rows(label, positions, offset, offset + limit)
+
+    def iter_batches(self, label, q=None, group=None, batch_size=1000):
+        # Solo el lote actual se copia: la memoria no depende del tamaño del resultado
+        positions = self._positions(label, q, group)
+        total = len(self._frames[label]) if positions is None else len(positions)
+        for start in range(0, total, batch_size):
+            yield self._rows(label, positions, start, start + batch_size)
+
+    def search(self, label, q, limit=20):
+        # Rango 0..3 según MATCH_KINDS; 4 = sin coincidencia
+        q = q.lower()
+        names = self._names[label]
+        rank = np.select(
+            [
+                (names == q).to_numpy(),
+                names.str.startswith(q).to_numpy(),
+                names.str.contains(q, regex=False).to_numpy(),
+                self._haystacks[label].str.contains(q, regex=False).to_numpy(),
+            ],
+            [0, 1, 2, 3],
+            default=4,
+        )
+        hits = np.flatnonzero(rank < 4)
+        hits = hits[np.argsort(rank[hits], kind="stable")][:limit]
+        return rank[hits].tolist(), self._frames[label].iloc[hits]
+
+# ─────────────────────────────────────────
+# SQLITE + FTS5
+# ─────────────────────────────────────────
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _table(label):
+    return "ds_" + re.sub(r"\W", "_", label)
+
+# Columnas internas con el texto de búsqueda (search_text), junto a las del dataset
+DOC_COLUMN = "__doc__"
+NAME_COLUMN = "__name__"
+# Versión del esquema de las tablas ds_*; las de otra versión no se restauran
+SCHEMA_VERSION = 2
+
+def _fts_query(q):
+    # Con el tokenizador trigram una frase entre comillas es una búsqueda por subcadena
+    return '"' + q.replace('"', '""') + '"'
+
+class SQLiteStore:
+    def __init__(self, path, batch_size=5000):
+        self.path = path
+        self.batch_size = batch_size
+        self._meta = {}
+        self._write_lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                # Tablas de una versión anterior: se reconstruyen en la próxima ingesta
+                conn.execute("DROP TABLE IF EXISTS datasets")
+                conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS datasets ("
+                "label TEXT PRIMARY KEY, columns TEXT NOT NULL, roles TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        # Conexión corta por operación: las lecturas nunca bloquean la reconstrucción (WAL)
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def restore(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT label, columns, roles FROM datasets").fetchall()
+        for label, columns, roles in rows:
+            self._meta[label] = (json.loads(columns), json.loads(roles))
+        return bool(rows)
+
+    def replace(self, label, df):
+        columns = [str(c) for c in df.columns]
+        roles = detect_columns(columns)
+        table, fts = _table(label), _table(label) + "_fts"
+        cols_sql = ", ".join(_quote(c) for c in columns + [DOC_COLUMN, NAME_COLUMN])
+        placeholders = ", ".join("?" for _ in range(len(columns) + 2))
+        haystack, names = search_text(df, roles["name"])
+
+        # Python nativo (int/float/str/None) para el adaptador de sqlite3
+        values = df.astype(object).where(pd.notnull(df), None).itertuples(index=False, name=None)
+        rows = (row + (doc, name) for row, doc, name in zip(values, haystack, names))
+
+        with self._write_lock, closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(f"DROP TABLE IF EXISTS {_quote(fts)}")
+                conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+                conn.execute(f"CREATE TABLE {_quote(table)} ({cols_sql})")
+
+                insert = f"INSERT INTO {_quote(table)} ({cols_sql}) VALUES ({placeholders})"
+                while True:
+                    batch = list(islice(rows, self.batch_size))
+                    if not batch:
+                        break
+                    conn.executemany(insert, batch)
+
+                # Índices después de la carga: más rápido que mantenerlos fila a fila
+                for role in ("name", "family", "order", "status"):
+                    col = roles[role]
+                    if col is not None:
+                        conn.execute(
+                            f"CREATE INDEX {_quote(table + '_' + role)} "
+                            f"ON {_quote(table)} ({_quote(col)} COLLATE NOCASE)"
+                        )
+
+                # Índice de trigramas: candidatos por subcadena, sin quitar tildes (igual que en memoria)
+                conn.execute(
+                    f"CREATE VIRTUAL TABLE {_quote(fts)} USING fts5("
+                    "doc, content='', tokenize='trigram')"
+                )
+                conn.execute(
+                    f"INSERT INTO {_quote(fts)} (rowid, doc) SELECT rowid, {_quote(DOC_COLUMN)} FROM {_quote(table)}"
+                )
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO datasets (label, columns, roles) VALUES (?, ?, ?)",
+                    (label, json.dumps(columns), json.dumps(roles)),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        self._meta[label] = (columns, roles)
+
+    def labels(self):
+        return list(self._meta)
+
+    def columns(self, label):
+        return list(self._meta[label][0])
+
+    def roles(self, label):
+        return self._meta[label][1]
+
+    def _match(self, label, q):
+        # Misma semántica que MemoryStore: subcadena de `q` en minúsculas sobre el texto
+        # de la fila. El índice trigram solo sirve desde 3 caracteres; instr confirma
+        q = q.lower()
+        clause, params = f"instr({_quote(DOC_COLUMN)}, ?) > 0", [q]
+        if len(q) >= 3:
+            fts = _quote(_table(label) + "_fts")
+            clause = f"rowid IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?) AND " + clause
+            params.insert(0, _fts_query(q))
+        return clause, params
+
+    def _where(self, label, q=None, group=None):
+        clauses, params = [], []
+        if q:
+            clause, match_params = self._match(label, q)
+            clauses.append(clause)
+            params.extend(match_params)
+        if group:
+            col = group_column(self.roles(label))
+            if col is None:
+                clauses.append("0")
+            else:
+                clauses.append(f"{_quote(col)} = ? COLLATE NOCASE")
+                params.append(group)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def frame(self, label):
+        columns = self.columns(label)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(_quote(c) for c in columns)} FROM {_quote(_table(label))} ORDER BY rowid"
+            ).fetchall()
+        return pd.DataFrame.from_records(rows, columns=columns)
+
+    def page(self, label, q=None, group=None, offset=0, limit=50):
+        columns = self.columns(label)
+        where, params = self._where(label, q, group)
+        table = _quote(_table(label))
+        with closing(self._connect()) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join(_quote(c) for c in columns)} FROM {table}{where} "
+                "ORDER BY rowid LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return total, pd.DataFrame.from_records(rows, columns=columns)
+
+    def iter_batches(self, label, q=None, group=None, batch_size=1000):
+        columns = self.columns(label)
+        where, params = self._where(label, q, group)
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                f"SELECT {', '.join(_quote(c) for c in columns)} FROM {_quote(_table(label))}{where} ORDER BY rowid",
+                params,
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=columns)
+
+    def search(self, label, q, limit=20):
+        columns = self.columns(label)
+        name = _quote(NAME_COLUMN)
+        q = q.lower()
+        match, params = self._match(label, q)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(_quote(c) for c in columns)}, CASE "
+                f"WHEN {name} = ? THEN 0 "
+                f"WHEN substr({name}, 1, length(?)) = ? THEN 1 "
+                f"WHEN instr({name}, ?) > 0 THEN 2 ELSE 3 END AS rank "
+                f"FROM {_quote(_table(label))} WHERE {match} "
+                "ORDER BY rank, rowid LIMIT ?",
+                [q, q, q, q] + params + [limit],
+            ).fetchall()
+        return [r[-1] for r in rows], pd.DataFrame.from_records([r[:-1] for r in rows], columns=columns)
+
+def make_store(backend, sqlite_path):
+    if backend == "sqlite":
+        return SQLiteStore(sqlite_path)
+    return MemoryStore()